@@ -1,19 +1,23 @@
 import subprocess
 import os
+import sys
+
+# 전사 파이프라인과 같은 음성 추출 설정(16kHz 모노) 사용
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'teacher_management_python'))
+from audio_extract import extraction_command
+
+# 출력 파일 확장자 -> 음성 코덱
+CODECS_BY_EXTENSION = {'.mp3': 'mp3', '.flac': 'flac', '.ogg': 'opus', '.opus': 'opus'}
 
 def convert_video_to_audio(video_path, audio_path):
+    extension = os.path.splitext(audio_path)[1].lower()
+    if extension not in CODECS_BY_EXTENSION:
+        raise ValueError(f"지원하지 않는 오디오 확장자: {extension or audio_path} (지원: {', '.join(CODECS_BY_EXTENSION)})")
     try:
-        command = [
-            'ffmpeg',
-            '-i', video_path,
-            '-vn',
-            '-acodec', 'libmp3lame',
-            '-ab', '192k',
-            '-ar', '44100',
-            audio_path
-        ]
+        codec = CODECS_BY_EXTENSION[extension]
+        command = extraction_command(video_path, codec, audio_path)
         subprocess.run(command, check=True)
         return True
     except Exception as e:
         print(f"Error converting video: {str(e)}")
-        return False 
\ No newline at end of file
+        return False
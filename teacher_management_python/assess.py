@@ -1,64 +1,147 @@
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from prompt import TeachingPrompts
-from langchain_openai import ChatOpenAI
-from langchain.schema import SystemMessage, HumanMessage
+from concurrency import map_ordered
+from chunking import chunk_conversation, estimate_tokens
+from checkpoint import CheckpointStore, content_hash
+from llm_cache import CachedChatModel
+from metrics import get_metrics
+from structured_analysis import RESPONSE_FORMAT, parse_chunk_analysis
 import config as config
 import re
-from tqdm import tqdm
 
 class TeachingAssessor:
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        checkpoint: Optional[CheckpointStore] = None,
+        structured: Optional[bool] = None
+    ):
         self.prompts = TeachingPrompts()
-        self.llm = ChatOpenAI(
-            api_key=config.OPENAI_API_KEY,
-            model="gpt-4.1-2025-04-14", 
-            temperature=0
-        )
+        self.checkpoint = checkpoint
+        self.max_concurrency = max_concurrency if max_concurrency is not None else config.LLM_MAX_CONCURRENCY
+        self.structured = structured if structured is not None else config.STRUCTURED_ANALYSIS
+        self.llm = CachedChatModel(temperature=0)
     
     def assess_teaching(self, processed_data: Dict) -> Dict:
-        """교사 평가 수행"""
+        """교사 평가 수행
+
+        구조화 출력 모드에서는 청크 평가 응답에 함께 들어온 질적 분석을 processed_data에 채웁니다
+        (전처리 단계의 질적 분석 호출은 생략됨).
+        """
         chunks = self._split_conversation_into_chunks(processed_data['대화_세션'])
-        chunk_assessments = []
-        
-        for chunk in tqdm(chunks, desc="청크 평가 진행률"):
-            # 기존 TeachingDataProcessor의 분석 결과 활용
-            chunk_data = {
-                "대화_세션": chunk,
-                "교사_발화": [msg for speaker, msg in chunk if speaker == "Teacher"],
-                "학생_발화": [msg for speaker, msg in chunk if speaker in ["Michael", "Abby"]],
-                "핵심_지표": processed_data["핵심_지표"],
-                "교사_전략": processed_data["교사_전략"],
-                "학생_참여": processed_data["학생_참여"],
-                "피드백_분석": processed_data["피드백_분석"],
-                "질적_분석": processed_data["질적_분석"]
-            }
-            
-            assessment_result = self._assess_chunk(chunk_data)
-            chunk_assessments.append(assessment_result)
+        # 기존 TeachingDataProcessor의 분석 결과 활용
+        chunk_datas = [self.build_chunk_data(chunk, processed_data) for chunk in chunks]
+        
+        # 청크별 평가를 동시에 요청하고 결과는 원래 순서대로 수집
+        from tqdm import tqdm
+        with tqdm(total=len(chunk_datas), desc="청크 평가 진행률") as pbar:
+            chunk_assessments = map_ordered(
+                self.analyze_chunk_structured if self.structured else self.assess_chunk,
+                chunk_datas,
+                max_workers=self.max_concurrency,
+                on_complete=lambda i, result: pbar.update(1)
+            )
+        
+        if self.structured:
+            for assessment in chunk_assessments:
+                for category, items in assessment.pop("질적_분석").items():
+                    processed_data["질적_분석"][category].extend(items)
         
-        return self._generate_final_assessment(chunk_assessments, processed_data)
+        return self.generate_final_assessment(chunk_assessments, processed_data)
     
-    def _assess_chunk(self, chunk_data: Dict) -> Dict:
+    def build_chunk_data(self, chunk: List[Tuple[str, str]], processed_data: Dict) -> Dict:
+        """청크 평가 프롬프트용 데이터 (청크 대화 + 전처리 지표)"""
+        return {
+            "대화_세션": chunk,
+            "교사_발화": [msg for speaker, msg in chunk if speaker == "Teacher"],
+            "학생_발화": [msg for speaker, msg in chunk if speaker in ["Michael", "Abby"]],
+            "핵심_지표": processed_data["핵심_지표"],
+            "교사_전략": processed_data["교사_전략"],
+            "학생_참여": processed_data["학생_참여"],
+            "피드백_분석": processed_data["피드백_분석"],
+            "질적_분석": processed_data["질적_분석"]
+        }
+    
+    def _checkpointed(self, prefix: str, payload, compute):
+        """payload 해시로 체크포인트를 찾고, 없으면 compute() 결과를 저장 후 반환"""
+        if self.checkpoint is None:
+            return compute()
+        name = f"{prefix}_{content_hash(payload)[:16]}"
+        result = self.checkpoint.load(name)
+        if result is None:
+            result = compute()
+            self.checkpoint.save(name, result)
+        return result
+    
+    def assess_chunk(self, chunk_data: Dict, on_token: Optional[Callable[[str], None]] = None) -> Dict:
+        """청크 하나 평가 (체크포인트가 있으면 재사용)
+
+        on_token을 주면 응답을 토큰 단위로 받으며 텍스트 조각마다 호출합니다
+        (체크포인트에서 복원하면 호출되지 않고, LLM 캐시에 있으면 전체 응답으로 한 번 호출).
+        """
+        return self._checkpointed("assessment", chunk_data, lambda: self._assess_chunk(chunk_data, on_token))
+    
+    def _assess_chunk(self, chunk_data: Dict, on_token: Optional[Callable[[str], None]] = None) -> Dict:
         """개별 청크 평가"""
         assessment_prompt = self.prompts.get_assessment_prompt(chunk_data)
-        response = self.llm.invoke([
+        from langchain_core.messages import HumanMessage, SystemMessage
+        messages = [
             SystemMessage(content=self.prompts.SCORING_SYSTEM_PROMPT),
             HumanMessage(content=assessment_prompt)
-        ])
+        ]
+        if on_token is None:
+            content = self.llm.invoke(messages).content
+        else:
+            parts = []
+            for text in self.llm.stream(messages):
+                parts.append(text)
+                on_token(text)
+            content = "".join(parts)
         
-        return self._parse_assessment_result(response.content)
+        with get_metrics().stage("parse", kind="assessment"):
+            return self._parse_assessment_result(content)
+    
+    def analyze_chunk_structured(self, chunk_data: Dict) -> Dict:
+        """청크 하나를 JSON 스키마 응답 한 번으로 질적 분석·평가 (체크포인트가 있으면 재사용)
+
+        반환값은 청크 평가 결과에 질적_분석이 추가된 형식입니다.
+        응답이 스키마에 맞지 않으면 기존 방식(질적 분석 후 평가, 호출 두 번)으로 처리합니다.
+        """
+        try:
+            return self._checkpointed("structured", chunk_data, lambda: self._analyze_chunk_structured(chunk_data))
+        except ValueError as e:
+            print(f"Warning: 구조화 응답 검증 실패, 기존 방식으로 평가합니다 ({e})")
+        from data_processing import TeachingDataProcessor
+        qualitative = TeachingDataProcessor("", structured=False).analyze_chunk_with_llm(chunk_data["대화_세션"])
+        assessment = self.assess_chunk(dict(chunk_data, 질적_분석=qualitative))
+        return dict(assessment, 질적_분석=qualitative)
     
-    def _generate_final_assessment(self, chunk_assessments: List[Dict], processed_data: Dict) -> Dict:
-        """최종 평가 결과 생성"""
+    def _analyze_chunk_structured(self, chunk_data: Dict) -> Dict:
+        prompt = self.prompts.get_chunk_analysis_prompt(chunk_data)
+        from langchain_core.messages import HumanMessage, SystemMessage
+        response = self.llm.invoke([
+            SystemMessage(content=self.prompts.SCORING_SYSTEM_PROMPT),
+            HumanMessage(content=prompt)
+        ], response_format=RESPONSE_FORMAT)
+        
+        with get_metrics().stage("parse", kind="structured"):
+            return parse_chunk_analysis(response.content)
+    
+    def generate_final_assessment(self, chunk_assessments: List[Dict], processed_data: Dict) -> Dict:
+        """최종 평가 결과 생성
+
+        리포트에는 모든 청크의 세부 평가를 그대로 싣고, 점수 산출에는 수업 길이와 관계없이
+        크기가 제한된 요약(reduce_evaluations)과 질적 분석 일부만 넣습니다.
+        """
         merged = self._merge_chunk_assessments(chunk_assessments)
         
         scores_prompt = self.prompts.get_scoring_prompt(
-            merged["세부_평가"],
-            processed_data["질적_분석"],
+            self.reduce_evaluations([assessment["세부_평가"] for assessment in chunk_assessments]),
+            self._sample_qualitative(processed_data["질적_분석"]),
             processed_data["핵심_지표"]
         )
         
-        scores = self._generate_scores(scores_prompt)
+        scores = self._checkpointed("scores", scores_prompt, lambda: self._generate_scores(scores_prompt))
         
         return {
             "scores": scores,
@@ -67,29 +150,73 @@ class TeachingAssessor:
             "report_content": merged["세부_평가"]
         }
 
-    def _split_conversation_into_chunks(self, conversation, chunk_size=30, overlap=5):
-        """대화를 청크로 분할
+    def reduce_evaluations(self, evaluations: List[str]) -> str:
+        """세부 평가를 트리 형태로 요약해 점수 산출 입력을 토큰 예산 안으로 줄임
+
+        연속된 평가를 최대 config.SCORING_REDUCE_FANOUT개(토큰 예산 이내)씩 묶어 동시에 요약하고,
+        합친 결과가 config.SCORING_INPUT_TOKEN_BUDGET 이하가 될 때까지 단계별로 반복합니다.
+        예산 안에 들어오는 짧은 수업은 요약 없이 그대로 사용합니다.
+        """
+        budget = config.SCORING_INPUT_TOKEN_BUDGET
+        texts = [evaluation.strip() for evaluation in evaluations if evaluation.strip()]
+        level = 0
+        while estimate_tokens("\n".join(texts), self.llm.model) > budget:
+            groups = self._group_evaluations(texts, budget)
+            if len(groups) == len(texts) and level > 0:
+                break  # 묶을 수 없을 만큼 요약이 길면 더 줄이지 않음
+            with get_metrics().stage("reduce", level=str(level)):
+                texts = map_ordered(self._summarize_evaluations, groups, max_workers=self.max_concurrency)
+            level += 1
+        return "\n".join(texts)
+    
+    def _group_evaluations(self, texts: List[str], budget: int) -> List[List[str]]:
+        """수업 순서를 유지하며 fanout개·토큰 예산 이내로 묶음"""
+        fanout = max(2, config.SCORING_REDUCE_FANOUT)
+        groups: List[List[str]] = []
+        group_tokens = 0
+        for text in texts:
+            tokens = estimate_tokens(text, self.llm.model)
+            if not groups or len(groups[-1]) >= fanout or group_tokens + tokens > budget:
+                groups.append([])
+                group_tokens = 0
+            groups[-1].append(text)
+            group_tokens += tokens
+        return groups
+    
+    def _summarize_evaluations(self, evaluations: List[str]) -> str:
+        """세부 평가 묶음 하나를 요약 (체크포인트가 있으면 재사용)"""
+        prompt = self.prompts.get_summary_prompt(evaluations)
+        
+        def summarize() -> str:
+            from langchain_core.messages import HumanMessage, SystemMessage
+            response = self.llm.invoke([
+                SystemMessage(content=self.prompts.SCORING_SYSTEM_PROMPT),
+                HumanMessage(content=prompt)
+            ])
+            return response.content.strip()
+        
+        return self._checkpointed("summary", prompt, summarize)
+    
+    def _sample_qualitative(self, qualitative_analysis: Dict) -> Dict:
+        """영역별로 수업 전체에서 고르게 config.SCORING_QUALITATIVE_ITEMS개씩 선택"""
+        limit = config.SCORING_QUALITATIVE_ITEMS
+        sampled = {}
+        for category, items in qualitative_analysis.items():
+            if len(items) <= limit:
+                sampled[category] = list(items)
+            else:
+                sampled[category] = [items[i * len(items) // limit] for i in range(limit)]
+        return sampled
+
+    def _split_conversation_into_chunks(self, conversation, token_budget=None, overlap_tokens=None):
+        """대화를 모델별 토큰 예산에 맞춰 청크로 분할 (chunking.chunk_conversation 참고)
         
         Args:
             conversation: 전체 대화 목록
-            chunk_size: 청크당 대화 수 (기본값: 100)
-            overlap: 청크 간 중복되는 대화 수 (기본값: 5)
+            token_budget: 청크당 대화 토큰 수 (기본값: 모델별 설정값)
+            overlap_tokens: 청크 간 중복되는 대화 토큰 수 (기본값: config.CHUNK_OVERLAP_TOKENS)
         """
-        chunks = []
-        i = 0
-        while i < len(conversation):
-            # 마지막 청크는 남은 모든 대화를 포함
-            if i + chunk_size >= len(conversation):
-                chunk = conversation[i:]
-            else:
-                # 일반적인 경우 chunk_size만큼 가져오고
-                chunk = conversation[i:i + chunk_size]
-            
-            chunks.append(chunk)
-            # overlap을 고려하여 다음 시작점 계산
-            i += (chunk_size - overlap)
-        
-        return chunks
+        return chunk_conversation(conversation, token_budget, overlap_tokens, model=self.llm.model)
     
     def _merge_chunk_assessments(self, chunk_assessments):
         """청크별 평가 결과를 통합"""
@@ -110,69 +237,53 @@ class TeachingAssessor:
             "기타": []
         }
         
+        from dedup import cluster_points, deduplicate  # numpy 임포트 비용이 커서 병합할 때 불러옴
+        improvement_points = []
         for assessment in chunk_assessments:
             merged["세부_평가"] += assessment["세부_평가"] + "\n"
             merged["우수점"].extend(assessment["우수점"])
-            
-            # 개선점 카테고리화
-            for point in assessment["개선점"]:
-                if "피드백" in point.lower():
-                    improvement_categories["피드백"].append(point)
-                elif "개념" in point.lower() or "설명" in point.lower():
-                    improvement_categories["개념_설명"].append(point)
-                elif "체계" in point.lower() or "흐름" in point.lower():
-                    improvement_categories["수업_체계성"].append(point)
-                elif "상호작용" in point.lower():
-                    improvement_categories["상호작용"].append(point)
-                elif "참여" in point.lower():
-                    improvement_categories["학생_참여"].append(point)
-                else:
-                    improvement_categories["기타"].append(point)
+            improvement_points.extend(assessment["개선점"])
+        
+        # 겹치는 청크에서 나온 유사한 우수점은 하나로 병합 (가장 자세한 문장 유지)
+        merged["우수점"] = deduplicate(merged["우수점"])
+        
+        # 유사한 개선점을 묶은 뒤 대표 문장(가장 긴 문장)을 카테고리화
+        for cluster in cluster_points(improvement_points):
+            point = max(cluster, key=len)
+            if "피드백" in point.lower():
+                category = "피드백"
+            elif "개념" in point.lower() or "설명" in point.lower():
+                category = "개념_설명"
+            elif "체계" in point.lower() or "흐름" in point.lower():
+                category = "수업_체계성"
+            elif "상호작용" in point.lower():
+                category = "상호작용"
+            elif "참여" in point.lower():
+                category = "학생_참여"
+            else:
+                category = "기타"
+            improvement_categories[category].append((len(cluster), point))
         
         # 각 카테고리에서 가장 대표적인 개선점 선택
         for category, points in improvement_categories.items():
             if points:
-                # 가장 긴 (상세한) 개선점을 선택
-                best_point = max(points, key=len)
+                # 여러 청크에서 반복해 지적된 개선점 우선, 같으면 가장 긴 (상세한) 개선점
+                best_point = max(points, key=lambda item: (item[0], len(item[1])))[1]
                 merged["개선점"].append(f"{category}: {best_point}")
         
-        # 중복 제거
-        merged["우수점"] = list(set(merged["우수점"]))
-        merged["개선점"] = list(set(merged["개선점"]))
-        
         return merged
     
-    def _generate_scores(self, detailed_eval: str) -> Dict[str, int]:
-        """평가 내용을 바탕으로 점수 산출"""
-        scores_prompt = f"""
-다음 교사의 수업 평가 내용을 바탕으로 각 영역별 점수를 산출해주세요.
-반드시 아래와 같은 형식으로만 응답해주세요:
-
-학생 참여: [숫자]
-개념 설명: [숫자]
-피드백: [숫자]
-체계성: [숫자]
-상호작용: [숫자]
-
-평가 내용:
-{detailed_eval}
-
-평가 기준:
-- 15-20점: 탁월한 성과
-- 10-14점: 기본 요구사항 충족
-- 5-9점: 개선 필요
-- 0-4점: 심각한 문제
-
-각 항목은 0-20점 사이의 정수로 평가해주세요.
-다른 설명은 일체 하지 말고, 오직 위 형식의 점수만 응답해주세요.
-"""
+    def _generate_scores(self, scores_prompt: str) -> Dict[str, int]:
+        """점수 산출 프롬프트(TeachingPrompts.get_scoring_prompt)로 점수 산출"""
+        from langchain_core.messages import HumanMessage, SystemMessage
         response = self.llm.invoke([
-            SystemMessage(content="당신은 매우 엄격한 교육 평가 전문가입니다."),
+            SystemMessage(content=self.prompts.SCORING_SYSTEM_PROMPT),
             HumanMessage(content=scores_prompt)
         ])
         
         print("GPT 응답:", response.content)  # 디버깅용 로그
-        return self._parse_scores(response.content)
+        with get_metrics().stage("parse", kind="scores"):
+            return self._parse_scores(response.content)
     
     def _parse_assessment_result(self, response: str) -> Dict:
         """GPT-4의 평가 응답을 파싱"""
@@ -0,0 +1,110 @@
+import subprocess
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+SPEECH_SAMPLE_RATE = 16000
+
+# 음성 전사용 인코딩 (16kHz 모노): 코덱 이름 -> (ffmpeg 인코더 인자, 컨테이너 형식)
+SPEECH_CODECS: Dict[str, Tuple[List[str], str]] = {
+    "opus": (["-c:a", "libopus", "-b:a", "24k", "-application", "voip"], "ogg"),
+    "flac": (["-c:a", "flac"], "flac"),
+    "mp3": (["-c:a", "libmp3lame", "-b:a", "32k"], "mp3"),
+}
+
+def speech_encode_args(codec: str) -> List[str]:
+    """16kHz 모노 음성 인코딩 ffmpeg 출력 인자 (컨테이너 형식 포함)"""
+    if codec not in SPEECH_CODECS:
+        raise ValueError(f"unsupported speech codec: {codec} (choose from {', '.join(SPEECH_CODECS)})")
+    encoder_args, container = SPEECH_CODECS[codec]
+    return ["-ac", "1", "-ar", str(SPEECH_SAMPLE_RATE), *encoder_args, "-f", container]
+
+def extraction_command(
+    input_path: str,
+    codec: str,
+    output: str = "pipe:1",
+    start_ms: Optional[int] = None,
+    duration_ms: Optional[int] = None
+) -> List[str]:
+    """영상·오디오에서 음성 트랙(구간)을 음성 전사용으로 인코딩하는 ffmpeg 명령 (셸을 거치지 않는 인자 목록)"""
+    command = ["ffmpeg", "-v", "error", "-nostdin", "-y"]
+    if start_ms:
+        command += ["-ss", f"{start_ms / 1000:.3f}"]
+    command += ["-i", input_path]
+    if duration_ms is not None:
+        command += ["-t", f"{duration_ms / 1000:.3f}"]
+    return command + ["-vn", "-map", "0:a:0", *speech_encode_args(codec), output]
+
+def extract_speech_audio(input_path: str, output_path: str, codec: str = "mp3") -> None:
+    """음성 트랙 전체를 파일로 저장 (전사 파이프라인은 파일 없이 open_speech_stream 사용)"""
+    result = subprocess.run(extraction_command(input_path, codec, output_path), stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg extraction failed: {input_path}: {result.stderr.decode(errors='replace').strip()}")
+
+class SpeechStream:
+    """ffmpeg stdout을 읽는 업로드용 스트림 (읽은 바이트 수 집계)
+
+    read()를 지원하고 블록 단위로 순회할 수 있으므로 업로드 클라이언트가 청크 전송으로 바로 보냅니다.
+    """
+
+    def __init__(self, raw: IO[bytes], block_size: int = 64 * 1024):
+        self._raw = raw
+        self.block_size = block_size
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._raw.read(size)
+        self.bytes_read += len(data)
+        return data
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            data = self.read(self.block_size)
+            if not data:
+                return
+            yield data
+
+@contextmanager
+def open_speech_stream(
+    input_path: str,
+    codec: str,
+    start_ms: Optional[int] = None,
+    duration_ms: Optional[int] = None
+) -> Iterator[SpeechStream]:
+    """구간을 음성 전사용으로 인코딩하면서 그대로 읽는 스트림 (중간 파일 없음)"""
+    process = subprocess.Popen(
+        extraction_command(input_path, codec, start_ms=start_ms, duration_ms=duration_ms),
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    stream = SpeechStream(process.stdout)
+    try:
+        yield stream
+        # 업로드가 끝까지 읽지 않았으면 남은 출력을 비워 ffmpeg 종료를 기다림
+        for _ in stream:
+            pass
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        returncode = process.wait()
+    if returncode != 0:
+        raise RuntimeError(f"ffmpeg extraction failed: {input_path}: {stderr.decode(errors='replace').strip()}")
+
+@dataclass
+class SpeechSegment:
+    """원본 파일의 전사 구간 - 업로드할 때 ffmpeg로 바로 인코딩해 스트리밍"""
+    source_path: str
+    start_ms: int  # 원본 기준 시작 위치 (발화 타임스탬프 보정용)
+    end_ms: int
+    codec: str = "opus"
+
+    @property
+    def duration_ms(self) -> int:
+        return self.end_ms - self.start_ms
+
+    @property
+    def name(self) -> str:
+        return f"{self.start_ms // 1000}s-{self.end_ms // 1000}s"
+
+    def open(self):
+        return open_speech_stream(self.source_path, self.codec, self.start_ms, self.duration_ms)
@@ -0,0 +1,94 @@
+import re
+import subprocess
+from typing import List, Tuple
+
+SILENCE_START_RE = re.compile(r"silence_start:\s*(-?[\d.]+)")
+SILENCE_END_RE = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
+def probe_duration_ms(audio_path: str) -> int:
+    """ffprobe로 전체 길이(밀리초) 조회 - 오디오를 디코딩하지 않음"""
+    output = subprocess.check_output([
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        audio_path
+    ], text=True)
+    return int(float(output.strip()) * 1000)
+
+def detect_silences(audio_path: str, noise_db: float = -30, min_silence_sec: float = 0.5) -> List[Tuple[int, int]]:
+    """ffmpeg silencedetect 필터로 무음 구간(밀리초) 검출
+
+    ffmpeg가 오디오를 스트리밍으로 처리하고 stderr 로그만 한 줄씩 읽으므로
+    강의 길이와 관계없이 메모리 사용량이 일정합니다.
+    원본 영상이 들어와도 첫 오디오 스트림만 디코딩합니다.
+    """
+    process = subprocess.Popen([
+        "ffmpeg", "-hide_banner", "-nostats", "-i", audio_path,
+        "-vn", "-map", "0:a:0",
+        "-af", f"silencedetect=noise={noise_db}dB:d={min_silence_sec}",
+        "-f", "null", "-"
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, errors="replace")
+
+    silences = []
+    silence_start = None
+    for line in process.stderr:
+        start_match = SILENCE_START_RE.search(line)
+        if start_match:
+            silence_start = max(0, int(float(start_match.group(1)) * 1000))
+            continue
+        end_match = SILENCE_END_RE.search(line)
+        if end_match and silence_start is not None:
+            silences.append((silence_start, int(float(end_match.group(1)) * 1000)))
+            silence_start = None
+
+    if process.wait() != 0:
+        raise RuntimeError(f"ffmpeg silencedetect failed: {audio_path}")
+    return silences
+
+def choose_boundaries(
+    duration_ms: int,
+    silences: List[Tuple[int, int]],
+    chunk_ms: int,
+    tolerance_ms: int
+) -> List[int]:
+    """목표 분할 지점(chunk_ms 간격) 주변 ±tolerance_ms 안의 무음 구간 중앙으로 경계 이동
+
+    허용 범위 안에 무음이 없으면 목표 지점에서 그대로 자릅니다.
+    마지막 남은 구간이 chunk_ms + tolerance_ms 이하이면 하나의 청크로 둡니다.
+    반환값은 0과 duration_ms를 포함한 경계 목록입니다.
+    """
+    midpoints = [(start + end) // 2 for start, end in silences]
+    lengths = [end - start for start, end in silences]
+
+    boundaries = [0]
+    cursor = 0
+    while duration_ms - cursor > chunk_ms + tolerance_ms:
+        target = cursor + chunk_ms
+        best = None
+        for midpoint, length in zip(midpoints, lengths):
+            if cursor < midpoint < duration_ms and abs(midpoint - target) <= tolerance_ms:
+                # 목표 지점에 가까울수록, 같은 거리면 더 긴 무음일수록 우선
+                key = (abs(midpoint - target), -length)
+                if best is None or key < best[0]:
+                    best = (key, midpoint)
+        cursor = best[1] if best else target
+        boundaries.append(cursor)
+
+    boundaries.append(duration_ms)
+    return boundaries
+
+def plan_segments(
+    audio_path: str,
+    chunk_duration: int = 10,
+    tolerance_sec: int = 30,
+    noise_db: float = -30,
+    min_silence_sec: float = 0.5,
+    align_to_silence: bool = True
+) -> List[int]:
+    """전사 구간 경계(밀리초, 0과 전체 길이 포함) - 파일을 만들지 않고 경계만 계산
+
+    align_to_silence가 False이면 무음 검출 없이 chunk_duration 간격으로 자릅니다.
+    """
+    duration_ms = probe_duration_ms(audio_path)
+    silences = detect_silences(audio_path, noise_db, min_silence_sec) if align_to_silence else []
+    return choose_boundaries(duration_ms, silences, chunk_duration * 60 * 1000, tolerance_sec * 1000)
@@ -0,0 +1,394 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+import types
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from langchain_core.messages import AIMessage, AIMessageChunk
+import config as config
+import llm_gateway
+import text_transcript
+from chunking import estimate_tokens
+from report_files import iter_report_dirs, load_transcript_utterances
+from data_processing import TeachingDataProcessor, process_teaching_text
+from assess import TeachingAssessor
+from report import generate_fancy_report
+from metrics import start_run
+
+STAGES = ["transcribe", "roles", "extract", "patterns", "process", "assess", "render"]
+
+QUALITATIVE_RESPONSE = """1. 교사 전문성
+- 개념을 단계적으로 설명함
+- 학생 이해도를 질문으로 점검함
+2. 수업 담화
+- 개방형 질문과 즉각적인 피드백이 이어짐
+3. 학습 환경
+- 학생이 편안하게 질문함
+"""
+
+ASSESSMENT_RESPONSE = """세부 평가
+교사는 예시를 활용해 개념을 설명하고 학생의 답변에 즉시 피드백을 제공했습니다.
+학생의 오답을 교정하는 과정이 체계적이었습니다.
+
+특히 우수한 부분
+- 학생 답변에 대한 구체적인 칭찬
+- 실생활 예시를 활용한 개념 설명
+
+개선이 필요한 부분
+- 학생이 스스로 설명할 기회를 더 제공할 필요
+- 수업 마무리 단계의 요약 부족
+"""
+
+SUMMARY_RESPONSE = """- 학생 참여: 학생이 질문에 자주 답했으나 스스로 설명할 기회는 적었습니다.
+- 개념 설명: 실생활 예시로 개념을 단계적으로 설명했습니다.
+- 피드백: 오답에 즉시 구체적인 교정 피드백을 제공했습니다.
+- 체계성: 도입과 전개는 체계적이었으나 마무리 요약이 부족했습니다.
+- 상호작용: 개방형 질문과 칭찬으로 대화가 활발했습니다.
+"""
+
+SCORES_RESPONSE = """학생 참여: 15
+개념 설명: 14
+피드백: 16
+체계성: 13
+상호작용: 15
+"""
+
+STRUCTURED_RESPONSE = json.dumps({
+    "qualitative_analysis": {
+        "teacher_expertise": ["개념을 단계적으로 설명함", "학생 이해도를 질문으로 점검함"],
+        "classroom_discourse": ["개방형 질문으로 학생 발화를 유도함"],
+        "learning_environment": ["학생들이 적극적으로 참여함"]
+    },
+    "detailed_evaluation": "교사는 예시를 활용해 개념을 설명하고 학생의 답변에 즉시 피드백을 제공했습니다.\n학생의 오답을 교정하는 과정이 체계적이었습니다.",
+    "strengths": ["실생활 예시를 활용한 개념 설명"],
+    "improvements": ["학생 간 상호작용 기회 확대 필요"]
+}, ensure_ascii=False)
+
+class FakeChatOpenAI:
+    """ChatOpenAI 대체 - 네트워크 없이 고정 응답을 지연 시간 후 반환
+
+    프롬프트 종류(질적 분석·청크 평가·구조화 분석·평가 요약·점수 산출)에 맞는 형식의 응답을 돌려주므로
+    파서와 리포트 생성까지 실제와 같은 경로로 실행됩니다.
+    """
+
+    latency = 0.05   # 호출당 기본 지연 (초)
+    jitter = 0.02    # 지연 변동 폭 (초)
+    _random = random.Random(0)
+    _lock = threading.Lock()
+
+    def __init__(self, model: str = "", temperature: float = 0, **kwargs):
+        self.model_name = model
+        self.temperature = temperature
+
+    def stream(self, messages, **kwargs) -> Iterator[AIMessageChunk]:
+        """invoke() 응답을 몇 글자씩 나눠 반환 (첫 조각까지 지연, 마지막 조각에 토큰 사용량)"""
+        kwargs.pop("stream_usage", None)
+        response = self.invoke(messages, **kwargs)
+        content = response.content
+        for start in range(0, len(content), 16):
+            yield AIMessageChunk(content=content[start:start + 16])
+        yield AIMessageChunk(content="", usage_metadata=response.usage_metadata)
+
+    def invoke(self, messages, **kwargs) -> AIMessage:
+        prompt = messages[-1].content
+        if kwargs.get("response_format"):
+            content = STRUCTURED_RESPONSE
+        elif "세 가지 관점" in prompt:
+            content = QUALITATIVE_RESPONSE
+        elif "점수를 산출" in prompt or "점수만 응답" in prompt:
+            content = SCORES_RESPONSE
+        elif "핵심 근거를 요약" in prompt:
+            content = SUMMARY_RESPONSE
+        else:
+            content = ASSESSMENT_RESPONSE
+        with self._lock:
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+        time.sleep(delay)
+        prompt_tokens = sum(estimate_tokens(message.content) for message in messages)
+        completion_tokens = estimate_tokens(content)
+        return AIMessage(content=content, usage_metadata={
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        })
+
+class FakeTranscriber:
+    """aai.Transcriber 대체 - 청크 이름별로 미리 준비한 발화를 지연 시간 후 반환"""
+
+    def __init__(self, chunk_utterances: Dict[str, List[Dict]], latency: float = 0.2):
+        self.chunk_utterances = chunk_utterances
+        self.latency = latency
+
+    def transcribe(self, path, config=None):
+        time.sleep(self.latency)
+        utterances = [types.SimpleNamespace(**utterance) for utterance in self.chunk_utterances[path]]
+        return types.SimpleNamespace(status="completed", error=None, utterances=utterances)
+
+@contextlib.contextmanager
+def fake_backends(llm_latency: float, llm_jitter: float):
+    """벤치마크 동안 LLM을 가짜 백엔드로 바꾸고 캐시·체크포인트를 끔 (반복 실행이 캐시에 맞지 않도록)"""
+    saved = (llm_gateway.create_chat_openai, config.LLM_CACHE_ENABLED, config.CHECKPOINT_ENABLED, config.METRICS_ENABLED)
+    FakeChatOpenAI.latency, FakeChatOpenAI.jitter = llm_latency, llm_jitter
+    FakeChatOpenAI._random = random.Random(0)
+    llm_gateway.create_chat_openai = FakeChatOpenAI
+    llm_gateway.reset_gateway()
+    config.LLM_CACHE_ENABLED = config.CHECKPOINT_ENABLED = config.METRICS_ENABLED = False
+    try:
+        yield
+    finally:
+        llm_gateway.create_chat_openai, config.LLM_CACHE_ENABLED, config.CHECKPOINT_ENABLED, config.METRICS_ENABLED = saved
+        llm_gateway.reset_gateway()
+
+def load_lessons(reports_dir: Optional[str] = None) -> List[Tuple[str, List[Dict]]]:
+    """저장된 리포트의 (이름, 발화 목록) - 발화가 있는 전사문만"""
+    lessons = []
+    for teacher, report_id, report_dir in iter_report_dirs(reports_dir):
+        transcript_path = os.path.join(report_dir, "transcript.json")
+        if not os.path.exists(transcript_path):
+            continue
+        utterances = [
+            {key: utterance.get(key) for key in ("speaker", "text", "start", "end")}
+            for utterance in load_transcript_utterances(transcript_path)
+            if utterance.get("text")
+        ]
+        if utterances:
+            lessons.append((f"{teacher}/{report_id}", utterances))
+    return lessons
+
+def lesson_minutes(utterances: List[Dict]) -> float:
+    return (utterances[-1]["end"] - utterances[0]["start"]) / 60000 if utterances else 0.0
+
+def synthetic_lesson(lessons: List[Tuple[str, List[Dict]]], hours: float) -> Tuple[str, List[Dict]]:
+    """실제 수업들을 시간 순서대로 이어 붙여 지정한 길이의 수업 생성"""
+    target_ms = int(hours * 3600 * 1000)
+    utterances: List[Dict] = []
+    offset = 0
+    while offset < target_ms:
+        for _, source in lessons:
+            base = source[0]["start"]
+            for utterance in source:
+                utterances.append(dict(
+                    utterance,
+                    start=utterance["start"] - base + offset,
+                    end=utterance["end"] - base + offset
+                ))
+            offset = utterances[-1]["end"] + 1000
+            if offset >= target_ms:
+                break
+    return f"synthetic/{hours:g}h", utterances
+
+def select_lessons(lessons: List[Tuple[str, List[Dict]]], synthetic_hours: List[float]) -> List[Tuple[str, List[Dict]]]:
+    """짧은 수업(중간 길이), 가장 긴 실제 수업, 합성 장시간 수업 선택"""
+    by_length = sorted(lessons, key=lambda lesson: (lesson_minutes(lesson[1]), lesson[0]))
+    selected = [by_length[len(by_length) // 2], by_length[-1]]
+    selected += [synthetic_lesson(by_length, hours) for hours in synthetic_hours]
+    return selected
+
+def split_for_transcription(utterances: List[Dict], chunk_minutes: int = 10) -> Tuple[Dict[str, List[Dict]], List[str], List[int]]:
+    """발화를 전사 청크 단위(기본 10분)로 나누고 청크 기준 타임스탬프로 변환"""
+    chunk_ms = chunk_minutes * 60 * 1000
+    base = utterances[0]["start"]
+    chunk_utterances: Dict[str, List[Dict]] = {}
+    for utterance in utterances:
+        index = (utterance["start"] - base) // chunk_ms
+        chunk_start = base + index * chunk_ms
+        chunk_utterances.setdefault(f"chunk_{index}", []).append(dict(
+            utterance,
+            start=utterance["start"] - chunk_start,
+            end=utterance["end"] - chunk_start
+        ))
+    names = sorted(chunk_utterances, key=lambda name: int(name.split("_")[1]))
+    offsets = [base + int(name.split("_")[1]) * chunk_ms for name in names]
+    return chunk_utterances, names, offsets
+
+def run_stages(utterances: List[Dict], transcribe_latency: float, measure: Callable) -> None:
+    """파이프라인 단계를 순서대로 실행하며 measure(단계 이름, 함수)로 측정"""
+    chunk_utterances, names, offsets = split_for_transcription(utterances)
+    transcriber = FakeTranscriber(chunk_utterances, transcribe_latency)
+    chunks = measure("transcribe", lambda: text_transcript.transcribe_chunks(
+        names, "benchmark", transcriber=transcriber, offsets=offsets
+    ))
+    chunks = measure("roles", lambda: text_transcript.assign_chunk_roles(chunks))
+    raw_text = "#Lecture transcript\n\n" + "".join(
+        f"{utterance['speaker']}: {utterance['text']}\n" for chunk in chunks for utterance in chunk
+    )
+
+    processor = TeachingDataProcessor(raw_text)
+    measure("extract", processor.extract_conversations)
+    measure("patterns", processor.analyze_patterns)
+    processed_data = measure("process", lambda: process_teaching_text(raw_text))
+    assessment = measure("assess", lambda: TeachingAssessor().assess_teaching(processed_data))
+    measure("render", lambda: generate_fancy_report(assessment))
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def latency_summary(values: List[float]) -> Dict[str, float]:
+    return {
+        "p50": round(percentile(values, 0.5), 6),
+        "p95": round(percentile(values, 0.95), 6),
+        "mean": round(statistics.fmean(values), 6),
+        "min": round(min(values), 6),
+        "runs": len(values)
+    }
+
+def benchmark_lesson(name: str, utterances: List[Dict], repeat: int, transcribe_latency: float) -> Dict:
+    """수업 하나를 repeat회 실행해 단계별 지연 시간을, 별도 1회 실행으로 최대 메모리를 측정"""
+    timings: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    llm_latencies: List[float] = []
+    llm_tokens = {"prompt_tokens": 0, "completion_tokens": 0, "calls": 0}
+
+    def timed(stage, func):
+        started = time.perf_counter()
+        result = func()
+        timings[stage].append(time.perf_counter() - started)
+        return result
+
+    for run in range(repeat):
+        metrics = start_run(lesson=name)
+        run_stages(utterances, transcribe_latency, timed)
+        if run == 0:
+            for call in metrics.llm_calls:
+                llm_latencies.append(call["seconds"])
+                llm_tokens["calls"] += 1
+                llm_tokens["prompt_tokens"] += call["prompt_tokens"]
+                llm_tokens["completion_tokens"] += call["completion_tokens"]
+
+    # tracemalloc은 실행을 느리게 하므로 시간 측정과 분리
+    peak_mb: Dict[str, float] = {}
+
+    def traced(stage, func):
+        tracemalloc.start()
+        try:
+            return func()
+        finally:
+            peak_mb[stage] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 3)
+            tracemalloc.stop()
+
+    start_run(lesson=name)
+    run_stages(utterances, transcribe_latency, traced)
+
+    n_utterances = len(utterances)
+    n_chars = sum(len(utterance["text"]) for utterance in utterances)
+    stages = {}
+    for stage in STAGES:
+        summary = latency_summary(timings[stage])
+        summary["utterances_per_sec"] = round(n_utterances / summary["p50"], 1) if summary["p50"] else None
+        summary["peak_mb"] = peak_mb.get(stage)
+        stages[stage] = summary
+    return {
+        "lesson": name,
+        "utterances": n_utterances,
+        "chars": n_chars,
+        "minutes": round(lesson_minutes(utterances), 1),
+        "stages": stages,
+        "llm": dict(llm_tokens, latency=latency_summary(llm_latencies) if llm_latencies else None)
+    }
+
+def git_revision() -> Dict[str, Optional[str]]:
+    """결과를 커밋별로 비교할 수 있도록 현재 커밋과 작업 트리 변경 여부 기록"""
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=repo_dir, text=True).strip()
+        dirty = bool(subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"], cwd=repo_dir, text=True).strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+def run_benchmark(
+    repeat: int = 3,
+    synthetic_hours: Optional[List[float]] = None,
+    llm_latency: float = 0.05,
+    llm_jitter: float = 0.02,
+    transcribe_latency: float = 0.2,
+    reports_dir: Optional[str] = None
+) -> Dict:
+    synthetic_hours = [1.0, 3.0] if synthetic_hours is None else synthetic_hours
+    lessons = select_lessons(load_lessons(reports_dir), synthetic_hours)
+    results = []
+    with fake_backends(llm_latency, llm_jitter):
+        for name, utterances in lessons:
+            print(f"벤치마크: {name} ({len(utterances)}개 발화, {lesson_minutes(utterances):.0f}분)", file=sys.stderr)
+            # 파이프라인 진행 로그는 측정 결과 출력과 섞이지 않도록 숨김
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                results.append(benchmark_lesson(name, utterances, repeat, transcribe_latency))
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "repeat": repeat,
+            "llm_latency": llm_latency,
+            "llm_jitter": llm_jitter,
+            "transcribe_latency": transcribe_latency,
+            "llm_max_concurrency": config.LLM_MAX_CONCURRENCY,
+            "transcribe_max_concurrency": config.TRANSCRIBE_MAX_CONCURRENCY,
+            "model": config.OPENAI_MODEL
+        },
+        "lessons": results
+    }
+
+def format_results(results: Dict, baseline: Optional[Dict] = None) -> str:
+    """단계별 p50/p95·처리량·최대 메모리 표 (baseline이 있으면 p50 변화율 포함)"""
+    baseline_stages = {
+        lesson["lesson"]: lesson["stages"] for lesson in (baseline or {}).get("lessons", [])
+    }
+    lines = [f"commit {results['revision']['commit']}{' (dirty)' if results['revision']['dirty'] else ''}"]
+    for lesson in results["lessons"]:
+        lines.append(f"\n{lesson['lesson']}  {lesson['utterances']} utterances, {lesson['minutes']} min, {lesson['llm']['calls']} LLM calls")
+        lines.append(f"  {'stage':<11}{'p50 s':>10}{'p95 s':>10}{'utt/s':>12}{'peak MB':>10}{'vs base':>10}")
+        for stage, summary in lesson["stages"].items():
+            change = ""
+            base = baseline_stages.get(lesson["lesson"], {}).get(stage)
+            if base and base["p50"]:
+                change = f"{(summary['p50'] / base['p50'] - 1) * 100:+.1f}%"
+            lines.append(
+                f"  {stage:<11}{summary['p50']:>10.4f}{summary['p95']:>10.4f}"
+                f"{summary['utterances_per_sec'] or 0:>12.1f}{summary['peak_mb'] or 0:>10.2f}{change:>10}"
+            )
+    return "\n".join(lines)
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="가짜 LLM·전사 백엔드로 저장된 전사문을 재생하는 오프라인 벤치마크")
+    parser.add_argument("--repeat", type=int, default=3, help="수업별 반복 횟수 (p50/p95 계산용)")
+    parser.add_argument("--synthetic-hours", type=float, nargs="*", default=[1.0, 3.0], help="합성 장시간 수업 길이 (시간)")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="가짜 LLM 호출 지연 (초)")
+    parser.add_argument("--llm-jitter", type=float, default=0.02, help="가짜 LLM 지연 변동 폭 (초)")
+    parser.add_argument("--transcribe-latency", type=float, default=0.2, help="가짜 전사 청크당 지연 (초)")
+    parser.add_argument("--reports-dir", help=f"전사문 디렉토리 (기본값: {config.REPORTS_DIR})")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(
+        repeat=args.repeat,
+        synthetic_hours=args.synthetic_hours,
+        llm_latency=args.llm_latency,
+        llm_jitter=args.llm_jitter,
+        transcribe_latency=args.transcribe_latency,
+        reports_dir=args.reports_dir
+    )
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print(format_results(results, baseline))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
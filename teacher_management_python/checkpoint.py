@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Optional
+import config as config
+
+def content_hash(value: Any) -> str:
+    """JSON 직렬화 결과의 SHA-256 (청크·프롬프트 식별용)"""
+    raw = json.dumps(value, ensure_ascii=False, sort_keys=True, default=_encode_default)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def _encode_default(value: Any):
+    if isinstance(value, set):
+        return {"__set__": sorted(value)}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _decode_hook(value: dict):
+    if set(value) == {"__set__"}:
+        return set(value["__set__"])
+    return value
+
+class CheckpointStore:
+    """입력 해시별 디렉토리에 단계·청크 결과를 JSON으로 저장
+
+    각 항목은 임시 파일에 쓴 뒤 이름을 바꾸므로 중간에 중단되어도 손상된 체크포인트가 남지 않습니다.
+    """
+
+    def __init__(self, key: str, root: Optional[str] = None):
+        self.key = key
+        self.path = os.path.join(root or config.CHECKPOINT_DIR, key)
+
+    @classmethod
+    def for_input(cls, raw_text: str, root: Optional[str] = None) -> "CheckpointStore":
+        """입력 전사문과 모델 이름으로 체크포인트 위치 결정"""
+        digest = hashlib.sha256(f"{config.OPENAI_MODEL}\n{raw_text}".encode("utf-8")).hexdigest()
+        return cls(digest[:32], root)
+
+    @classmethod
+    def for_file(cls, path: str, root: Optional[str] = None) -> "CheckpointStore":
+        """입력 파일 내용(블록 단위로 해시)과 모델 이름으로 체크포인트 위치 결정"""
+        digest = hashlib.sha256(f"{config.OPENAI_MODEL}\n".encode("utf-8"))
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return cls(digest.hexdigest()[:32], root)
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.json")
+
+    def has(self, name: str) -> bool:
+        return os.path.exists(self._file(name))
+
+    def load(self, name: str) -> Optional[Any]:
+        try:
+            with open(self._file(name), 'r', encoding='utf-8') as f:
+                return json.load(f, object_hook=_decode_hook)
+        except FileNotFoundError:
+            return None
+
+    def save(self, name: str, value: Any) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        # 같은 내용의 청크를 여러 스레드가 동시에 저장할 수 있으므로 임시 파일은 저장마다 고유하게 생성
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix=f"{name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(value, f, ensure_ascii=False, default=_encode_default)
+            os.replace(tmp_path, self._file(name))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def clear(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -0,0 +1,131 @@
+from typing import List, Optional, Sequence, Tuple
+import config as config
+
+DEFAULT_TOKEN_BUDGET = 3000
+_encodings = {}
+
+def _get_encoding(model: Optional[str]):
+    """모델용 tiktoken 인코딩 (사용할 수 없으면 None)"""
+    model = model or config.OPENAI_MODEL
+    if model not in _encodings:
+        encoding = None
+        try:
+            import tiktoken  # 선택 의존성 - 없으면 문자 수 기반으로 추정
+            try:
+                encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            # 미설치이거나 인코딩 파일을 내려받을 수 없는 환경 등
+            encoding = None
+        _encodings[model] = encoding
+    return _encodings[model]
+
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    """텍스트 토큰 수 추정 (tiktoken을 쓸 수 있으면 정확히 계산)"""
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    # 영어 전사문 기준 약 4자당 1토큰
+    return len(text) // 4 + 1
+
+def token_budget_for(model: Optional[str] = None) -> int:
+    if config.CHUNK_TOKEN_BUDGET:
+        return config.CHUNK_TOKEN_BUDGET
+    return config.MODEL_TOKEN_BUDGETS.get(model or config.OPENAI_MODEL, DEFAULT_TOKEN_BUDGET)
+
+class StreamingChunker:
+    """발화를 하나씩 받아 완성된 청크를 바로 내보내는 청크 분할기
+
+    chunk_conversation과 같은 규칙으로 자르되, 다음 발화가 들어와 예산 초과가
+    확정된 시점에 청크를 내보냅니다. 전사가 끝나기 전에 청크 분석을 시작할 때 사용합니다.
+    """
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = None,
+        overlap_tokens: Optional[int] = None,
+        model: Optional[str] = None
+    ):
+        self.model = model
+        self.token_budget = token_budget if token_budget is not None else token_budget_for(model)
+        if overlap_tokens is None:
+            overlap_tokens = config.CHUNK_OVERLAP_TOKENS
+        # 오버랩이 예산의 절반을 넘으면 청크가 거의 전진하지 못하므로 제한
+        self.overlap_tokens = min(overlap_tokens, self.token_budget // 2)
+        self._turns: List[Tuple[str, str]] = []  # 아직 청크로 확정되지 않은 발화 (오버랩 포함)
+        self._costs: List[int] = []
+
+    def add(self, turn: Tuple[str, str]) -> List[List[Tuple[str, str]]]:
+        """발화 하나를 추가하고, 이로써 확정된 청크 목록을 반환"""
+        speaker, text = turn
+        self._turns.append(turn)
+        # "화자: 발화\n" 형식으로 프롬프트에 들어가는 토큰 수
+        self._costs.append(estimate_tokens(f"{speaker}: {text}\n", self.model))
+
+        chunks = []
+        while True:
+            end = self._next_cut()
+            if end is None:
+                return chunks
+            chunks.append(self._turns[:end])
+            self._advance(end)
+
+    def flush(self) -> List[List[Tuple[str, str]]]:
+        """남은 발화를 마지막 청크로 내보냄"""
+        chunks = [self._turns] if self._turns else []
+        self._turns, self._costs = [], []
+        return chunks
+
+    def _next_cut(self) -> Optional[int]:
+        """버퍼 앞쪽 청크의 끝 위치 (버퍼 안에서 예산 초과가 확정되지 않았으면 None)
+
+        - 발화는 쪼개지 않으며, 예산을 넘기 직전의 화자 전환 지점에서 청크를 끊습니다
+          (전환 지점이 청크 앞쪽 절반 안에 있으면 예산까지 채웁니다).
+        """
+        costs = self._costs
+        n = len(costs)
+        end = 0
+        used = 0
+        last_turn = None  # 청크 안에서 마지막 화자 전환 위치 (해당 발화 앞에서 끊음)
+        while end < n and (end == 0 or used + costs[end] <= self.token_budget):
+            if end > 0 and self._turns[end][0] != self._turns[end - 1][0]:
+                last_turn = end
+            used += costs[end]
+            end += 1
+        if end >= n:
+            return None
+
+        if last_turn is not None and sum(costs[:last_turn]) >= self.token_budget // 2:
+            end = last_turn
+        return end
+
+    def _advance(self, end: int) -> None:
+        """다음 청크 시작점: 오버랩 예산 안의 마지막 발화들, 단 반드시 전진"""
+        start = end
+        overlap_used = 0
+        while start - 1 > 0 and overlap_used + self._costs[start - 1] <= self.overlap_tokens:
+            start -= 1
+            overlap_used += self._costs[start]
+        del self._turns[:start]
+        del self._costs[:start]
+
+def chunk_conversation(
+    conversation: Sequence[Tuple[str, str]],
+    token_budget: Optional[int] = None,
+    overlap_tokens: Optional[int] = None,
+    model: Optional[str] = None
+) -> List[List[Tuple[str, str]]]:
+    """(화자, 발화) 목록을 토큰 예산 안에서 최대한 크게 묶어 청크로 분할
+
+    - 발화는 쪼개지 않으며, 예산을 넘기 직전의 화자 전환 지점에서 청크를 끊습니다
+      (전환 지점이 청크 앞쪽 절반 안에 있으면 예산까지 채웁니다).
+    - 다음 청크는 직전 청크의 마지막 발화들(overlap_tokens 이내)을 문맥으로 포함합니다.
+    - 마지막 발화를 포함한 청크를 만들면 종료하므로 앞 청크의 부분집합인 청크는 생기지 않습니다.
+    """
+    chunker = StreamingChunker(token_budget, overlap_tokens, model)
+    chunks = []
+    for turn in conversation:
+        chunks.extend(chunker.add(turn))
+    chunks.extend(chunker.flush())
+    return chunks
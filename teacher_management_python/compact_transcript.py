@@ -0,0 +1,182 @@
+import json
+import os
+import sys
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+
+COMPACT_DIRNAME = "transcript.compact"
+FORMAT_VERSION = 1
+
+# 열 이름 -> dtype (파일명은 <열 이름>.npy)
+WORD_COLUMNS = {
+    "words_start": np.int32,
+    "words_end": np.int32,
+    "words_conf": np.float16,
+    "words_token": np.int32,
+    "words_speaker": np.uint8
+}
+UTTERANCE_COLUMNS = {
+    "utt_start": np.int32,
+    "utt_end": np.int32,
+    "utt_conf": np.float32,
+    "utt_speaker": np.uint8,
+    "utt_offsets": np.int64  # 발화 i의 단어 범위 = [utt_offsets[i], utt_offsets[i + 1])
+}
+
+def compact_path_for(transcript_path: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(transcript_path)), COMPACT_DIRNAME)
+
+def convert_transcript(transcript_path: str, out_dir: Optional[str] = None) -> str:
+    """AssemblyAI transcript.json을 열 단위 압축 형식으로 변환
+
+    최상위 words 배열은 utterances[].words를 이어 붙인 것과 같으므로 저장하지 않고,
+    단어 텍스트는 중복 없는 단어 표(vocab)의 인덱스로 저장합니다.
+    """
+    with open(transcript_path, 'r', encoding='utf-8-sig') as f:
+        transcript = json.load(f)
+    out_dir = out_dir or compact_path_for(transcript_path)
+    os.makedirs(out_dir, exist_ok=True)
+
+    utterances = transcript.get("utterances") or []
+    vocab: Dict[str, int] = {}
+    speakers: Dict[str, int] = {}
+    n_words = sum(len(u.get("words", [])) for u in utterances)
+
+    columns = {name: np.zeros(n_words, dtype=dtype) for name, dtype in WORD_COLUMNS.items()}
+    columns.update({name: np.zeros(len(utterances), dtype=dtype) for name, dtype in UTTERANCE_COLUMNS.items()})
+    columns["utt_offsets"] = np.zeros(len(utterances) + 1, dtype=np.int64)
+
+    w = 0
+    for i, utterance in enumerate(utterances):
+        columns["utt_start"][i] = utterance.get("start", 0)
+        columns["utt_end"][i] = utterance.get("end", 0)
+        columns["utt_conf"][i] = utterance.get("confidence", 0.0)
+        columns["utt_speaker"][i] = speakers.setdefault(utterance.get("speaker", ""), len(speakers))
+        for word in utterance.get("words", []):
+            columns["words_start"][w] = word.get("start", 0)
+            columns["words_end"][w] = word.get("end", 0)
+            columns["words_conf"][w] = word.get("confidence", 0.0)
+            columns["words_token"][w] = vocab.setdefault(word.get("text", ""), len(vocab))
+            columns["words_speaker"][w] = speakers.setdefault(word.get("speaker") or utterance.get("speaker", ""), len(speakers))
+            w += 1
+        columns["utt_offsets"][i + 1] = w
+
+    for name, array in columns.items():
+        np.save(os.path.join(out_dir, f"{name}.npy"), array)
+
+    header = {key: value for key, value in transcript.items() if key not in ("text", "words", "utterances")}
+    meta = {
+        "version": FORMAT_VERSION,
+        "header": header,
+        "speakers": list(speakers),
+        "vocab": list(vocab),
+        # 원본 text가 발화 text를 공백으로 이은 것과 다르면 그대로 보관
+        "text": None
+    }
+    if transcript.get("text") != " ".join(u.get("text", "") for u in utterances):
+        meta["text"] = transcript.get("text")
+    with open(os.path.join(out_dir, "meta.json"), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    return out_dir
+
+class CompactTranscript:
+    """압축 전사 파일을 메모리 매핑으로 열어 필요한 발화 범위만 읽는 로더"""
+
+    def __init__(self, path: str):
+        if os.path.basename(path) == "transcript.json":
+            path = compact_path_for(path)
+        self.path = path
+        with open(os.path.join(path, "meta.json"), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compact transcript version: {meta.get('version')}")
+        self.header = meta["header"]
+        self.speakers: List[str] = meta["speakers"]
+        self.vocab: List[str] = meta["vocab"]
+        self._text = meta.get("text")
+        for name in list(WORD_COLUMNS) + list(UTTERANCE_COLUMNS):
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r'))
+
+    @staticmethod
+    def exists_for(transcript_path: str) -> bool:
+        return os.path.exists(os.path.join(compact_path_for(transcript_path), "meta.json"))
+
+    def __len__(self) -> int:
+        return len(self.utt_start)
+
+    def word_range(self, index: int) -> slice:
+        return slice(int(self.utt_offsets[index]), int(self.utt_offsets[index + 1]))
+
+    def text(self, index: int) -> str:
+        tokens = self.words_token[self.word_range(index)]
+        return " ".join(self.vocab[t] for t in tokens)
+
+    def words(self, index: int) -> List[Dict]:
+        span = self.word_range(index)
+        return [
+            {
+                "text": self.vocab[token],
+                "start": int(start),
+                "end": int(end),
+                "confidence": round(float(conf), 4),
+                "speaker": self.speakers[speaker]
+            }
+            for token, start, end, conf, speaker in zip(
+                self.words_token[span], self.words_start[span], self.words_end[span],
+                self.words_conf[span], self.words_speaker[span]
+            )
+        ]
+
+    def utterance(self, index: int, with_words: bool = False) -> Dict:
+        """AssemblyAI utterances[index]와 같은 형식의 dict (confidence는 float16/32 정밀도)"""
+        utterance = {
+            "speaker": self.speakers[self.utt_speaker[index]],
+            "text": self.text(index),
+            "confidence": round(float(self.utt_conf[index]), 6),
+            "start": int(self.utt_start[index]),
+            "end": int(self.utt_end[index])
+        }
+        if with_words:
+            utterance["words"] = self.words(index)
+        return utterance
+
+    def iter_utterances(self, start: int = 0, stop: Optional[int] = None, with_words: bool = False) -> Iterator[Dict]:
+        stop = len(self) if stop is None else min(stop, len(self))
+        for index in range(start, stop):
+            yield self.utterance(index, with_words)
+
+    def to_dict(self) -> Dict:
+        """원본 transcript.json 구조로 복원 (최상위 words/text 포함)"""
+        utterances = list(self.iter_utterances(with_words=True))
+        transcript = dict(self.header)
+        transcript["text"] = self._text if self._text is not None else " ".join(u["text"] for u in utterances)
+        transcript["words"] = [word for u in utterances for word in u["words"]]
+        transcript["utterances"] = utterances
+        return transcript
+
+def main(paths: List[str]) -> None:
+    """사용법: python compact_transcript.py <transcript.json 또는 디렉토리>...
+
+    디렉토리를 주면 하위의 모든 transcript.json을 변환합니다.
+    """
+    if not paths:
+        print(main.__doc__)
+        sys.exit(1)
+    for path in paths:
+        targets = [path]
+        if os.path.isdir(path):
+            targets = [
+                os.path.join(root, "transcript.json")
+                for root, _, files in os.walk(path) if "transcript.json" in files
+            ]
+        for target in sorted(targets):
+            with open(target, 'r', encoding='utf-8-sig') as f:
+                if "utterances" not in json.load(f):
+                    print(f"건너뜀 (utterances 없음): {target}")
+                    continue
+            out_dir = convert_transcript(target)
+            size = sum(os.path.getsize(os.path.join(out_dir, name)) for name in os.listdir(out_dir))
+            print(f"{target}: {os.path.getsize(target):,} -> {size:,} bytes")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, List, Optional, TypeVar
+import config as config
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+def map_ordered(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: Optional[int] = None,
+    on_complete: Optional[Callable[[int, R], None]] = None
+) -> List[R]:
+    """항목별로 func를 동시에 실행하고 결과를 입력 순서대로 반환
+
+    Args:
+        func: 각 항목에 적용할 함수 (LLM 호출 등 I/O 대기 위주의 작업)
+        items: 처리할 항목 목록
+        max_workers: 동시에 실행할 최대 작업 수 (기본값: config.LLM_MAX_CONCURRENCY, 1 이하면 순차 실행)
+        on_complete: 작업 하나가 끝날 때마다 (인덱스, 결과)로 호출되는 콜백 (진행률 표시용)
+    """
+    items = list(items)
+    if max_workers is None:
+        max_workers = config.LLM_MAX_CONCURRENCY
+    max_workers = min(max_workers, len(items))
+
+    # 동시 실행이 의미 없는 경우 기존과 동일하게 순차 처리
+    if max_workers <= 1:
+        results = []
+        for i, item in enumerate(items):
+            result = func(item)
+            if on_complete:
+                on_complete(i, result)
+            results.append(result)
+        return results
+
+    results: List[Optional[R]] = [None] * len(items)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {executor.submit(func, item): i for i, item in enumerate(items)}
+        for future in as_completed(futures):
+            i = futures[future]
+            results[i] = future.result()
+            if on_complete:
+                on_complete(i, results[i])
+    except BaseException:
+        # 하나라도 실패하면 아직 시작하지 않은 작업은 취소 (실행 중인 작업은 끝까지 진행)
+        executor.shutdown(wait=True, cancel_futures=True)
+        raise
+    executor.shutdown(wait=True)
+    return results
+
+def release_in_order(callback: Callable[[int, R], None]) -> Callable[[int, R], None]:
+    """완료 순서와 관계없이 앞선 결과가 모두 도착한 구간까지만 인덱스 순서대로 callback 호출
+
+    map_ordered의 on_complete에 넘겨 청크 결과를 시간 순서대로 흘려보낼 때 사용합니다.
+    """
+    finished = {}
+    next_index = 0
+
+    def on_complete(index: int, result: R) -> None:
+        nonlocal next_index
+        finished[index] = result
+        while next_index in finished:
+            callback(next_index, finished.pop(next_index))
+            next_index += 1
+
+    return on_complete
@@ -1,8 +1,21 @@
 import os
-from dotenv import load_dotenv
+
+def _load_dotenv():
+    """config.py 위치부터 상위 디렉토리로 .env를 찾아 로드 (없으면 python-dotenv를 임포트하지 않음)"""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return
+        directory = parent
 
 # Load environment variables from .env file
-load_dotenv()
+_load_dotenv()
 
 # API Keys - should be set in environment variables or .env file
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "your_openai_api_key_here")
@@ -12,4 +25,104 @@ STABILITY_API_KEY = os.getenv("STABILITY_API_KEY", "your_stability_api_key_here"
 AAI_API_KEY = os.getenv("AAI_API_KEY", "your_assemblyai_api_key_here")
 
 # API URLs
-SD_API_URL = "https://api.stability.ai/v2beta/stable-image/generate/sd3"
\ No newline at end of file
+SD_API_URL = "https://api.stability.ai/v2beta/stable-image/generate/sd3"
+
+# LLM 동시 호출 제한 (1이면 순차 실행)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+
+# OpenAI 모델 설정
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1-2025-04-14")
+
+# LLM 응답 디스크 캐시 설정
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "teacher-management", "llm_cache.sqlite3")
+)
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "512"))
+# temperature > 0 인 호출(문제 생성 등)도 캐시할지 여부
+LLM_CACHE_NONZERO_TEMPERATURE = os.getenv("LLM_CACHE_NONZERO_TEMPERATURE", "0").lower() in ("1", "true", "yes")
+
+# AssemblyAI 동시 전사 작업 수 제한
+TRANSCRIBE_MAX_CONCURRENCY = int(os.getenv("TRANSCRIBE_MAX_CONCURRENCY", "4"))
+
+# 오디오 분할 방식: "silence" (ffmpeg 스트리밍 + 무음 지점 정렬) 또는 "fixed" (10분 고정 길이)
+AUDIO_SEGMENT_MODE = os.getenv("AUDIO_SEGMENT_MODE", "silence")
+AUDIO_SEGMENT_TOLERANCE_SEC = int(os.getenv("AUDIO_SEGMENT_TOLERANCE_SEC", "30"))
+
+# 정량 분석 패턴 테이블 확장용 JSON 파일 경로 (기본 테이블에 병합됨)
+PATTERN_TABLES_PATH = os.getenv("PATTERN_TABLES_PATH")
+
+# 저장된 수업 리포트 경로 (public/reports/<teacher>/<reportId>/)
+REPORTS_DIR = os.getenv(
+    "REPORTS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "public", "reports")
+)
+# 교사별 누적 통계 파일 경로
+TEACHER_PROFILES_PATH = os.getenv("TEACHER_PROFILES_PATH", os.path.join(REPORTS_DIR, "teacher_profiles.json"))
+
+# 전사문 역색인 파일 경로
+TRANSCRIPT_INDEX_PATH = os.getenv("TRANSCRIPT_INDEX_PATH", os.path.join(REPORTS_DIR, "transcript_index.json"))
+
+# 대화 청크 토큰 예산 (모델별, 대화 본문 기준) 및 청크 간 중복 토큰 수
+MODEL_TOKEN_BUDGETS = {
+    "gpt-4.1-2025-04-14": 4000,
+    "gpt-4o": 4000,
+    "gpt-4": 2000
+}
+CHUNK_TOKEN_BUDGET = int(os.getenv("CHUNK_TOKEN_BUDGET", "0")) or None  # 설정 시 모델별 값보다 우선
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "150"))
+
+# 배치 모드 동시 처리 수업 수 (프로세스 수)
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "2"))
+
+# 단계별 체크포인트 (실패 후 재실행 시 이어서 처리)
+CHECKPOINT_ENABLED = os.getenv("CHECKPOINT_ENABLED", "1").lower() not in ("0", "false", "no")
+CHECKPOINT_DIR = os.getenv(
+    "CHECKPOINT_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "teacher-management", "checkpoints")
+)
+
+# 스트리밍 모드: 전사 → 분석 사이 대기열에 쌓아 둘 전사 청크 수 (가득 차면 전사 결과 전달이 대기)
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "4"))
+
+# 단계별 성능 지표 저장 (JSON + Prometheus 텍스트 형식), 디렉토리 미설정 시 리포트 옆에 저장
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "no")
+METRICS_DIR = os.getenv("METRICS_DIR") or None
+
+# 공유 LLM 게이트웨이: 프로세스 전체 동시 요청 수, 요청 타임아웃·재시도, HTTP 연결 풀
+LLM_GATEWAY_MAX_IN_FLIGHT = int(os.getenv("LLM_GATEWAY_MAX_IN_FLIGHT", str(LLM_MAX_CONCURRENCY)))
+LLM_TIMEOUT_SEC = float(os.getenv("LLM_TIMEOUT_SEC", "120"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "16"))
+LLM_HTTP_KEEPALIVE_SEC = float(os.getenv("LLM_HTTP_KEEPALIVE_SEC", "60"))
+
+# 업로드 전 음성 구간 검출(VAD)로 긴 무음 제거 (발화 타임스탬프는 원본 영상 기준으로 복원)
+VAD_ENABLED = os.getenv("VAD_ENABLED", "0").lower() in ("1", "true", "yes")
+VAD_MIN_SILENCE_SEC = float(os.getenv("VAD_MIN_SILENCE_SEC", "3"))
+VAD_PADDING_MS = int(os.getenv("VAD_PADDING_MS", "300"))
+
+# 전사 업로드용 음성 인코딩 (16kHz 모노): "opus", "flac", "mp3"
+AUDIO_CODEC = os.getenv("AUDIO_CODEC", "opus")
+
+# 최종 점수 산출 입력 크기 제한: 세부 평가가 예산(토큰)을 넘으면 묶음(fanout개) 단위로 요약을 반복
+SCORING_INPUT_TOKEN_BUDGET = int(os.getenv("SCORING_INPUT_TOKEN_BUDGET", "3000"))
+SCORING_REDUCE_FANOUT = int(os.getenv("SCORING_REDUCE_FANOUT", "4"))
+# 점수 산출에 넣을 질적 분석 항목 수 (영역별, 수업 전체에서 고르게 선택)
+SCORING_QUALITATIVE_ITEMS = int(os.getenv("SCORING_QUALITATIVE_ITEMS", "5"))
+
+# 청크별 우수점·개선점의 유사 문장 병합 (문자 shingle MinHash/LSH, 추정 자카드 유사도 기준)
+DEDUP_SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", "0.5"))
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "64"))
+DEDUP_SHINGLE_SIZE = int(os.getenv("DEDUP_SHINGLE_SIZE", "3"))
+
+# 구조화 출력 모드: 청크마다 JSON 스키마 응답 한 번으로 질적 분석과 평가를 함께 받음 (검증 실패 시 기존 두 단계 방식)
+STRUCTURED_ANALYSIS = os.getenv("STRUCTURED_ANALYSIS", "0").lower() in ("1", "true", "yes")
+
+# 개념 팝업 캐시 (정규화한 개념 이름 기준, 생성 온도와 관계없이 재사용) 및 수업 분석 후 수업 주제 개념 미리 생성
+CONCEPT_CACHE_ENABLED = os.getenv("CONCEPT_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+CONCEPT_CACHE_PATH = os.getenv(
+    "CONCEPT_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "teacher-management", "concept_cache.sqlite3")
+)
+CONCEPT_PREWARM_ENABLED = os.getenv("CONCEPT_PREWARM_ENABLED", "1").lower() not in ("0", "false", "no")
@@ -0,0 +1,315 @@
+import json
+import os
+import re
+import sys
+from typing import Dict, List, Optional, Set
+import numpy as np
+import pandas as pd
+import config as config
+from compact_transcript import CompactTranscript
+from report_files import iter_report_dirs, load_transcript_utterances, read_json
+
+# 평가 영역 이름 정규화 (리포트 버전에 따라 키 이름이 다름)
+SCORE_CATEGORIES = ["학생_참여", "개념_설명", "피드백", "체계성", "상호작용"]
+SCORE_KEYWORDS = [
+    ("참여", "학생_참여"),
+    ("개념", "개념_설명"),
+    ("피드백", "피드백"),
+    ("체계", "체계성"),
+    ("상호작용", "상호작용")
+]
+# 초기 리포트의 문자열 형식 점수 (예: "1. 학생 참여도: 15/20", "학생 참여도: 17점")
+TEXT_SCORE_RE = re.compile(r"^\s*(?:\d+\.)?\s*([^:\n]+?)\s*:\s*(\d+)\s*(?:/\s*20|점)", re.MULTILINE)
+
+def normalize_category(name: str) -> Optional[str]:
+    for keyword, category in SCORE_KEYWORDS:
+        if keyword in name:
+            return category
+    return None
+
+def parse_scores(analysis) -> Dict[str, int]:
+    """analysis.json 내용(dict 또는 초기 문자열 형식)에서 영역별 점수 추출"""
+    scores = {}
+    if isinstance(analysis, dict):
+        items = (analysis.get("scores") or {}).items()
+    elif isinstance(analysis, str):
+        items = TEXT_SCORE_RE.findall(analysis)
+    else:
+        items = []
+    for name, value in items:
+        category = normalize_category(name)
+        if category and category not in scores:
+            scores[category] = int(value)
+    return scores
+
+def load_utterance_table(utterances: List[Dict]) -> Dict[str, np.ndarray]:
+    """발화 목록을 열 단위 배열로 변환 (words 배열은 개수만 사용)"""
+    n = len(utterances)
+    speakers = np.empty(n, dtype=object)
+    start = np.zeros(n, dtype=np.int32)
+    end = np.zeros(n, dtype=np.int32)
+    n_words = np.zeros(n, dtype=np.int32)
+    n_chars = np.zeros(n, dtype=np.int32)
+    for i, utterance in enumerate(utterances):
+        speakers[i] = utterance.get("speaker", "")
+        start[i] = utterance.get("start", 0)
+        end[i] = utterance.get("end", 0)
+        text = utterance.get("text", "")
+        n_chars[i] = len(text)
+        n_words[i] = len(utterance["words"]) if "words" in utterance else len(text.split())
+    return {"speaker": speakers, "start": start, "end": end, "n_words": n_words, "n_chars": n_chars}
+
+def load_compact_utterance_table(compact: CompactTranscript) -> Dict[str, np.ndarray]:
+    """압축 전사 파일의 배열에서 바로 발화 열 생성 (JSON 파싱 없음)"""
+    n_words = np.diff(compact.utt_offsets).astype(np.int32)
+    token_lengths = np.fromiter((len(word) for word in compact.vocab), dtype=np.int32, count=len(compact.vocab))
+    utterance_index = np.repeat(np.arange(len(compact)), n_words)
+    n_chars = np.bincount(utterance_index, weights=token_lengths[compact.words_token], minlength=len(compact))
+    return {
+        "speaker": np.asarray(compact.speakers, dtype=object)[compact.utt_speaker],
+        "start": np.asarray(compact.utt_start),
+        "end": np.asarray(compact.utt_end),
+        "n_words": n_words,
+        "n_chars": (n_chars + np.maximum(n_words - 1, 0)).astype(np.int32)
+    }
+
+def load_report_utterance_table(transcript_path: str) -> Dict[str, np.ndarray]:
+    """압축 전사 파일이 있으면 우선 사용하고, 없으면 transcript.json을 읽음"""
+    if CompactTranscript.exists_for(transcript_path):
+        return load_compact_utterance_table(CompactTranscript(transcript_path))
+    return load_utterance_table(load_transcript_utterances(transcript_path))
+
+def summarize_talk_time(utterances: pd.DataFrame) -> pd.DataFrame:
+    """리포트별 발화 시간 통계 (가장 오래 말한 화자를 교사로 간주)"""
+    per_speaker = (
+        utterances.groupby(["teacher", "report_id", "speaker"], observed=True)
+        .agg(speaking_ms=("duration_ms", "sum"), turns=("duration_ms", "size"), words=("n_words", "sum"))
+        .reset_index()
+    )
+    # 리포트마다 발화 시간이 가장 긴 화자 한 명을 교사로 표시
+    per_speaker = per_speaker.sort_values(["teacher", "report_id", "speaking_ms"], ascending=[True, True, False])
+    per_speaker["is_teacher"] = ~per_speaker.duplicated(["teacher", "report_id"])
+    per_report = per_speaker.groupby(["teacher", "report_id"], observed=True)
+
+    role = np.where(per_speaker["is_teacher"], "teacher", "student")
+    summary = per_speaker.pivot_table(
+        index=["teacher", "report_id"],
+        columns=role,
+        values=["speaking_ms", "turns", "words"],
+        aggfunc="sum",
+        fill_value=0,
+        observed=True
+    )
+    summary.columns = [f"{role}_{value}" for value, role in summary.columns]
+    summary = summary.reset_index()
+    for column in ["teacher_speaking_ms", "student_speaking_ms", "teacher_turns", "student_turns"]:
+        if column not in summary:
+            summary[column] = 0
+    total_ms = summary["teacher_speaking_ms"] + summary["student_speaking_ms"]
+    summary["teacher_talk_ratio"] = np.where(total_ms > 0, summary["teacher_speaking_ms"] / total_ms.where(total_ms > 0, 1), np.nan)
+    summary["speakers"] = per_report.size().values
+    return summary
+
+class ReportCorpus:
+    """public/reports 아래 모든 리포트의 발화·점수를 열 단위 프레임으로 적재"""
+
+    def __init__(self, utterances: pd.DataFrame, scores: pd.DataFrame):
+        self.utterances = utterances
+        self.scores = scores
+
+    @classmethod
+    def load(cls, reports_dir: Optional[str] = None) -> "ReportCorpus":
+        utterance_parts = []
+        score_rows = []
+        for teacher, report_id, report_dir in iter_report_dirs(reports_dir):
+            analysis_path = os.path.join(report_dir, "analysis.json")
+            if os.path.exists(analysis_path):
+                scores = parse_scores(read_json(analysis_path))
+                if scores:
+                    score_rows.append({"teacher": teacher, "report_id": int(report_id), **scores})
+
+            transcript_path = os.path.join(report_dir, "transcript.json")
+            if os.path.exists(transcript_path):
+                table = load_report_utterance_table(transcript_path)
+                part = pd.DataFrame(table)
+                part.insert(0, "report_id", int(report_id))
+                part.insert(0, "teacher", teacher)
+                utterance_parts.append(part)
+
+        utterances = pd.concat(utterance_parts, ignore_index=True) if utterance_parts else pd.DataFrame(
+            columns=["teacher", "report_id", "speaker", "start", "end", "n_words", "n_chars"]
+        )
+        utterances["teacher"] = utterances["teacher"].astype("category")
+        utterances["speaker"] = utterances["speaker"].astype("category")
+        utterances["duration_ms"] = (utterances["end"] - utterances["start"]).astype(np.int32)
+
+        scores = pd.DataFrame(score_rows, columns=["teacher", "report_id"] + SCORE_CATEGORIES)
+        scores["teacher"] = scores["teacher"].astype("category")
+        scores["총점"] = scores[SCORE_CATEGORIES].sum(axis=1, min_count=1)
+        scores = scores.sort_values(["teacher", "report_id"], ignore_index=True)
+        return cls(utterances, scores)
+
+    def talk_time(self) -> pd.DataFrame:
+        return summarize_talk_time(self.utterances)
+
+    def score_distribution(self) -> pd.DataFrame:
+        """영역별 점수 분포 (평균, 표준편차, 사분위수)"""
+        columns = SCORE_CATEGORIES + ["총점"]
+        values = self.scores[columns].to_numpy(dtype=np.float64)
+        quantiles = np.nanquantile(values, [0.0, 0.25, 0.5, 0.75, 1.0], axis=0) if len(values) else np.full((5, len(columns)), np.nan)
+        return pd.DataFrame({
+            "count": np.sum(~np.isnan(values), axis=0),
+            "mean": np.nanmean(values, axis=0) if len(values) else np.nan,
+            "std": np.nanstd(values, axis=0) if len(values) else np.nan,
+            "min": quantiles[0],
+            "p25": quantiles[1],
+            "median": quantiles[2],
+            "p75": quantiles[3],
+            "max": quantiles[4]
+        }, index=columns)
+
+    def teacher_trends(self) -> pd.DataFrame:
+        """교사별 총점 추이 (수업 순서에 대한 최소제곱 기울기, 첫·최근 점수)"""
+        frame = self.scores.dropna(subset=["총점"]).copy()
+        frame["x"] = frame.groupby("teacher", observed=True).cumcount().astype(np.float64)
+        frame["y"] = frame["총점"].astype(np.float64)
+        frame["xy"] = frame["x"] * frame["y"]
+        frame["xx"] = frame["x"] * frame["x"]
+        grouped = frame.groupby("teacher", observed=True)
+        sums = grouped[["x", "y", "xy", "xx"]].sum()
+        n = grouped.size()
+        denominator = n * sums["xx"] - sums["x"] ** 2
+        slope = (n * sums["xy"] - sums["x"] * sums["y"]) / denominator.where(denominator != 0)
+        return pd.DataFrame({
+            "lessons": n,
+            "mean_total": sums["y"] / n,
+            "first_total": grouped["y"].first(),
+            "latest_total": grouped["y"].last(),
+            "slope_per_lesson": slope
+        })
+
+class TeacherProfileStore:
+    """교사별 누적 통계 - 새 리포트가 추가될 때 전체 디렉토리를 다시 읽지 않고 O(1)로 갱신"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.TEACHER_PROFILES_PATH
+        self.profiles: Dict[str, Dict] = {}
+        if os.path.exists(self.path):
+            self.profiles = read_json(self.path)
+        # 반영된 리포트 ID 조회용 집합 (profiles의 "reports" 목록은 저장 형식으로만 유지)
+        self._report_ids: Dict[str, Set[str]] = {
+            teacher: set(profile["reports"]) for teacher, profile in self.profiles.items()
+        }
+
+    def _empty_profile(self) -> Dict:
+        return {
+            "reports": [],
+            "scores": {category: {"count": 0, "sum": 0.0, "sum_sq": 0.0} for category in SCORE_CATEGORIES + ["총점"]},
+            "teacher_speaking_ms": 0,
+            "student_speaking_ms": 0,
+            "teacher_turns": 0,
+            "student_turns": 0
+        }
+
+    def update(self, teacher: str, report_id: str, scores: Dict[str, int], talk: Optional[Dict[str, float]] = None) -> bool:
+        """리포트 하나의 점수·발화 통계를 누적 (이미 반영된 리포트면 False)"""
+        profile = self.profiles.setdefault(teacher, self._empty_profile())
+        report_ids = self._report_ids.setdefault(teacher, set())
+        if report_id in report_ids:
+            return False
+        report_ids.add(report_id)
+        profile["reports"].append(report_id)
+
+        values = dict(scores)
+        if scores:
+            values["총점"] = sum(scores.values())
+        for category, value in values.items():
+            stats = profile["scores"].setdefault(category, {"count": 0, "sum": 0.0, "sum_sq": 0.0})
+            stats["count"] += 1
+            stats["sum"] += value
+            stats["sum_sq"] += value * value
+
+        for key in ["teacher_speaking_ms", "student_speaking_ms", "teacher_turns", "student_turns"]:
+            profile[key] += int((talk or {}).get(key, 0))
+        return True
+
+    def update_from_report_dir(self, report_dir: str) -> bool:
+        """public/reports/<teacher>/<reportId> 디렉토리 하나만 읽어 누적 통계 갱신"""
+        report_dir = os.path.abspath(report_dir)
+        teacher = os.path.basename(os.path.dirname(report_dir))
+        report_id = os.path.basename(report_dir)
+
+        scores = {}
+        analysis_path = os.path.join(report_dir, "analysis.json")
+        if os.path.exists(analysis_path):
+            scores = parse_scores(read_json(analysis_path))
+
+        talk = None
+        transcript_path = os.path.join(report_dir, "transcript.json")
+        if os.path.exists(transcript_path):
+            table = pd.DataFrame(load_report_utterance_table(transcript_path))
+            table["teacher"] = teacher
+            table["report_id"] = int(report_id)
+            table["duration_ms"] = table["end"] - table["start"]
+            summary = summarize_talk_time(table)
+            if len(summary):
+                talk = summary.iloc[0].to_dict()
+
+        return self.update(teacher, report_id, scores, talk)
+
+    def rebuild(self, corpus: ReportCorpus) -> None:
+        """전체 코퍼스로부터 누적 통계를 새로 계산"""
+        self.profiles = {}
+        self._report_ids = {}
+        talk = corpus.talk_time().set_index(["teacher", "report_id"])
+        scored = set()
+        for row in corpus.scores.itertuples(index=False):
+            scores = {c: getattr(row, c) for c in SCORE_CATEGORIES if not pd.isna(getattr(row, c))}
+            key = (row.teacher, row.report_id)
+            scored.add(key)
+            self.update(row.teacher, str(row.report_id), scores, talk.loc[key].to_dict() if key in talk.index else None)
+        for (teacher, report_id), row in talk.iterrows():
+            if (teacher, report_id) not in scored:
+                self.update(teacher, str(report_id), {}, row.to_dict())
+
+    def cohort(self) -> pd.DataFrame:
+        """교사별 평균·표준편차 점수와 발화 비율 (누적 통계만으로 계산)"""
+        rows = []
+        for teacher, profile in self.profiles.items():
+            row = {"teacher": teacher, "reports": len(profile["reports"])}
+            for category, stats in profile["scores"].items():
+                count = stats["count"]
+                mean = stats["sum"] / count if count else np.nan
+                row[f"{category}_mean"] = mean
+                row[f"{category}_std"] = np.sqrt(max(stats["sum_sq"] / count - mean * mean, 0.0)) if count else np.nan
+            total_ms = profile["teacher_speaking_ms"] + profile["student_speaking_ms"]
+            row["teacher_talk_ratio"] = profile["teacher_speaking_ms"] / total_ms if total_ms else np.nan
+            rows.append(row)
+        return pd.DataFrame(rows).set_index("teacher") if rows else pd.DataFrame()
+
+    def save(self) -> None:
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.profiles, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+def main(argv: List[str]) -> None:
+    """사용법:
+        python corpus_analytics.py                  # 저장된 누적 통계로 교사별 요약 출력 (JSON)
+        python corpus_analytics.py --add <report_dir>  # 새 리포트 하나를 누적 통계에 반영
+        python corpus_analytics.py --rebuild        # 전체 리포트를 다시 읽어 누적 통계 재계산
+    """
+    store = TeacherProfileStore()
+    if argv[:1] == ["--add"] and len(argv) == 2:
+        store.update_from_report_dir(argv[1])
+        store.save()
+    elif argv[:1] == ["--rebuild"]:
+        store.rebuild(ReportCorpus.load())
+        store.save()
+    elif argv:
+        print(main.__doc__)
+        sys.exit(1)
+    print(store.cohort().to_json(orient="index", force_ascii=False))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,17 +1,29 @@
-from typing import Dict, List, Tuple
-import re
-from langchain_openai import ChatOpenAI
-from langchain.schema import SystemMessage, HumanMessage
+from typing import Dict, Iterable, List, Optional, Tuple
+from concurrency import map_ordered
+from chunking import chunk_conversation
+from pattern_engine import PatternEngine
+from transcript_index import TranscriptIndex
+from transcript_ingest import iter_utterance_records
+from checkpoint import CheckpointStore, content_hash
+from llm_cache import CachedChatModel
+from metrics import get_metrics
 import config as config
 
 class TeachingDataProcessor:
-    def __init__(self, raw_text: str):
+    def __init__(
+        self,
+        raw_text: str,
+        max_concurrency: Optional[int] = None,
+        pattern_engine: Optional[PatternEngine] = None,
+        checkpoint: Optional[CheckpointStore] = None,
+        structured: Optional[bool] = None
+    ):
         self.raw_text = raw_text
-        self.llm = ChatOpenAI(
-            api_key=config.OPENAI_API_KEY,
-            model="gpt-4.1-2025-04-14",
-            temperature=0
-        )
+        self.checkpoint = checkpoint
+        # 구조화 출력 모드에서는 질적 분석을 청크 평가 응답에서 함께 받으므로 process()에서 생략
+        self.structured = structured if structured is not None else config.STRUCTURED_ANALYSIS
+        self.max_concurrency = max_concurrency if max_concurrency is not None else config.LLM_MAX_CONCURRENCY
+        self.llm = CachedChatModel(temperature=0)
         self.processed_data = {
             "대화_세션": [],
             "교사_발화": [], 
@@ -54,7 +66,17 @@ class TeachingDataProcessor:
                 "학습_환경": []
             }
         }
-        self.CHUNK_SIZE = 100
+        self.pattern_engine = pattern_engine or PatternEngine()
+        self._patterns_analyzed = False
+        self._previous_speaker = None
+        self._records: Optional[Iterable[Tuple[str, str, int, int]]] = None
+
+    @classmethod
+    def from_transcript_json(cls, path: str, **kwargs) -> "TeachingDataProcessor":
+        """transcript.json을 텍스트 변환 없이 스트리밍으로 읽는 처리기"""
+        processor = cls("", **kwargs)
+        processor._records = iter_utterance_records(path)
+        return processor
 
     def analyze_chunk_with_llm(self, chunk: List[Tuple[str, str]]) -> Dict:
         """LLM을 사용한 대화 청크 질적 분석"""
@@ -84,12 +106,14 @@ class TeachingDataProcessor:
 각 관점별로 구체적인 예시와 함께 분석해주세요.
 """
 
+        from langchain_core.messages import HumanMessage, SystemMessage
         response = self.llm.invoke([
             SystemMessage(content="당신은 교육 평가 전문가입니다."),
             HumanMessage(content=prompt.format(conversations=conversation_text))
         ])
         
-        return self._parse_llm_analysis(response.content)
+        with get_metrics().stage("parse", kind="qualitative"):
+            return self._parse_llm_analysis(response.content)
 
     def _parse_llm_analysis(self, response: str) -> Dict:
         """LLM 응답 파싱"""
@@ -119,41 +143,38 @@ class TeachingDataProcessor:
 
     def extract_conversations(self) -> List[Tuple[str, str]]:
         """대화 세션과 화자별 발화를 추출"""
-        lines = self.raw_text.split('\n')
         conversations = []
         teacher_utterances = []
         student_utterances = []
         
         current_speaker = ""
-        current_text = ""
+        current_parts: List[str] = []
+        
+        def flush() -> None:
+            # 여러 줄에 걸친 발화는 한 번에 이어 붙임
+            text = " ".join(current_parts).strip()
+            if current_speaker and text:
+                conversations.append((current_speaker, text))
+                if current_speaker == "Teacher":
+                    teacher_utterances.append(text)
+                else:
+                    student_utterances.append(text)
         
-        for line in lines:
+        for line in self.raw_text.split('\n'):
             # 화자 구분을 위한 패턴 체크
             if ": " in line:  # 콜론과 공백으로 구분
                 # 이전 대화가 있으면 저장
-                if current_speaker and current_text:
-                    conversations.append((current_speaker, current_text.strip()))
-                    if current_speaker == "Teacher":
-                        teacher_utterances.append(current_text.strip())
-                    else:
-                        student_utterances.append(current_text.strip())
+                flush()
                 
                 # 새로운 대화 시작
                 parts = line.split(": ", 1)  # 최대 1번만 분할
                 current_speaker = "Teacher" if "teacher" in parts[0].lower() else "Student"
-                current_text = parts[1]
-            else:
-                # 현재 발화에 텍스트 추가
-                if current_text:  # 현재 진행 중인 발화가 있는 경우에만
-                    current_text += " " + line.strip()
+                current_parts = [parts[1]]
+            elif current_parts and current_parts[0]:  # 현재 진행 중인 발화가 있는 경우에만
+                current_parts.append(line.strip())
         
         # 마지막 대화 처리
-        if current_speaker and current_text:
-            conversations.append((current_speaker, current_text.strip()))
-            if current_speaker == "Teacher":
-                teacher_utterances.append(current_text.strip())
-            else:
-                student_utterances.append(current_text.strip())
+        flush()
         
         # 결과 저장
         self.processed_data["대화_세션"] = conversations
@@ -165,94 +186,186 @@ class TeachingDataProcessor:
         
         return conversations
 
-    def analyze_teaching_patterns(self) -> Dict:
-        """교수 패턴 심층 분석"""
-        for speaker, text in self.processed_data["대화_세션"]:
-            if speaker == "Teacher":
-                # 스캐폴딩 분석
-                scaffolding_patterns = [
-                    (r"let'?s break this down", "단계별 분해"),
-                    (r"remember when we", "이전 학습 연계"),
-                    (r"think about what happens if", "사고 확장"),
-                    (r"can you explain why", "설명 유도")
-                ]
-                for pattern, strategy in scaffolding_patterns:
-                    if re.search(pattern, text, re.IGNORECASE):
-                        self.processed_data["교사_전략"]["스캐폴딩"].append({
-                            "전략": strategy,
-                            "예시": text
-                        })
-
-                # 질문 유형 분석 (블룸의 분류)
-                if "what is" in text.lower():
-                    self.processed_data["교사_전략"]["질문_유형"]["지식"] += 1
-                elif "why do you think" in text.lower():
-                    self.processed_data["교사_전략"]["질문_유형"]["분석"] += 1
-                # ... 기타 질문 유형 분석
+    def ingest_records(self, records: Iterable[Tuple[str, str, int, int]]) -> List[Tuple[str, str]]:
+        """전사 JSON 레코드(역할, 발화, 시작, 종료)로 대화 세션 구성
 
-            elif speaker in ["Michael", "Abby"]:
-                # 학생 참여 분석
-                if "?" in text:
-                    self.processed_data["학생_참여"]["자발적_질문"] += 1
-                if "i think" in text.lower():
-                    self.processed_data["학생_참여"]["문제해결_시도"] += 1
+        extract_conversations와 같은 결과를 만들지만 "화자: 발화" 텍스트를 거치지 않고,
+        레코드를 하나씩 소비하므로 transcript.json 전체를 메모리에 올리지 않습니다.
+        """
+        conversations = []
+        teacher_utterances = []
+        student_utterances = []
+        for role, text, _start, _end in records:
+            text = text.strip()
+            if not text:
+                continue
+            speaker = "Teacher" if role == "Teacher" else "Student"
+            conversations.append((speaker, text))
+            if speaker == "Teacher":
+                teacher_utterances.append(text)
+            else:
+                student_utterances.append(text)
+        
+        self.processed_data["대화_세션"] = conversations
+        self.processed_data["교사_발화"] = teacher_utterances
+        self.processed_data["학생_발화"] = student_utterances
+        
+        print(f"추출된 교사 발화 수: {len(teacher_utterances)}")
+        print(f"추출된 학생 발화 수: {len(student_utterances)}")
+        
+        return conversations
 
+    def analyze_patterns(self) -> Dict:
+        """교수·피드백·학생 참여·수업 주제 패턴을 한 번의 순회로 분석"""
+        self._previous_speaker = None
+        for speaker, text in self.processed_data["대화_세션"]:
+            self._analyze_turn(speaker, text)
+        
+        self._patterns_analyzed = True
         return self.processed_data["교사_전략"]
 
-    def analyze_feedback_patterns(self):
-        """피드백 패턴 상세 분석"""
-        conversations = self.processed_data["대화_세션"]
-        for i, (speaker, text) in enumerate(conversations):
-            if speaker == "Teacher":
-                # 즉각 피드백 분석
-                if i > 0 and conversations[i-1][0] in ["Michael", "Abby"]:
-                    self.processed_data["피드백_분석"]["즉각_피드백"] += 1
-                    
-                # 피드백 유형 분석
-                if any(word in text.lower() for word in ["good", "excellent", "right"]):
-                    self.processed_data["피드백_분석"]["긍정_강화"] += 1
-                elif "instead" in text.lower() or "try" in text.lower():
-                    self.processed_data["피드백_분석"]["교정_피드백"] += 1
+    def add_utterance(self, speaker: str, text: str) -> None:
+        """스트리밍 입력: 발화 하나를 대화 세션에 추가하고 바로 패턴을 집계"""
+        speaker = "Teacher" if "teacher" in speaker.lower() else "Student"
+        text = text.strip()
+        if not text:
+            return
+        self.processed_data["대화_세션"].append((speaker, text))
+        if speaker == "Teacher":
+            self.processed_data["교사_발화"].append(text)
+        else:
+            self.processed_data["학생_발화"].append(text)
+        self._analyze_turn(speaker, text)
+        self._patterns_analyzed = True
 
-    def extract_subjects(self) -> set:
-        """Extract lesson topics in chunks"""
-        subjects = set()
-        keywords = ["fraction", "multiply", "divide", "add", "subtract", 
-                   "equation", "problem solving", "pizza", "pumpkin"]
+    def _analyze_turn(self, speaker: str, text: str) -> None:
+        """발화 하나의 패턴 집계 (직전 화자는 self._previous_speaker로 추적)"""
+        strategy = self.processed_data["교사_전략"]
+        participation = self.processed_data["학생_참여"]
+        feedback = self.processed_data["피드백_분석"]
+        
+        hits = self.pattern_engine.match(text)
+        self.processed_data["수업_주제"].update(hits.get("수업_주제", ()))
         
-        conversations = self.processed_data["대화_세션"]
-        chunks = [conversations[i:i + self.CHUNK_SIZE] 
-                 for i in range(0, len(conversations), self.CHUNK_SIZE)]
-                 
-        for chunk in chunks:
-            for _, text in chunk:
-                for keyword in keywords:
-                    if keyword in text.lower():
-                        subjects.add(keyword)
+        if speaker == "Teacher":
+            # 스캐폴딩 분석
+            for label in self.pattern_engine.ordered_labels("스캐폴딩", hits):
+                strategy["스캐폴딩"].append({
+                    "전략": label,
+                    "예시": text
+                })
+            
+            # 질문 유형 분석 (블룸의 분류) - 우선순위가 가장 높은 유형 하나만 집계
+            question_types = self.pattern_engine.ordered_labels("질문_유형", hits)
+            if question_types:
+                strategy["질문_유형"][question_types[0]] = strategy["질문_유형"].get(question_types[0], 0) + 1
+            
+            # 즉각 피드백 분석
+            if self._previous_speaker is not None and self._previous_speaker != "Teacher":
+                feedback["즉각_피드백"] += 1
+            
+            # 피드백 유형 분석
+            feedback_types = self.pattern_engine.ordered_labels("피드백_유형", hits)
+            if feedback_types:
+                feedback[feedback_types[0]] = feedback.get(feedback_types[0], 0) + 1
+        else:
+            # 학생 참여 분석
+            for label in self.pattern_engine.ordered_labels("학생_참여", hits):
+                participation[label] = participation.get(label, 0) + 1
+        
+        self._previous_speaker = speaker
+
+    def extract_subjects(self, index: Optional[TranscriptIndex] = None, lesson: Optional[Tuple[str, str]] = None) -> set:
+        """수업 주제 추출
+
+        index가 주어지면 전사문 역색인에서 주제 키워드를 단어·구절 단위로 조회하고
+        (lesson으로 특정 수업 한정), 없으면 정량 분석 단일 패스 결과를 사용합니다.
+        """
+        if index is not None:
+            keywords = self.pattern_engine.tables.get("수업_주제", {}).keys()
+            self.processed_data["수업_주제"] = index.subjects(keywords, lesson)
+            return self.processed_data["수업_주제"]
+        if not self._patterns_analyzed:
+            self.analyze_patterns()
+        return self.processed_data["수업_주제"]
+
+    def _load_stage(self, name: str) -> Optional[Dict]:
+        """저장된 단계 결과 복원 (JSON에서 리스트가 된 대화 튜플을 되돌림)"""
+        saved = self.checkpoint.load(name)
+        if saved is not None:
+            saved["대화_세션"] = [tuple(turn) for turn in saved["대화_세션"]]
+        return saved
+
+    def _analyze_chunk_checkpointed(self, chunk: List[Tuple[str, str]]) -> Dict:
+        """청크 질적 분석 - 체크포인트가 있으면 재사용하고, 새로 분석하면 바로 저장"""
+        if self.checkpoint is None:
+            return self.analyze_chunk_with_llm(chunk)
+        name = f"qualitative_{content_hash(chunk)[:16]}"
+        analysis = self.checkpoint.load(name)
+        if analysis is None:
+            analysis = self.analyze_chunk_with_llm(chunk)
+            self.checkpoint.save(name, analysis)
+        return analysis
+
+    def analyze_quantitative(self) -> Dict:
+        """대화 추출과 패턴 집계까지의 정량 분석 (LLM 호출 없음, 체크포인트가 있으면 재사용)"""
+        saved = self._load_stage("quantitative") if self.checkpoint is not None else None
+        if saved is not None:
+            self.processed_data = saved
+            self._patterns_analyzed = True
+            return self.processed_data
         
-        self.processed_data["수업_주제"] = subjects
-        return subjects
+        metrics = get_metrics()
+        with metrics.stage("extract"):
+            if self._records is not None:
+                self.ingest_records(self._records)
+            else:
+                self.extract_conversations()
+        with metrics.stage("patterns"):
+            self.analyze_patterns()
+        if self.checkpoint is not None:
+            self.checkpoint.save("quantitative", self.processed_data)
+        return self.processed_data
 
     def process(self) -> Dict:
         """전체 처리 프로세스"""
+        if self.checkpoint is not None:
+            saved = self._load_stage("processed")
+            if saved is not None:
+                self.processed_data = saved
+                return self.processed_data
+        
         # 1. 기존 정량적 분석
-        self.extract_conversations()
-        self.analyze_teaching_patterns()
-        self.analyze_feedback_patterns()
-        self.extract_subjects()
+        self.analyze_quantitative()
         
         # 2. 새로운 질적 분석
-        chunks = [self.processed_data["대화_세션"][i:i + self.CHUNK_SIZE] 
-                 for i in range(0, len(self.processed_data["대화_세션"]), self.CHUNK_SIZE)]
-        
-        for chunk in chunks:
-            analysis = self.analyze_chunk_with_llm(chunk)
-            for category, items in analysis.items():
-                self.processed_data["질적_분석"][category].extend(items)
+        if not self.structured:
+            chunks = chunk_conversation(self.processed_data["대화_세션"], overlap_tokens=0, model=self.llm.model)
+            
+            # 청크별 LLM 분석은 동시에 수행하되 결과는 청크 순서대로 반영
+            analyses = map_ordered(self._analyze_chunk_checkpointed, chunks, max_workers=self.max_concurrency)
+            for analysis in analyses:
+                for category, items in analysis.items():
+                    self.processed_data["질적_분석"][category].extend(items)
         
+        if self.checkpoint is not None:
+            self.checkpoint.save("processed", self.processed_data)
         return self.processed_data
 
-def process_teaching_text(raw_text: str) -> Dict:
+def process_teaching_text(
+    raw_text: str,
+    max_concurrency: Optional[int] = None,
+    checkpoint: Optional[CheckpointStore] = None
+) -> Dict:
     """편의 함수"""
-    processor = TeachingDataProcessor(raw_text)
+    processor = TeachingDataProcessor(raw_text, max_concurrency=max_concurrency, checkpoint=checkpoint)
+    return processor.process()
+
+def process_transcript_json(
+    path: str,
+    max_concurrency: Optional[int] = None,
+    checkpoint: Optional[CheckpointStore] = None
+) -> Dict:
+    """transcript.json 편의 함수"""
+    processor = TeachingDataProcessor.from_transcript_json(path, max_concurrency=max_concurrency, checkpoint=checkpoint)
     return processor.process()
@@ -0,0 +1,97 @@
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import config as config
+
+# 점수 기준표를 그대로 옮긴 줄 (예: "15-20점: 탁월한 성과", "점: 탁월한 성과")
+RUBRIC_LINE_RE = re.compile(r"^[\s\d\-~–]*점\s*:\s*(탁월한 성과|기본 요구사항 충족|개선 필요|심각한 문제)\s*$")
+NORMALIZE_RE = re.compile(r"[\W_]+")
+
+_PRIME = (1 << 31) - 1
+
+def clean_points(points: List[str]) -> List[str]:
+    """빈 줄과 점수 기준표 줄을 제외하고 앞뒤 공백 정리"""
+    cleaned = []
+    for point in points:
+        point = point.strip()
+        if point and not RUBRIC_LINE_RE.match(point):
+            cleaned.append(point)
+    return cleaned
+
+def shingles(text: str, size: int) -> List[int]:
+    """문장 부호·공백을 뺀 문자 size-gram의 해시 (crc32 - 실행마다 같은 값)"""
+    normalized = NORMALIZE_RE.sub("", text.lower())
+    if len(normalized) <= size:
+        return [zlib.crc32(normalized.encode("utf-8"))]
+    return list({zlib.crc32(normalized[i:i + size].encode("utf-8")) for i in range(len(normalized) - size + 1)})
+
+def lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """(밴드 수, 밴드당 행 수) - 후보가 되는 유사도 (1/b)^(1/r)가 threshold에 가장 가까운 조합"""
+    options = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    return min(options, key=lambda option: abs((1 / option[0]) ** (1 / option[1]) - threshold))
+
+class MinHashLSH:
+    """MinHash 서명과 LSH 밴딩으로 유사 문장 후보를 찾는 색인
+
+    문장마다 서명을 한 번 계산하고 밴드별 버킷에 넣으므로 전체 비용은 문장 수에 선형입니다.
+    """
+
+    def __init__(self, threshold: float, num_perm: int = 64, shingle_size: int = 3, seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = lsh_bands(num_perm, threshold)
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, _PRIME, size=num_perm).astype(np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.asarray(shingles(text, self.shingle_size), dtype=np.uint64) % _PRIME
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % _PRIME).min(axis=1)
+
+    def similarity(self, first: np.ndarray, second: np.ndarray) -> float:
+        """서명이 일치하는 비율 (자카드 유사도 추정값)"""
+        return float(np.mean(first == second))
+
+    def cluster(self, texts: List[str]) -> List[List[int]]:
+        """유사한 문장끼리 묶은 인덱스 목록 (클러스터·구성원 모두 처음 나온 순서)"""
+        signatures = [self.signature(text) for text in texts]
+        parent = list(range(len(texts)))
+
+        def find(index: int) -> int:
+            while parent[index] != index:
+                parent[index] = parent[parent[index]]
+                index = parent[index]
+            return index
+
+        for band in range(self.bands):
+            buckets: Dict[bytes, int] = {}
+            start = band * self.rows
+            for index, signature in enumerate(signatures):
+                key = signature[start:start + self.rows].tobytes()
+                # 버킷의 첫 문장과만 비교하므로 같은 문장이 많아도 비교 횟수는 선형
+                first = buckets.setdefault(key, index)
+                if first != index and self.similarity(signatures[first], signature) >= self.threshold:
+                    parent[find(index)] = find(first)
+
+        clusters: Dict[int, List[int]] = {}
+        for index in range(len(texts)):
+            clusters.setdefault(find(index), []).append(index)
+        return sorted(clusters.values(), key=lambda members: members[0])
+
+def cluster_points(points: List[str], threshold: Optional[float] = None) -> List[List[str]]:
+    """유사 문장 클러스터 목록 (점수 기준표 줄은 제외)"""
+    points = clean_points(points)
+    if not points:
+        return []
+    index = MinHashLSH(
+        threshold if threshold is not None else config.DEDUP_SIMILARITY_THRESHOLD,
+        num_perm=config.DEDUP_NUM_PERM,
+        shingle_size=config.DEDUP_SHINGLE_SIZE
+    )
+    return [[points[i] for i in members] for members in index.cluster(points)]
+
+def deduplicate(points: List[str], threshold: Optional[float] = None) -> List[str]:
+    """유사 문장을 하나로 합쳐 클러스터마다 가장 자세한(긴) 문장만 남김 (처음 나온 순서 유지)"""
+    return [max(cluster, key=len) for cluster in cluster_points(points, threshold)]
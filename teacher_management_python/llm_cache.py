@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Iterator, List, Optional
+from llm_gateway import get_gateway
+from metrics import get_metrics, usage_tokens
+import config as config
+
+if TYPE_CHECKING:
+    from langchain_core.messages import AIMessage, BaseMessage
+
+# 용량 초과 시 한 번에 삭제 후보로 읽는 항목 수
+EVICT_BATCH = 64
+
+class LLMResponseCache:
+    """모델·온도·메시지 해시를 키로 하는 디스크 기반 LLM 응답 캐시 (LRU 용량 제한)
+
+    전체 크기는 stats 테이블에 누적해 두므로 저장·삭제 비용이 캐시 크기와 무관합니다
+    (같은 파일을 쓰는 배치 워커 프로세스끼리도 같은 트랜잭션 안에서 갱신).
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.path = path or config.LLM_CACHE_PATH
+        self.max_bytes = max_bytes if max_bytes is not None else config.LLM_CACHE_MAX_MB * 1024 * 1024
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    content TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            # 누적 크기가 없던 기존 캐시 파일은 한 번만 합계를 계산
+            self._conn.execute("""
+                INSERT OR IGNORE INTO stats (name, value)
+                SELECT 'total_bytes', COALESCE(SUM(size), 0) FROM responses
+            """)
+
+    @staticmethod
+    def make_key(model: str, temperature: float, messages: List["BaseMessage"], **params: Any) -> str:
+        """요청 내용을 정규화하여 SHA-256 키 생성"""
+        payload = {
+            "model": model,
+            "temperature": temperature,
+            "messages": [{"role": m.type, "content": m.content} for m in messages],
+            "params": params
+        }
+        raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT content FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, key: str, content: str) -> None:
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            with self._conn:
+                row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, content, size, last_access) VALUES (?, ?, ?, ?)",
+                    (key, content, size, time.time())
+                )
+                self._add_total(size - (row[0] if row else 0))
+                self._evict()
+
+    def _add_total(self, delta: int) -> None:
+        if delta:
+            self._conn.execute("UPDATE stats SET value = value + ? WHERE name = 'total_bytes'", (delta,))
+
+    def _evict(self) -> None:
+        """총 용량이 한도를 넘으면 가장 오래 사용되지 않은 항목부터 EVICT_BATCH개씩 삭제"""
+        total = self._conn.execute("SELECT value FROM stats WHERE name = 'total_bytes'").fetchone()[0]
+        while total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT ?", (EVICT_BATCH,)
+            ).fetchall()
+            if not rows:
+                break
+            removed = 0
+            for key, size in rows:
+                if total - removed <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                removed += size
+            self._add_total(-removed)
+            total -= removed
+
+    def clear(self) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM responses")
+                self._conn.execute("UPDATE stats SET value = 0 WHERE name = 'total_bytes'")
+
+_shared_cache: Optional[LLMResponseCache] = None
+_shared_cache_lock = threading.Lock()
+
+def get_shared_cache() -> LLMResponseCache:
+    """프로세스 전체에서 공유하는 캐시 인스턴스"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = LLMResponseCache()
+        return _shared_cache
+
+class CachedChatModel:
+    """ChatOpenAI 호출을 디스크 캐시를 거쳐 수행하는 래퍼
+
+    invoke()는 ChatOpenAI와 동일하게 메시지 목록을 받아 .content를 가진 응답을 반환합니다.
+    캐시에 없는 요청은 공유 게이트웨이(llm_gateway)의 연결 풀과 동시 요청 제한을 거쳐 보냅니다.
+    """
+
+    def __init__(
+        self,
+        temperature: float = 0,
+        model: Optional[str] = None,
+        use_cache: Optional[bool] = None,
+        cache: Optional[LLMResponseCache] = None
+    ):
+        self.model = model or config.OPENAI_MODEL
+        self.temperature = temperature
+        if use_cache is None:
+            use_cache = config.LLM_CACHE_ENABLED and (
+                temperature == 0 or config.LLM_CACHE_NONZERO_TEMPERATURE
+            )
+        self.use_cache = use_cache
+        self._cache = cache
+
+    @property
+    def llm(self):
+        """게이트웨이가 관리하는 공유 ChatOpenAI 클라이언트"""
+        return get_gateway().chat_model(self.model, self.temperature)
+
+    @property
+    def cache(self) -> LLMResponseCache:
+        if self._cache is None:
+            self._cache = get_shared_cache()
+        return self._cache
+
+    def invoke(self, messages: List["BaseMessage"], **kwargs: Any) -> "AIMessage":
+        started = time.perf_counter()
+        if self.use_cache:
+            key = LLMResponseCache.make_key(self.model, self.temperature, messages, **kwargs)
+            cached = self.cache.get(key)
+            if cached is not None:
+                from langchain_core.messages import AIMessage
+                get_metrics().record_llm_call(self.model, time.perf_counter() - started, cache_hit=True)
+                return AIMessage(content=cached, response_metadata={"cache_hit": True})
+
+        response = get_gateway().invoke(messages, self.model, self.temperature, **kwargs)
+        get_metrics().record_llm_call(self.model, time.perf_counter() - started, **usage_tokens(response))
+        if self.use_cache:
+            self.cache.put(key, response.content)
+        return response
+
+    def stream(self, messages: List["BaseMessage"], **kwargs: Any) -> Iterator[str]:
+        """invoke()와 같은 요청을 토큰 단위로 받아 텍스트 조각을 차례로 반환
+
+        캐시에 있으면 전체 응답을 한 조각으로 반환하고, 응답을 끝까지 받은 경우에만 캐시에 저장합니다.
+        """
+        started = time.perf_counter()
+        if self.use_cache:
+            key = LLMResponseCache.make_key(self.model, self.temperature, messages, **kwargs)
+            cached = self.cache.get(key)
+            if cached is not None:
+                get_metrics().record_llm_call(self.model, time.perf_counter() - started, cache_hit=True)
+                yield cached
+                return
+
+        response = None
+        for chunk in get_gateway().stream(messages, self.model, self.temperature, **kwargs):
+            response = chunk if response is None else response + chunk
+            if chunk.content:
+                yield chunk.content
+        get_metrics().record_llm_call(self.model, time.perf_counter() - started, **usage_tokens(response))
+        if self.use_cache and response is not None:
+            self.cache.put(key, response.content)
@@ -0,0 +1,132 @@
+import atexit
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+import config as config
+
+if TYPE_CHECKING:
+    from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+
+def create_chat_openai(**kwargs: Any):
+    """ChatOpenAI 생성 - langchain_openai는 임포트 비용이 커서 실제로 호출할 때 불러옴"""
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(**kwargs)
+
+class LLMGateway:
+    """프로세스 전체에서 공유하는 LLM 호출 창구
+
+    - HTTP 연결 풀(keep-alive)을 가진 httpx 클라이언트 하나를 모든 ChatOpenAI가 공유하므로
+      단계마다 TLS 핸드셰이크와 클라이언트 초기화를 반복하지 않습니다.
+    - (모델, 온도)별 ChatOpenAI는 한 번만 만들어 재사용합니다.
+    - 동시에 진행 중인 요청 수를 여기서 한 번에 제한합니다 (단계·스레드와 무관).
+    """
+
+    def __init__(
+        self,
+        max_in_flight: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        max_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None
+    ):
+        self.max_in_flight = max_in_flight or config.LLM_GATEWAY_MAX_IN_FLIGHT
+        self.timeout = timeout if timeout is not None else config.LLM_TIMEOUT_SEC
+        self.max_retries = max_retries if max_retries is not None else config.LLM_MAX_RETRIES
+        self.max_connections = max_connections or config.LLM_HTTP_MAX_CONNECTIONS
+        self.keepalive_expiry = keepalive_expiry if keepalive_expiry is not None else config.LLM_HTTP_KEEPALIVE_SEC
+        self._semaphore = threading.BoundedSemaphore(self.max_in_flight)
+        self._lock = threading.Lock()
+        self._http_client = None
+        self._models: Dict[Tuple[str, float], Any] = {}
+
+    @property
+    def http_client(self):
+        """연결 풀을 가진 httpx 클라이언트 (첫 요청 시 생성)"""
+        with self._lock:
+            if self._http_client is None:
+                import httpx
+                self._http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                        keepalive_expiry=self.keepalive_expiry
+                    ),
+                    timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 10.0))
+                )
+            return self._http_client
+
+    def chat_model(self, model: Optional[str] = None, temperature: float = 0):
+        """공유 연결 풀을 쓰는 ChatOpenAI (모델·온도별로 하나)"""
+        model = model or config.OPENAI_MODEL
+        key = (model, temperature)
+        if key not in self._models:
+            http_client = self.http_client
+            with self._lock:
+                if key not in self._models:
+                    self._models[key] = create_chat_openai(
+                        api_key=config.OPENAI_API_KEY,
+                        model=model,
+                        temperature=temperature,
+                        http_client=http_client,
+                        timeout=self.timeout,
+                        max_retries=self.max_retries
+                    )
+        return self._models[key]
+
+    def invoke(
+        self,
+        messages: List["BaseMessage"],
+        model: Optional[str] = None,
+        temperature: float = 0,
+        **kwargs: Any
+    ) -> "AIMessage":
+        """동시 요청 수 제한 안에서 LLM 호출"""
+        chat_model = self.chat_model(model, temperature)
+        with self._semaphore:
+            return chat_model.invoke(messages, **kwargs)
+
+    def stream(
+        self,
+        messages: List["BaseMessage"],
+        model: Optional[str] = None,
+        temperature: float = 0,
+        **kwargs: Any
+    ) -> Iterator["AIMessageChunk"]:
+        """동시 요청 수 제한 안에서 LLM 응답을 토큰 단위로 스트리밍 (응답이 끝날 때까지 슬롯 점유)"""
+        chat_model = self.chat_model(model, temperature)
+        with self._semaphore:
+            # 마지막 조각에 토큰 사용량이 담기도록 요청
+            yield from chat_model.stream(messages, stream_usage=True, **kwargs)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+                self._http_client = None
+            self._models.clear()
+
+_gateway: Optional[LLMGateway] = None
+_gateway_pid: Optional[int] = None
+_gateway_lock = threading.Lock()
+
+def get_gateway() -> LLMGateway:
+    """프로세스 전체에서 공유하는 게이트웨이
+
+    배치 모드 워커처럼 fork된 자식 프로세스에서는 부모의 연결을 쓰지 않도록 새로 만듭니다.
+    """
+    global _gateway, _gateway_pid
+    with _gateway_lock:
+        if _gateway is None or _gateway_pid != os.getpid():
+            _gateway = LLMGateway()
+            _gateway_pid = os.getpid()
+        return _gateway
+
+def reset_gateway() -> None:
+    """게이트웨이를 닫고 다음 호출 때 설정을 다시 읽어 생성"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is not None and _gateway_pid == os.getpid():
+            _gateway.close()
+        _gateway = None
+
+atexit.register(reset_gateway)
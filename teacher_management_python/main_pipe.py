@@ -1,35 +1,235 @@
+import argparse
+import json
 import os
-from data_processing import process_teaching_text
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+from data_processing import process_teaching_text, process_transcript_json
 from assess import TeachingAssessor
 from report import generate_fancy_report
 from prompt import TeachingPrompts
+from checkpoint import CheckpointStore
+from react import start_concept_prewarm
+from metrics import PipelineMetrics, metrics_path_stem, start_run
+import config as config
 
-def main():
-    # 현재 스크립트의 디렉토리를 기준으로 상대 경로 설정
-    current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    input_file = os.path.join(current_dir, 'data', '실제줌강의기반텍스트추출.txt')
-    output_file = os.path.join(current_dir, 'data', 'teaching_report_v10.md')
+# 평가 기준(루브릭)이 들어 있는 파일 - 이 파일들이 바뀌면 기존 리포트는 다시 생성
+RUBRIC_FILES = ["prompt.py", "assess.py"]
+
+# 저장된 수업 리포트 디렉토리의 AssemblyAI 전사 결과 파일 이름
+TRANSCRIPT_JSON = "transcript.json"
+
+def run_lesson(input_file: str, output_file: str) -> None:
+    """수업 하나의 전사문(.txt 또는 transcript.json)으로 평가 리포트 생성 (단계별 지표는 리포트 옆 .metrics.json/.prom에 저장)"""
+    metrics = start_run(lesson=os.path.splitext(os.path.basename(input_file))[0])
+    try:
+        _run_lesson(input_file, output_file, metrics)
+    finally:
+        if config.METRICS_ENABLED:
+            metrics.write(metrics_path_stem(output_file))
+
+def _run_lesson(input_file: str, output_file: str, metrics: PipelineMetrics) -> None:
+    metrics.add_file_bytes("input", read_path=input_file)
+    if input_file.endswith(".json"):
+        # AssemblyAI transcript.json은 텍스트로 바꾸지 않고 발화 단위로 스트리밍
+        checkpoint = CheckpointStore.for_file(input_file) if config.CHECKPOINT_ENABLED else None
+        processed_data = process_transcript_json(input_file, checkpoint=checkpoint)
+    else:
+        # 과외 녹화 텍스트 파일 읽기
+        with open(input_file, 'r', encoding='utf-8') as f:
+            raw_text = f.read()
 
-    # 과외 녹화 텍스트 파일 읽기
-    with open(input_file, 'r', encoding='utf-8') as f:
-        raw_text = f.read()
+        # 단계·청크별 체크포인트 (실패 후 재실행 시 남은 부분만 처리)
+        checkpoint = CheckpointStore.for_input(raw_text) if config.CHECKPOINT_ENABLED else None
 
-    # 데이터 전처리
-    processed_data = process_teaching_text(raw_text)
-    print("처리된 데이터:", processed_data)  # 데이터 확인용 로그
+        # 데이터 전처리
+        processed_data = process_teaching_text(raw_text, checkpoint=checkpoint)
+    print(summarize_processed(processed_data))
+
+    # 평가가 진행되는 동안 수업 주제의 개념 팝업을 미리 생성해 캐시에 저장
+    prewarm = start_concept_prewarm(processed_data["수업_주제"]) if config.CONCEPT_PREWARM_ENABLED else None
 
     # 평가 수행
-    assessor = TeachingAssessor()
+    assessor = TeachingAssessor(checkpoint=checkpoint)
     assessment_result = assessor.assess_teaching(processed_data)
 
     # 리포트 생성
     report_md = generate_fancy_report(assessment_result)
 
     # 리포트 저장
+    output_dir = os.path.dirname(output_file)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write(report_md)
+    metrics.add_file_bytes("report", written_path=output_file)
 
     print(f"리포트가 '{output_file}' 파일로 저장되었습니다.")
 
+    if prewarm is not None:
+        prewarm.join()
+
+    # 리포트까지 완료되면 체크포인트 정리
+    if checkpoint is not None:
+        checkpoint.clear()
+
+def summarize_processed(processed_data: Dict) -> str:
+    """전처리 결과 요약 한 줄 (전체 데이터 대신 로그에 출력)"""
+    qualitative = sum(len(items) for items in processed_data["질적_분석"].values())
+    return (
+        f"처리된 데이터: 대화 {len(processed_data['대화_세션'])}개 "
+        f"(교사 {len(processed_data['교사_발화'])}, 학생 {len(processed_data['학생_발화'])}), "
+        f"주제 {sorted(processed_data['수업_주제'])}, "
+        f"스캐폴딩 {len(processed_data['교사_전략']['스캐폴딩'])}건, 질적 분석 {qualitative}건"
+    )
+
+def rubric_mtime() -> float:
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    return max(os.path.getmtime(os.path.join(module_dir, name)) for name in RUBRIC_FILES)
+
+def is_up_to_date(input_file: str, output_file: str) -> bool:
+    """리포트가 전사문과 평가 기준보다 나중에 생성되었는지 확인"""
+    if not os.path.exists(output_file):
+        return False
+    return os.path.getmtime(output_file) >= max(os.path.getmtime(input_file), rubric_mtime())
+
+def collect_lessons(source: str, output_dir: Optional[str] = None) -> List[Tuple[str, str]]:
+    """배치 입력에서 (전사문 경로, 리포트 경로) 목록 생성
+
+    source가 디렉토리면 하위의 모든 .txt 전사문과 transcript.json을,
+    .json 매니페스트면 [{"input": ..., "output": ...}, ...] 또는 경로 목록을,
+    그 외 파일이면 한 줄에 하나씩 적힌 전사문 경로를 읽습니다.
+    output을 지정하지 않은 항목은 output_dir(기본값: 전사문 옆)에 <이름>_report.md로 저장합니다
+    (transcript.json은 <교사>_<리포트 ID>_report.md).
+    """
+    if os.path.isdir(source):
+        # 디렉토리를 순회한 경로는 이미 source 기준 경로
+        entries = [
+            os.path.join(root, name)
+            for root, _, files in os.walk(source)
+            for name in sorted(files) if name.endswith(".txt") or name == TRANSCRIPT_JSON
+        ]
+        base_dir = None
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            if source.endswith(".json"):
+                entries = json.load(f)
+            else:
+                entries = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        # 매니페스트·목록 파일의 상대 경로는 그 파일이 있는 디렉토리 기준
+        base_dir = os.path.dirname(os.path.abspath(source))
+
+    lessons = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            input_file, output_file = entry["input"], entry.get("output")
+        else:
+            input_file, output_file = entry, None
+        if base_dir is not None:
+            input_file = os.path.join(base_dir, input_file)
+            if output_file:
+                output_file = os.path.join(base_dir, output_file)
+        if not output_file:
+            stem = report_stem(input_file)
+            output_file = os.path.join(output_dir or os.path.dirname(input_file), f"{stem}_report.md")
+        lessons.append((input_file, output_file))
+    return lessons
+
+def report_stem(input_file: str) -> str:
+    """기본 리포트 파일 이름 (확장자 제외)
+
+    public/reports/<교사>/<리포트 ID>/transcript.json은 파일 이름이 모두 같으므로
+    상위 디렉토리 이름(교사, 리포트 ID)으로 구분합니다.
+    """
+    if os.path.basename(input_file) == TRANSCRIPT_JSON:
+        report_dir = os.path.dirname(os.path.abspath(input_file))
+        return f"{os.path.basename(os.path.dirname(report_dir))}_{os.path.basename(report_dir)}"
+    return os.path.splitext(os.path.basename(input_file))[0]
+
+def _run_lesson_isolated(input_file: str, output_file: str) -> Dict:
+    """워커 프로세스에서 수업 하나를 처리하고 결과를 기록 (예외는 결과로 반환)"""
+    started = time.time()
+    try:
+        run_lesson(input_file, output_file)
+        status, error = "completed", None
+    except Exception as e:
+        status, error = "failed", f"{type(e).__name__}: {e}\n{traceback.format_exc()}"
+    return {
+        "input": input_file,
+        "output": output_file,
+        "status": status,
+        "seconds": round(time.time() - started, 3),
+        "error": error
+    }
+
+def run_batch(
+    source: str,
+    output_dir: Optional[str] = None,
+    workers: Optional[int] = None,
+    force: bool = False,
+    summary_path: Optional[str] = None
+) -> List[Dict]:
+    """여러 수업을 프로세스 풀에서 처리 - 한 수업의 실패가 다른 수업을 중단시키지 않음"""
+    workers = workers or config.BATCH_WORKERS
+    lessons = collect_lessons(source, output_dir)
+    started = time.time()
+
+    results = []
+    pending = []
+    for input_file, output_file in lessons:
+        if not force and is_up_to_date(input_file, output_file):
+            results.append({"input": input_file, "output": output_file, "status": "skipped", "seconds": 0.0, "error": None})
+        else:
+            pending.append((input_file, output_file))
+
+    print(f"배치 처리: 전체 {len(lessons)}개, 처리 대상 {len(pending)}개, 워커 {workers}개")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_run_lesson_isolated, *lesson): lesson for lesson in pending}
+        for future in as_completed(futures):
+            input_file, output_file = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # 워커 프로세스 자체가 비정상 종료된 경우
+                result = {"input": input_file, "output": output_file, "status": "failed", "seconds": None, "error": f"{type(e).__name__}: {e}"}
+            results.append(result)
+            print(f"[{result['status']}] {input_file} ({result['seconds']}s)")
+
+    order = {lesson: i for i, lesson in enumerate(lessons)}
+    results.sort(key=lambda r: order[(r["input"], r["output"])])
+    summary = {
+        "source": source,
+        "workers": workers,
+        "total_seconds": round(time.time() - started, 3),
+        "counts": {status: sum(1 for r in results if r["status"] == status) for status in ["completed", "failed", "skipped"]},
+        "lessons": results
+    }
+    summary_path = summary_path or os.path.join(output_dir or (source if os.path.isdir(source) else os.path.dirname(os.path.abspath(source))), "batch_summary.json")
+    if os.path.dirname(summary_path):
+        os.makedirs(os.path.dirname(summary_path), exist_ok=True)
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    print(f"배치 요약이 '{summary_path}' 파일로 저장되었습니다. {summary['counts']}")
+    return results
+
+def main():
+    # 현재 스크립트의 디렉토리를 기준으로 상대 경로 설정
+    current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    input_file = os.path.join(current_dir, 'data', '실제줌강의기반텍스트추출.txt')
+    output_file = os.path.join(current_dir, 'data', 'teaching_report_v10.md')
+    run_lesson(input_file, output_file)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="수업 전사문 평가 리포트 생성")
+    parser.add_argument("--batch", metavar="SOURCE", help="전사문 디렉토리 또는 매니페스트 파일 (.json/.txt)")
+    parser.add_argument("--output-dir", help="배치 리포트 저장 디렉토리 (기본값: 전사문 옆)")
+    parser.add_argument("--workers", type=int, help=f"동시 처리 수업 수 (기본값: {config.BATCH_WORKERS})")
+    parser.add_argument("--force", action="store_true", help="최신 리포트도 다시 생성")
+    parser.add_argument("--summary", help="배치 요약 JSON 경로")
+    args = parser.parse_args()
+
+    if args.batch:
+        run_batch(args.batch, args.output_dir, args.workers, args.force, args.summary)
+    else:
+        main()
@@ -0,0 +1,217 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+import config as config
+
+PROMETHEUS_PREFIX = "teacher_pipeline"
+
+class PipelineMetrics:
+    """수업 한 건 처리 중 단계별 소요 시간·LLM 토큰·입출력 바이트 기록
+
+    전사 작업과 LLM 호출은 여러 스레드에서 동시에 기록하므로 모든 갱신은 잠금 안에서 수행합니다.
+    """
+
+    def __init__(self, **labels: str):
+        self.labels = {key: str(value) for key, value in labels.items()}
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self.stages: List[Dict] = []      # {"stage", "seconds", "labels"}
+        self.llm_calls: List[Dict] = []   # {"model", "seconds", "prompt_tokens", "completion_tokens", "cache_hit"}
+        self.bytes_read: Dict[str, int] = {}
+        self.bytes_written: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str, **labels: str) -> Iterator[None]:
+        """with 블록의 소요 시간을 단계 이름으로 기록 (예외가 나도 기록)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(name, time.perf_counter() - started, **labels)
+
+    def record_stage(self, name: str, seconds: float, **labels: str) -> None:
+        with self._lock:
+            self.stages.append({"stage": name, "seconds": seconds, "labels": labels})
+
+    def record_llm_call(
+        self,
+        model: str,
+        seconds: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        cache_hit: bool = False
+    ) -> None:
+        with self._lock:
+            self.llm_calls.append({
+                "model": model,
+                "seconds": seconds,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "cache_hit": cache_hit
+            })
+
+    def add_bytes(self, stage: str, read: int = 0, written: int = 0) -> None:
+        with self._lock:
+            if read:
+                self.bytes_read[stage] = self.bytes_read.get(stage, 0) + read
+            if written:
+                self.bytes_written[stage] = self.bytes_written.get(stage, 0) + written
+
+    def add_file_bytes(self, stage: str, read_path: Optional[str] = None, written_path: Optional[str] = None) -> None:
+        """파일 크기만큼 읽기/쓰기 바이트 추가 (파일이 없으면 무시)"""
+        def size(path):
+            return os.path.getsize(path) if path and os.path.exists(path) else 0
+        self.add_bytes(stage, read=size(read_path), written=size(written_path))
+
+    def summary(self) -> Dict:
+        """단계별·모델별 집계"""
+        with self._lock:
+            stages = list(self.stages)
+            llm_calls = list(self.llm_calls)
+            bytes_read = dict(self.bytes_read)
+            bytes_written = dict(self.bytes_written)
+
+        stage_summary: Dict[str, Dict] = {}
+        for record in stages:
+            entry = stage_summary.setdefault(record["stage"], {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            entry["count"] += 1
+            entry["total_seconds"] += record["seconds"]
+            entry["max_seconds"] = max(entry["max_seconds"], record["seconds"])
+
+        llm_summary: Dict[str, Dict] = {}
+        for call in llm_calls:
+            entry = llm_summary.setdefault(call["model"], {
+                "calls": 0, "cache_hits": 0, "total_seconds": 0.0,
+                "prompt_tokens": 0, "completion_tokens": 0
+            })
+            entry["calls"] += 1
+            entry["cache_hits"] += int(call["cache_hit"])
+            entry["total_seconds"] += call["seconds"]
+            entry["prompt_tokens"] += call["prompt_tokens"]
+            entry["completion_tokens"] += call["completion_tokens"]
+
+        return {
+            "labels": self.labels,
+            "started_at": self.started_at,
+            "wall_seconds": time.time() - self.started_at,
+            "stages": stage_summary,
+            "llm": llm_summary,
+            "bytes_read": bytes_read,
+            "bytes_written": bytes_written
+        }
+
+    def to_dict(self) -> Dict:
+        """집계와 개별 기록 전체 (JSON 파일용)"""
+        data = self.summary()
+        with self._lock:
+            data["events"] = {"stages": list(self.stages), "llm_calls": list(self.llm_calls)}
+        return data
+
+    def write_json(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Prometheus 텍스트 형식 (node_exporter textfile collector 등으로 수집)"""
+        summary = self.summary()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            full_name = f"{PROMETHEUS_PREFIX}_{name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{full_name}{suffix}{_format_labels(dict(self.labels, **labels))} {value}")
+
+        metric("run_seconds", "gauge", "Wall time of the lesson run", [("", {}, round(summary["wall_seconds"], 6))])
+        metric("stage_seconds", "summary", "Wall time per pipeline stage", [
+            sample
+            for stage, entry in summary["stages"].items()
+            for sample in [
+                ("_sum", {"stage": stage}, round(entry["total_seconds"], 6)),
+                ("_count", {"stage": stage}, entry["count"])
+            ]
+        ])
+        metric("stage_max_seconds", "gauge", "Slowest single run of each stage", [
+            ("", {"stage": stage}, round(entry["max_seconds"], 6)) for stage, entry in summary["stages"].items()
+        ])
+        metric("llm_calls_total", "counter", "LLM calls by model and cache result", [
+            sample
+            for model, entry in summary["llm"].items()
+            for sample in [
+                ("", {"model": model, "cache": "hit"}, entry["cache_hits"]),
+                ("", {"model": model, "cache": "miss"}, entry["calls"] - entry["cache_hits"])
+            ]
+        ])
+        metric("llm_seconds_total", "counter", "Time spent waiting for LLM calls", [
+            ("", {"model": model}, round(entry["total_seconds"], 6)) for model, entry in summary["llm"].items()
+        ])
+        metric("llm_tokens_total", "counter", "LLM tokens by model and kind", [
+            sample
+            for model, entry in summary["llm"].items()
+            for sample in [
+                ("", {"model": model, "kind": "prompt"}, entry["prompt_tokens"]),
+                ("", {"model": model, "kind": "completion"}, entry["completion_tokens"])
+            ]
+        ])
+        metric("bytes_total", "counter", "Bytes read and written by stage", [
+            ("", {"stage": stage, "direction": direction}, value)
+            for direction, counts in [("read", summary["bytes_read"]), ("written", summary["bytes_written"])]
+            for stage, value in counts.items()
+        ])
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        # 수집기가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def write(self, path_stem: str) -> None:
+        """<path_stem>.metrics.json과 <path_stem>.prom 저장"""
+        directory = os.path.dirname(path_stem)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.write_json(f"{path_stem}.metrics.json")
+        self.write_prometheus(f"{path_stem}.prom")
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    # 라벨 값의 역슬래시·따옴표·줄바꿈은 이스케이프
+    escaped = [
+        key + '="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for key, value in sorted(labels.items())
+    ]
+    return "{" + ",".join(escaped) + "}"
+
+def usage_tokens(response) -> Dict[str, int]:
+    """LangChain 응답에서 프롬프트/응답 토큰 수 추출 (정보가 없으면 0)"""
+    usage = getattr(response, "usage_metadata", None) or {}
+    if usage:
+        return {"prompt_tokens": usage.get("input_tokens", 0), "completion_tokens": usage.get("output_tokens", 0)}
+    token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+    return {"prompt_tokens": token_usage.get("prompt_tokens", 0), "completion_tokens": token_usage.get("completion_tokens", 0)}
+
+_current = PipelineMetrics()
+
+def get_metrics() -> PipelineMetrics:
+    """현재 실행 중인 수업의 지표 (start_run 이전에는 프로세스 기본 인스턴스)"""
+    return _current
+
+def start_run(**labels: str) -> PipelineMetrics:
+    """새 수업 처리를 시작하며 지표를 초기화 (프로세스 단위 - 배치 모드는 수업마다 워커에서 호출)"""
+    global _current
+    _current = PipelineMetrics(**labels)
+    return _current
+
+def metrics_path_stem(output_file: str) -> str:
+    """리포트 경로에 대응하는 지표 파일 경로 (METRICS_DIR 설정 시 해당 디렉토리)"""
+    stem = os.path.splitext(output_file)[0]
+    if config.METRICS_DIR:
+        return os.path.join(config.METRICS_DIR, os.path.basename(stem))
+    return stem
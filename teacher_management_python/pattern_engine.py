@@ -0,0 +1,111 @@
+import json
+import re
+from typing import Dict, List, Optional, Set
+import config as config
+
+# 그룹 -> 라벨 -> 정규식 목록 (소문자로 정규화된 발화에 적용)
+# 라벨 순서는 우선순위를 의미합니다 (질문 유형, 피드백 유형은 먼저 정의된 라벨 하나만 집계)
+DEFAULT_PATTERN_TABLES: Dict[str, Dict[str, List[str]]] = {
+    "스캐폴딩": {
+        "단계별 분해": [r"let'?s break this down"],
+        "이전 학습 연계": [r"remember when we"],
+        "사고 확장": [r"think about what happens if"],
+        "설명 유도": [r"can you explain why"]
+    },
+    "질문_유형": {
+        "지식": [r"what is"],
+        "분석": [r"why do you think"]
+    },
+    "피드백_유형": {
+        "긍정_강화": [r"good", r"excellent", r"right"],
+        "교정_피드백": [r"instead", r"try"]
+    },
+    "학생_참여": {
+        "자발적_질문": [r"\?"],
+        "문제해결_시도": [r"i think"]
+    },
+    "수업_주제": {
+        keyword: [re.escape(keyword)]
+        for keyword in ["fraction", "multiply", "divide", "add", "subtract",
+                        "equation", "problem solving", "pizza", "pumpkin"]
+    }
+}
+
+def load_pattern_tables(path: Optional[str] = None) -> Dict[str, Dict[str, List[str]]]:
+    """기본 패턴 테이블에 설정 파일(JSON)의 그룹/라벨을 병합
+
+    설정 파일 형식은 DEFAULT_PATTERN_TABLES와 같으며, 같은 라벨은 패턴 목록을 덮어씁니다.
+    """
+    tables = {group: dict(labels) for group, labels in DEFAULT_PATTERN_TABLES.items()}
+    path = path or config.PATTERN_TABLES_PATH
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            overrides = json.load(f)
+        for group, labels in overrides.items():
+            tables.setdefault(group, {}).update(labels)
+    return tables
+
+REGEX_META_RE = re.compile(r"(?<!\\)[.^$*+?{}\[\]|()]")
+
+class PatternEngine:
+    """모든 정량 분석 패턴을 하나의 정규식으로 컴파일하여 발화당 한 번만 검사
+
+    모든 패턴을 하나의 전방탐색 선택식으로 묶어 정규화된 발화를 한 번 훑고,
+    일치한 부분 문자열만 패턴 표에서 찾아 라벨로 변환합니다.
+    (패턴마다 이름 있는 그룹을 두면 re 모듈의 첫 글자 사전 필터가 꺼져 크게 느려집니다)
+    같은 위치에서 시작하는 패턴이 여러 개면 테이블에서 먼저 정의된 패턴만 인식됩니다.
+    """
+
+    def __init__(self, tables: Optional[Dict[str, Dict[str, List[str]]]] = None):
+        self.tables = tables if tables is not None else load_pattern_tables()
+        self._labels = []  # 패턴 번호 -> (그룹, 라벨)
+        self._literal_index: Dict[str, List[int]] = {}  # 리터럴 패턴 문자열 -> 패턴 번호
+        self._regex_patterns = []  # (패턴 번호, 컴파일된 정규식)
+        self._resolved: Dict[str, List[int]] = {}  # 일치 문자열 -> 패턴 번호 (반복되는 일치 재사용)
+        alternatives = []
+        for group, labels in self.tables.items():
+            for label, patterns in labels.items():
+                for pattern in patterns:
+                    index = len(self._labels)
+                    self._labels.append((group, label))
+                    if REGEX_META_RE.search(pattern):
+                        self._regex_patterns.append((index, re.compile(pattern)))
+                    else:
+                        literal = re.sub(r"\\(.)", r"\1", pattern)
+                        self._literal_index.setdefault(literal, []).append(index)
+                    # 패턴 내부의 | 가 전체 선택식에 섞이지 않도록 비캡처 그룹으로 감쌈
+                    alternatives.append(f"(?:{pattern})")
+        self._matcher = re.compile("(?=(" + "|".join(alternatives) + "))") if alternatives else None
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return text.lower().replace("’", "'")
+
+    def _resolve(self, matched: str) -> List[int]:
+        """일치한 문자열에 해당하는 패턴 번호 목록"""
+        indices = self._resolved.get(matched)
+        if indices is None:
+            indices = list(self._literal_index.get(matched, ()))
+            for index, regex in self._regex_patterns:
+                if regex.fullmatch(matched):
+                    indices.append(index)
+            self._resolved[matched] = indices
+        return indices
+
+    def match(self, text: str) -> Dict[str, Set[str]]:
+        """발화에서 일치한 라벨을 그룹별로 반환"""
+        hits: Dict[str, Set[str]] = {}
+        if self._matcher is None:
+            return hits
+        for m in self._matcher.finditer(self.normalize(text)):
+            for index in self._resolve(m.group(1)):
+                group, label = self._labels[index]
+                hits.setdefault(group, set()).add(label)
+        return hits
+
+    def ordered_labels(self, group: str, hits: Dict[str, Set[str]]) -> List[str]:
+        """일치한 라벨을 테이블에 정의된 순서대로 반환"""
+        matched = hits.get(group)
+        if not matched:
+            return []
+        return [label for label in self.tables.get(group, {}) if label in matched]
@@ -18,12 +18,41 @@ class TeachingPrompts:
 {TeachingPrompts._format_conversations(chunk_data['대화_세션'])}
 
 각 영역별로 구체적인 근거와 함께 평가해주세요.
+"""
+
+    @staticmethod
+    def get_chunk_analysis_prompt(chunk_data: Dict) -> str:
+        return f"""
+다음 수업 데이터를 분석하여 질적 분석과 평가를 한 번에 작성해주세요:
+
+1. 정량적 지표:
+{TeachingPrompts._format_metrics(chunk_data)}
+
+2. 대화 내용:
+{TeachingPrompts._format_conversations(chunk_data['대화_세션'])}
+
+응답 항목:
+- qualitative_analysis.teacher_expertise: 교사 전문성 (개념 설명의 명확성, 학생 이해도 점검, 교사 전략의 적절성)
+- qualitative_analysis.classroom_discourse: 수업 담화 (대화의 질, 질문의 수준, 피드백의 효과성)
+- qualitative_analysis.learning_environment: 학습 환경 (학생 참여도, 상호작용의 질, 수업 분위기)
+- detailed_evaluation: 영역별 세부 평가 (구체적인 근거 포함)
+- strengths: 특히 우수한 부분
+- improvements: 개선이 필요한 부분
+
+목록 항목은 대화 속 구체적인 예시를 담은 한 문장으로 작성해주세요.
 """
 
     @staticmethod
     def get_scoring_prompt(detailed_eval: str, qualitative_analysis: Dict, metrics: Dict) -> str:
         return f"""
-다음 데이터를 바탕으로 각 영역의 점수를 산출해주세요:
+다음 데이터를 바탕으로 각 영역의 점수를 산출해주세요.
+반드시 아래와 같은 형식으로만 응답해주세요:
+
+학생 참여: [숫자]
+개념 설명: [숫자]
+피드백: [숫자]
+체계성: [숫자]
+상호작용: [숫자]
 
 1. 세부 평가:
 {detailed_eval}
@@ -34,7 +63,35 @@ class TeachingPrompts:
 3. 정량적 지표:
 {metrics}
 
+평가 기준:
+- 15-20점: 탁월한 성과
+- 10-14점: 기본 요구사항 충족
+- 5-9점: 개선 필요
+- 0-4점: 심각한 문제
+
 각 영역은 0-20점 사이의 정수로 평가해주세요.
+다른 설명은 일체 하지 말고, 오직 위 형식의 점수만 응답해주세요.
+"""
+
+    @staticmethod
+    def get_summary_prompt(evaluations: List[str]) -> str:
+        sections = "\n\n".join(
+            f"[구간 {index}]\n{evaluation.strip()}" for index, evaluation in enumerate(evaluations, 1)
+        )
+        return f"""
+다음은 한 수업의 연속된 구간들에 대한 세부 평가입니다.
+점수 산출에 사용할 수 있도록 아래 영역별로 핵심 근거를 요약해주세요:
+
+- 학생 참여
+- 개념 설명
+- 피드백
+- 체계성
+- 상호작용
+
+각 영역은 2-3문장으로, 잘한 점과 부족한 점의 구체적인 근거(빈도, 사례)를 모두 남겨주세요.
+구간 간 차이가 크면 그 변화도 적어주세요.
+
+{sections}
 """
 
     @staticmethod
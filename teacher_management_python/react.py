@@ -1,9 +1,80 @@
-from typing import Dict, List
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, List, Optional
 from dataclasses import dataclass
-from langchain_openai import ChatOpenAI
-from langchain.schema import SystemMessage, HumanMessage
+from llm_cache import CachedChatModel
+from concurrency import map_ordered
+from metrics import get_metrics
 import config as config
 
+WHITESPACE_RE = re.compile(r"\s+")
+
+def normalize_concept(concept: str) -> str:
+    """개념 캐시 키 - 유니코드(NFKC)·대소문자·공백 차이를 무시한 개념 이름"""
+    return WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", concept)).strip().casefold()
+
+class ConceptCache:
+    """정규화한 개념 이름을 키로 파싱된 개념 팝업을 저장하는 디스크 캐시
+
+    문제 생성용 LLM은 temperature > 0이라 응답 캐시(llm_cache)를 거치지 않으므로
+    개념 팝업은 이 캐시로 재사용합니다.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.CONCEPT_CACHE_PATH
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS concepts (
+                    concept TEXT PRIMARY KEY,
+                    popup TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+
+    def get(self, concept: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT popup FROM concepts WHERE concept = ?", (normalize_concept(concept),)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, concept: str, popup: Dict, model: str = "") -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO concepts (concept, popup, model, created_at) VALUES (?, ?, ?, ?)",
+                    (normalize_concept(concept), json.dumps(popup, ensure_ascii=False), model, time.time())
+                )
+
+    def missing(self, concepts: Iterable[str]) -> List[str]:
+        """캐시에 없는 개념 (정규화 기준 중복 제거, 처음 나온 표기 유지)"""
+        unique = _unique_concepts(concepts)
+        with self._lock:
+            cached = {
+                row[0] for row in self._conn.execute(
+                    f"SELECT concept FROM concepts WHERE concept IN ({','.join('?' * len(unique))})",
+                    [normalize_concept(concept) for concept in unique]
+                )
+            } if unique else set()
+        return [concept for concept in unique if normalize_concept(concept) not in cached]
+
+def _unique_concepts(concepts: Iterable[str]) -> List[str]:
+    unique: Dict[str, str] = {}
+    for concept in concepts:
+        if normalize_concept(concept):
+            unique.setdefault(normalize_concept(concept), concept.strip())
+    return list(unique.values())
+
 @dataclass
 class ProblemTemplate:
     subject: str
@@ -12,13 +83,42 @@ class ProblemTemplate:
     concept: str
 
 class AIBookGenerator:
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            api_key=config.OPENAI_API_KEY,
-            model="gpt-4.1-2025-04-14",
-            temperature=0.7
-        )
+    def __init__(self, max_concurrency: Optional[int] = None, concept_cache: Optional[ConceptCache] = None):
+        self.llm = CachedChatModel(temperature=0.7)
+        self.max_concurrency = max_concurrency if max_concurrency is not None else config.LLM_MAX_CONCURRENCY
+        if concept_cache is None and config.CONCEPT_CACHE_ENABLED:
+            concept_cache = ConceptCache()
+        self.concept_cache = concept_cache
+        # 같은 개념을 동시에 요청하면 (미리 생성 중인 개념을 교사가 여는 경우 등) 한 번만 생성
+        # 개념 -> [잠금, 대기·진행 중인 요청 수] - 요청이 모두 끝나면 항목을 지워 개념 수만큼 쌓이지 않음
+        self._lock = threading.Lock()
+        self._concept_locks: Dict[str, list] = {}
         
+    def generate_similar_problems(self, templates: List[ProblemTemplate]) -> List[Dict]:
+        """여러 유사 문제를 동시에 생성 (결과는 입력 순서대로)"""
+        return map_ordered(self.generate_similar_problem, templates, max_workers=self.max_concurrency)
+    
+    def generate_concept_popups(self, concepts: Iterable[str]) -> Dict[str, Dict]:
+        """여러 개념 팝업을 동시에 생성해 {개념: 팝업} 반환 (정규화 기준으로 같은 개념은 한 번만 생성)"""
+        concepts = [concept for concept in concepts if normalize_concept(concept)]
+        unique = _unique_concepts(concepts)
+        popups = dict(zip(
+            map(normalize_concept, unique),
+            map_ordered(self.generate_concept_popup, unique, max_workers=self.max_concurrency)
+        ))
+        return {concept: popups[normalize_concept(concept)] for concept in concepts}
+    
+    def prewarm_concepts(self, concepts: Iterable[str]) -> int:
+        """캐시에 없는 개념 팝업을 미리 생성하고 새로 생성한 개수 반환"""
+        if self.concept_cache is None:
+            return 0
+        missing = self.concept_cache.missing(concepts)
+        if missing:
+            with get_metrics().stage("prewarm", kind="concept"):
+                self.generate_concept_popups(missing)
+        return len(missing)
+        
+
     def generate_similar_problem(self, template: ProblemTemplate) -> Dict:
         """유사 문제 생성"""
         prompt = f"""
@@ -33,6 +133,7 @@ class AIBookGenerator:
 2. 풀이 과정은 단계별로 자세히 설명해주세요.
 3. 교사가 수업에서 바로 활용할 수 있도록 작성해주세요.
 """
+        from langchain_core.messages import HumanMessage, SystemMessage
         response = self.llm.invoke([
             SystemMessage(content="당신은 숙련된 교사입니다."),
             HumanMessage(content=prompt)
@@ -41,7 +142,33 @@ class AIBookGenerator:
         return self._parse_problem_response(response.content)
     
     def generate_concept_popup(self, concept: str) -> Dict:
-        """개념 팝업 생성"""
+        """개념 팝업 생성 (캐시에 있으면 LLM 호출 없이 반환)"""
+        if self.concept_cache is None:
+            return self._generate_concept_popup(concept)
+        
+        key = normalize_concept(concept)
+        with self._lock:
+            entry = self._concept_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                started = time.perf_counter()
+                popup = self.concept_cache.get(key)
+                if popup is not None:
+                    get_metrics().record_llm_call(self.llm.model, time.perf_counter() - started, cache_hit=True)
+                    return popup
+                popup = self._generate_concept_popup(concept.strip())
+                # 형식이 맞지 않아 빈 결과로 파싱된 응답은 저장하지 않음
+                if any(popup.values()):
+                    self.concept_cache.put(key, popup, self.llm.model)
+            return popup
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._concept_locks[key]
+    
+    def _generate_concept_popup(self, concept: str) -> Dict:
         prompt = f"""
 다음 개념에 대한 교사용 설명 자료를 생성해주세요:
 
@@ -53,6 +180,7 @@ class AIBookGenerator:
 3. 교수 팁 (실생활 예시, 시각화 방법 등)
 4. 심화 학습 연계 포인트
 """
+        from langchain_core.messages import HumanMessage, SystemMessage
         response = self.llm.invoke([
             SystemMessage(content="당신은 교육과정 전문가입니다."),
             HumanMessage(content=prompt)
@@ -108,3 +236,22 @@ class AIBookGenerator:
                     sections[current_section].append(line[1:].strip())
                     
         return sections
+
+def start_concept_prewarm(concepts: Iterable[str], generator: Optional[AIBookGenerator] = None) -> threading.Thread:
+    """개념 팝업 미리 생성을 백그라운드 스레드로 시작 (실패해도 경고만 출력)
+
+    반환된 스레드는 데몬이 아니므로 프로세스 종료 전에 join()으로 완료를 기다릴 수 있습니다.
+    """
+    concepts = list(concepts)
+
+    def run():
+        try:
+            created = (generator or AIBookGenerator()).prewarm_concepts(concepts)
+            if created:
+                print(f"개념 팝업 {created}개를 미리 생성했습니다.")
+        except Exception as e:
+            print(f"Warning: 개념 팝업 미리 생성 실패 ({type(e).__name__}: {e})")
+
+    thread = threading.Thread(target=run, name="concept-prewarm")
+    thread.start()
+    return thread
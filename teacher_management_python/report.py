@@ -1,11 +1,8 @@
 from dataclasses import dataclass
 from typing import Dict, List, Optional
 from datetime import datetime
-from data_processing import process_teaching_text
-from assess import TeachingAssessor
+from metrics import get_metrics
 import config as config
-from langchain_openai import ChatOpenAI
-from langchain.schema import SystemMessage, HumanMessage
 
 @dataclass
 class ScoreData:
@@ -65,6 +62,48 @@ class ReportGenerator:
             improvements=improvements_table
         )
     
+    def generate_quantitative_section(self, processed_data: Dict) -> str:
+        """정량 지표 구간 (LLM 평가 전에 먼저 보여줄 수 있는 부분)"""
+        strategy = processed_data["교사_전략"]
+        rows = [
+            ("대화", f"{len(processed_data['대화_세션'])}회 (교사 {len(processed_data['교사_발화'])}, 학생 {len(processed_data['학생_발화'])})"),
+            *[(key.replace('_', ' '), value) for key, value in processed_data["핵심_지표"].items()],
+            ("스캐폴딩", f"{len(strategy['스캐폴딩'])}건"),
+            ("질문 유형", ", ".join(f"{key} {value}" for key, value in strategy["질문_유형"].items())),
+            *[(f"학생 {key.replace('_', ' ')}", value) for key, value in processed_data["학생_참여"].items()],
+            *[(key.replace('_', ' '), value) for key, value in processed_data["피드백_분석"].items()]
+        ]
+        subjects = ", ".join(sorted(processed_data["수업_주제"])) or "-"
+        table = "\n".join(f"| {name} | {value} |" for name, value in rows)
+        return f"""## 📏 정량 지표
+- 수업 주제: **{subjects}**
+
+| 지표 | 값 |
+|:-----|:---|
+{table}
+"""
+    
+    def generate_chunk_section(self, index: int, total: int, chunk_assessment: Dict) -> str:
+        """청크(수업 구간) 하나의 평가 결과 구간"""
+        sections = [f"### 🧩 구간 {index + 1}/{total}", chunk_assessment.get("세부_평가", "").strip()]
+        if chunk_assessment.get("우수점"):
+            sections.append("**우수점**\n" + "\n".join(f"- {item}" for item in chunk_assessment["우수점"]))
+        if chunk_assessment.get("개선점"):
+            sections.append("**개선점**\n" + "\n".join(f"- {item}" for item in chunk_assessment["개선점"]))
+        return "\n\n".join(section for section in sections if section) + "\n"
+    
+    def generate_score_section(self, scores: Dict[str, int]) -> str:
+        """종합 평가 결과 구간 (점수 산출 후)"""
+        score_data = {key: ScoreData(value) for key, value in scores.items()}
+        total_score = sum(score.raw_score for score in score_data.values())
+        return f"""## 📊 종합 평가 결과
+- 전체 평가 등급: **{ScoreData(total_score, 100).grade}** ({total_score}점)
+
+| 평가 영역 | 획득 점수 | 만점 | 등급 | 백분율 |
+|:----------|:---------:|:----:|:----:|:------:|
+{self._generate_score_table(score_data)}
+"""
+    
     def _generate_detailed_analysis(self, qualitative_analysis: Dict[str, List[str]]) -> str:
         sections = []
         for category, items in qualitative_analysis.items():
@@ -133,4 +172,5 @@ class ReportGenerator:
 def generate_fancy_report(assessment_result: Dict) -> str:
     """외부에서 호출할 수 있는 리포트 생성 함수"""
     generator = ReportGenerator()
-    return generator.generate_fancy_report(assessment_result)
+    with get_metrics().stage("render"):
+        return generator.generate_fancy_report(assessment_result)
@@ -0,0 +1,25 @@
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+import config as config
+
+def read_json(path: str):
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        return json.load(f)
+
+def iter_report_dirs(reports_dir: Optional[str] = None) -> Iterator[Tuple[str, str, str]]:
+    """(교사, 리포트 ID, 디렉토리 경로)를 교사·리포트 ID 순서대로 반환"""
+    reports_dir = reports_dir or config.REPORTS_DIR
+    for teacher in sorted(os.listdir(reports_dir)):
+        teacher_dir = os.path.join(reports_dir, teacher)
+        if not os.path.isdir(teacher_dir):
+            continue
+        for report_id in sorted(os.listdir(teacher_dir)):
+            report_dir = os.path.join(teacher_dir, report_id)
+            if os.path.isdir(report_dir) and report_id.isdigit():
+                yield teacher, report_id, report_dir
+
+def load_transcript_utterances(transcript_path: str) -> List[Dict]:
+    transcript = read_json(transcript_path)
+    # 초기 리포트는 전처리 결과(대화_세션)를 그대로 저장한 형식
+    return transcript.get("utterances") or transcript.get("대화_세션") or []
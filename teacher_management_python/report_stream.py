@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+from data_processing import TeachingDataProcessor
+from assess import TeachingAssessor
+from chunking import chunk_conversation
+from checkpoint import CheckpointStore
+from concurrency import map_ordered
+from report import ReportGenerator, generate_fancy_report
+from metrics import metrics_path_stem, start_run
+import config as config
+
+def iter_report_events(
+    processor: TeachingDataProcessor,
+    assessor: Optional[TeachingAssessor] = None,
+    stream_tokens: bool = True
+) -> Iterator[Dict]:
+    """리포트 구간을 입력이 준비되는 대로 이벤트(dict)로 반환하는 제너레이터
+
+    - {"event": "quantitative", "markdown"}: 대화 추출·패턴 집계 직후 (LLM 호출 전)
+    - {"event": "token", "chunk", "text"}: 청크 평가 응답 조각 (stream_tokens, 구조화 출력 모드 제외)
+    - {"event": "chunk", "chunk", "total", "markdown", "우수점", "개선점"}: 청크 분석·평가가 끝나는 순서대로
+    - {"event": "scores", "scores", "markdown"}: 최종 점수 산출 후
+    - {"event": "report", "markdown"}: 전체 리포트 (generate_fancy_report와 같은 내용)
+
+    청크 평가에는 수업 전체 정량 지표와 그 청크의 질적 분석을 사용합니다 (스트리밍 파이프라인과 같은 방식).
+    중간에 반복을 멈추면 아직 시작하지 않은 청크 작업은 취소됩니다.
+    """
+    assessor = assessor or TeachingAssessor(max_concurrency=processor.max_concurrency, checkpoint=processor.checkpoint)
+    generator = ReportGenerator()
+
+    processed_data = processor.analyze_quantitative()
+    yield {"event": "quantitative", "markdown": generator.generate_quantitative_section(processed_data)}
+
+    chunks = chunk_conversation(processed_data["대화_세션"], model=assessor.llm.model)
+    events: "queue.Queue[Tuple[str, object]]" = queue.Queue()
+    closed = threading.Event()
+
+    def analyze(item: Tuple[int, List[Tuple[str, str]]]) -> Tuple[Dict, Dict]:
+        index, chunk = item
+        if closed.is_set():
+            raise RuntimeError("report stream closed")
+        if assessor.structured:
+            assessment = assessor.analyze_chunk_structured(
+                assessor.build_chunk_data(chunk, dict(processed_data, 질적_분석={}))
+            )
+            return assessment.pop("질적_분석"), assessment
+        qualitative = processor.analyze_chunk_with_llm(chunk)
+
+        def on_token(text: str) -> None:
+            events.put(("event", {"event": "token", "chunk": index, "text": text}))
+
+        chunk_data = assessor.build_chunk_data(chunk, dict(processed_data, 질적_분석=qualitative))
+        return qualitative, assessor.assess_chunk(chunk_data, on_token if stream_tokens else None)
+
+    def on_complete(index: int, result: Tuple[Dict, Dict]) -> None:
+        assessment = result[1]
+        events.put(("event", {
+            "event": "chunk",
+            "chunk": index,
+            "total": len(chunks),
+            "markdown": generator.generate_chunk_section(index, len(chunks), assessment),
+            "우수점": assessment["우수점"],
+            "개선점": assessment["개선점"]
+        }))
+
+    def run() -> None:
+        try:
+            results = map_ordered(
+                analyze, list(enumerate(chunks)), max_workers=assessor.max_concurrency, on_complete=on_complete
+            )
+            events.put(("done", results))
+        except BaseException as e:
+            events.put(("error", e))
+
+    worker = threading.Thread(target=run, name="report-stream", daemon=True)
+    worker.start()
+    try:
+        while True:
+            kind, payload = events.get()
+            if kind == "error":
+                raise payload
+            if kind == "done":
+                results = payload
+                break
+            yield payload
+    finally:
+        closed.set()
+
+    for qualitative, _ in results:
+        for category, items in qualitative.items():
+            processed_data["질적_분석"][category].extend(items)
+    assessment_result = assessor.generate_final_assessment([assessment for _, assessment in results], processed_data)
+    yield {
+        "event": "scores",
+        "scores": assessment_result["scores"],
+        "markdown": generator.generate_score_section(assessment_result["scores"])
+    }
+    yield {"event": "report", "markdown": generate_fancy_report(assessment_result)}
+
+def open_processor(input_file: str) -> TeachingDataProcessor:
+    """전사문(.txt 또는 transcript.json)에서 전처리기 생성 (main_pipe와 같은 체크포인트 사용)"""
+    if input_file.endswith(".json"):
+        checkpoint = CheckpointStore.for_file(input_file) if config.CHECKPOINT_ENABLED else None
+        return TeachingDataProcessor.from_transcript_json(input_file, checkpoint=checkpoint)
+    with open(input_file, 'r', encoding='utf-8') as f:
+        raw_text = f.read()
+    checkpoint = CheckpointStore.for_input(raw_text) if config.CHECKPOINT_ENABLED else None
+    return TeachingDataProcessor(raw_text, checkpoint=checkpoint)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="수업 평가 리포트를 구간별 NDJSON 이벤트로 출력 (한 줄에 이벤트 하나)")
+    parser.add_argument("input", help="전사문 (.txt 또는 transcript.json)")
+    parser.add_argument("--output", help="완성된 리포트(markdown) 저장 경로")
+    parser.add_argument("--no-tokens", action="store_true", help="청크 평가 응답 조각(token 이벤트) 생략")
+    args = parser.parse_args()
+
+    metrics = start_run(lesson=os.path.splitext(os.path.basename(args.input))[0])
+    # 진행 로그는 stderr로 보내 stdout에는 이벤트만 남김
+    out = sys.stdout
+    sys.stdout = sys.stderr
+
+    def emit(event: Dict) -> None:
+        out.write(json.dumps(event, ensure_ascii=False) + "\n")
+        out.flush()
+
+    try:
+        processor = open_processor(args.input)
+        for event in iter_report_events(processor, stream_tokens=not args.no_tokens):
+            emit(event)
+            if event["event"] == "report" and args.output:
+                if os.path.dirname(args.output):
+                    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    f.write(event["markdown"])
+    except Exception as e:
+        emit({"event": "error", "message": f"{type(e).__name__}: {e}"})
+        return 1
+    finally:
+        if args.output and config.METRICS_ENABLED:
+            metrics.write(metrics_path_stem(args.output))
+
+    if processor.checkpoint is not None:
+        processor.checkpoint.clear()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+import re
+from typing import Dict, Iterable, List, Sequence, Tuple
+import numpy as np
+
+# 교사 발화에 자주 나타나는 표현 (부분 문자열 기준)
+TEACHER_PATTERNS = [
+    "let's", "look at", "can anyone", "tell me",
+    "does anyone", "remember", "explain",
+    "understand", "question", "next",
+    "class", "everyone", "please"
+]
+# 전방 탐색 안의 캡처 그룹 하나로 겹치는 표현까지 한 번의 스캔으로 찾음
+TEACHER_PATTERN_RE = re.compile("(?=(" + "|".join(re.escape(pattern) for pattern in TEACHER_PATTERNS) + "))")
+
+# 화자(청크, 화자 기호)별 특징 행렬의 열
+FEATURES = ["교사_표현_수", "평균_발화_길이", "발화_횟수", "발화_시간", "발화_속도"]
+# 청크가 달라도 같은 사람이면 비슷한 값 - 청크 간 화자 연결에 사용 (글자당 발화 시간, log)
+IDENTITY_FEATURES = [FEATURES.index("발화_속도")]
+
+def teacher_pattern_hits(text: str) -> int:
+    """발화에 포함된 서로 다른 교사 표현 수"""
+    return len(set(TEACHER_PATTERN_RE.findall(text.lower())))
+
+def speaking_ms(utterance) -> int:
+    """단어 타임스탬프 합계로 계산한 실제 발화 시간 (단어 정보가 없으면 발화 구간 길이)"""
+    words = getattr(utterance, "words", None) or []
+    if words:
+        return sum(max(0, word.end - word.start) for word in words)
+    return max(0, (getattr(utterance, "end", 0) or 0) - (getattr(utterance, "start", 0) or 0))
+
+def utterance_speaking_ms(utterance: Dict) -> int:
+    """발화 dict의 발화 시간 (speaking_ms가 없으면 발화 구간 길이)"""
+    duration = utterance.get("speaking_ms")
+    if duration is None:
+        duration = max(0, (utterance.get("end") or 0) - (utterance.get("start") or 0))
+    return duration
+
+def _feature_matrix(turns: np.ndarray, total_length: np.ndarray, total_hits: np.ndarray, total_ms: np.ndarray) -> np.ndarray:
+    """화자별 합계 -> FEATURES 열 순서의 특징 행렬"""
+    return np.column_stack([
+        total_hits,
+        total_length / turns,
+        turns,
+        total_ms,
+        np.log1p(total_ms / np.maximum(total_length, 1))
+    ])
+
+def speaker_features(chunks: Sequence[List[Dict]]) -> Tuple[List[Tuple[int, str]], np.ndarray]:
+    """(청크, 화자 기호)별 특징 행렬을 한 번의 순회로 생성
+
+    Returns:
+        tracks: 행 순서의 (청크 번호, 화자 기호) 목록
+        features: tracks × FEATURES 행렬
+    """
+    chunk_ids, speakers, lengths, hits, durations = [], [], [], [], []
+    for chunk_id, utterances in enumerate(chunks):
+        for utterance in utterances:
+            text = utterance.get("text") or ""
+            chunk_ids.append(chunk_id)
+            speakers.append(str(utterance.get("speaker") or ""))
+            lengths.append(len(text))
+            hits.append(teacher_pattern_hits(text))
+            durations.append(utterance_speaking_ms(utterance))
+
+    if not chunk_ids:
+        return [], np.zeros((0, len(FEATURES)))
+
+    chunk_ids = np.asarray(chunk_ids)
+    speaker_names, speaker_ids = np.unique(np.asarray(speakers, dtype=object), return_inverse=True)
+    unique_keys, track_of = np.unique(chunk_ids * len(speaker_names) + speaker_ids, return_inverse=True)
+    n_tracks = len(unique_keys)
+
+    turns = np.bincount(track_of, minlength=n_tracks).astype(float)
+    total_length = np.bincount(track_of, weights=np.asarray(lengths, dtype=float), minlength=n_tracks)
+    total_hits = np.bincount(track_of, weights=np.asarray(hits, dtype=float), minlength=n_tracks)
+    total_ms = np.bincount(track_of, weights=np.asarray(durations, dtype=float), minlength=n_tracks)
+
+    features = _feature_matrix(turns, total_length, total_hits, total_ms)
+    tracks = [(int(key // len(speaker_names)), speaker_names[key % len(speaker_names)]) for key in unique_keys]
+    return tracks, features
+
+def chunk_role_scores(track_chunk: np.ndarray, features: np.ndarray) -> np.ndarray:
+    """청크 안에서의 교사 근거 점수 (기존 점수식을 청크별로 표준화)
+
+    기존 점수식: 교사 표현 수 × 2 + 평균 발화 길이 × 0.5 + 발화 횟수 × 0.3
+    """
+    raw = features[:, 0] * 2 + features[:, 1] * 0.5 + features[:, 2] * 0.3
+    counts = np.bincount(track_chunk).astype(float)
+    mean = np.bincount(track_chunk, weights=raw) / counts
+    variance = np.bincount(track_chunk, weights=raw ** 2) / counts - mean ** 2
+    std = np.sqrt(np.maximum(variance, 0))
+    return (raw - mean[track_chunk]) / np.where(std > 0, std, 1)[track_chunk]
+
+def _teacher_per_chunk(track_chunk: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    """청크마다 점수가 가장 높은 화자 하나를 교사로 표시"""
+    order = np.lexsort((-scores, track_chunk))
+    is_teacher = np.zeros(len(scores), dtype=bool)
+    first_of_chunk = np.ones(len(order), dtype=bool)
+    first_of_chunk[1:] = track_chunk[order][1:] != track_chunk[order][:-1]
+    is_teacher[order[first_of_chunk]] = True
+    return is_teacher
+
+def link_teacher_tracks(tracks: List[Tuple[int, str]], features: np.ndarray, max_iterations: int = 20) -> np.ndarray:
+    """청크 간 화자를 연결하여 청크마다 교사 화자 하나를 결정
+
+    청크 안의 교사 근거 점수로 시작해, 전체 청크에서 교사로 정해진 화자들과 발화 속도가
+    얼마나 가까운지(학생 쪽 중심 대비)를 더해 청크마다 교사를 다시 고르는 과정을 반복합니다.
+    한 청크에서 학생이 더 많이 말해도 다른 청크의 교사와 같은 사람으로 보이는 화자가 교사가 됩니다.
+    """
+    if not tracks:
+        return np.zeros(0, dtype=bool)
+    track_chunk = np.asarray([chunk for chunk, _ in tracks])
+    role_scores = chunk_role_scores(track_chunk, features)
+    identity = features[:, IDENTITY_FEATURES]
+    spread = identity.std(axis=0)
+    identity = identity / np.where(spread > 0, spread, 1)
+
+    is_teacher = _teacher_per_chunk(track_chunk, role_scores)
+    for _ in range(max_iterations):
+        if is_teacher.all() or not is_teacher.any():
+            break
+        teacher_center = identity[is_teacher].mean(axis=0)
+        student_center = identity[~is_teacher].mean(axis=0)
+        margin = (
+            np.linalg.norm(identity - student_center, axis=1)
+            - np.linalg.norm(identity - teacher_center, axis=1)
+        )
+        updated = _teacher_per_chunk(track_chunk, role_scores + margin)
+        if np.array_equal(updated, is_teacher):
+            break
+        is_teacher = updated
+    return is_teacher
+
+def assign_roles(chunks: Sequence[List[Dict]]) -> List[List[Dict]]:
+    """모든 청크의 전사가 끝난 뒤 화자 기호를 Teacher/Student로 일괄 변환
+
+    청크별 전사 작업마다 화자 기호(A, B…)가 독립적으로 매겨지므로 청크 간 특징을 비교해 역할을 정합니다.
+    원래 화자 기호는 speaker_label에 남깁니다.
+    """
+    tracks, features = speaker_features(chunks)
+    is_teacher = link_teacher_tracks(tracks, features)
+    roles = {track: "Teacher" if teacher else "Student" for track, teacher in zip(tracks, is_teacher)}
+    return [
+        [
+            dict(utterance, speaker=roles[(chunk_id, str(utterance.get("speaker") or ""))], speaker_label=utterance.get("speaker"))
+            for utterance in utterances
+        ]
+        for chunk_id, utterances in enumerate(chunks)
+    ]
+
+def assign_speaker_roles(utterances: Iterable[Dict]) -> Dict[str, str]:
+    """전사 하나의 화자 기호 -> Teacher/Student (전체를 한 청크로 본 assign_roles와 같은 결과)
+
+    발화를 한 번 순회하며 화자별 합계만 유지하므로 발화 목록을 메모리에 올리지 않고 쓸 수 있습니다
+    (transcript.json 스트리밍 입력용).
+    """
+    totals: Dict[str, List[float]] = {}  # 화자 기호 -> [발화 횟수, 글자 수, 교사 표현 수, 발화 시간]
+    for utterance in utterances:
+        text = utterance.get("text") or ""
+        total = totals.setdefault(str(utterance.get("speaker") or ""), [0, 0, 0, 0])
+        total[0] += 1
+        total[1] += len(text)
+        total[2] += teacher_pattern_hits(text)
+        total[3] += utterance_speaking_ms(utterance)
+    if not totals:
+        return {}
+
+    speakers = sorted(totals)  # assign_roles(np.unique)와 같은 화자 순서
+    turns, total_length, total_hits, total_ms = np.asarray([totals[speaker] for speaker in speakers], dtype=float).T
+    features = _feature_matrix(turns, total_length, total_hits, total_ms)
+    is_teacher = link_teacher_tracks([(0, speaker) for speaker in speakers], features)
+    return {speaker: "Teacher" if teacher else "Student" for speaker, teacher in zip(speakers, is_teacher)}
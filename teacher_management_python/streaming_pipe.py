@@ -0,0 +1,203 @@
+import copy
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from data_processing import TeachingDataProcessor
+from assess import TeachingAssessor
+from chunking import StreamingChunker
+from concurrency import release_in_order
+from text_transcript import prepare_segments, transcribe_chunks, append_transcript, assign_chunk_roles
+from report import generate_fancy_report
+from metrics import metrics_path_stem, start_run
+import config as config
+
+_END = object()  # 입력 종료 표시
+
+class StreamingLessonPipeline:
+    """전사 결과가 도착하는 대로 정량 분석과 청크별 LLM 평가를 진행하는 파이프라인
+
+    전사 청크(발화 목록)를 feed()로 넣으면 분석 스레드가 대기열에서 꺼내
+    대화 추출·패턴 집계·청크 분할을 하고, 확정된 청크는 바로 LLM 평가 작업으로 넘깁니다.
+    finish()는 남은 청크를 처리한 뒤 최종 점수 산출만 마지막에 수행합니다.
+
+    - 대기열(STREAM_QUEUE_SIZE)과 진행 중인 LLM 작업 수(동시 실행 수의 2배)가 차면
+      앞 단계가 대기하므로 메모리 사용량이 강의 길이와 관계없이 제한됩니다.
+    - 청크 평가에는 해당 청크 끝까지 누적된 정량 지표와 그 청크의 질적 분석을 사용합니다
+      (일괄 처리 모드는 수업 전체 지표를 사용).
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, queue_size: Optional[int] = None):
+        self.max_concurrency = max_concurrency if max_concurrency is not None else config.LLM_MAX_CONCURRENCY
+        self.processor = TeachingDataProcessor("", max_concurrency=self.max_concurrency)
+        self.assessor = TeachingAssessor(max_concurrency=self.max_concurrency)
+        self.chunker = StreamingChunker(model=self.assessor.llm.model)
+
+        self._queue = queue.Queue(maxsize=queue_size or config.STREAM_QUEUE_SIZE)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, self.max_concurrency))
+        self._in_flight = threading.BoundedSemaphore(max(1, self.max_concurrency) * 2)
+        self._futures: List[Future] = []
+        self._error: Optional[BaseException] = None
+        self._aborted = False
+        self._consumer = threading.Thread(target=self._consume, name="stream-analysis", daemon=True)
+        self._consumer.start()
+
+    def feed(self, utterances: List[Dict]) -> None:
+        """전사 청크 하나의 발화 목록을 시간 순서대로 전달 (대기열이 가득 차면 대기)"""
+        self._put(utterances)
+
+    def finish(self) -> Tuple[Dict, Dict]:
+        """입력을 마감하고 (전처리 데이터, 평가 결과) 반환"""
+        self._put(_END)
+        self._consumer.join()
+        try:
+            if self._error is not None:
+                raise self._error
+            results = [future.result() for future in self._futures]
+        finally:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+        processed_data = self.processor.processed_data
+        chunk_assessments = []
+        for qualitative, assessment in results:
+            for category, items in qualitative.items():
+                processed_data["질적_분석"][category].extend(items)
+            chunk_assessments.append(assessment)
+
+        print(f"추출된 교사 발화 수: {len(processed_data['교사_발화'])}")
+        print(f"추출된 학생 발화 수: {len(processed_data['학생_발화'])}")
+        return processed_data, self.assessor.generate_final_assessment(chunk_assessments, processed_data)
+
+    def abort(self) -> None:
+        """입력 단계가 실패했을 때 분석 스레드와 대기 중인 LLM 작업 정리"""
+        self._aborted = True
+        try:
+            self._queue.put_nowait(_END)
+        except queue.Full:
+            pass  # 분석 스레드가 다음 항목을 꺼낼 때 중단 여부를 확인
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _put(self, item) -> None:
+        # 분석 스레드가 실패한 경우 가득 찬 대기열에서 영원히 기다리지 않도록 주기적으로 확인
+        while True:
+            if self._error is not None:
+                raise self._error
+            try:
+                self._queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _consume(self) -> None:
+        try:
+            while True:
+                utterances = self._queue.get()
+                if utterances is _END or self._aborted:
+                    return
+                for utterance in utterances:
+                    self._add_utterance(utterance.get("speaker", ""), utterance.get("text") or "")
+            for chunk in self.chunker.flush():
+                self._submit(chunk)
+        except BaseException as e:
+            self._error = e
+
+    def _add_utterance(self, speaker: str, text: str) -> None:
+        before = len(self.processor.processed_data["대화_세션"])
+        self.processor.add_utterance(speaker, text)
+        conversation = self.processor.processed_data["대화_세션"]
+        if len(conversation) > before:
+            for chunk in self.chunker.add(conversation[-1]):
+                self._submit(chunk)
+
+    def _submit(self, chunk: List[Tuple[str, str]]) -> None:
+        # 청크가 확정된 시점까지의 정량 지표 (이후 발화로 바뀌지 않도록 복사)
+        metrics = copy.deepcopy({
+            key: self.processor.processed_data[key]
+            for key in ["핵심_지표", "교사_전략", "학생_참여", "피드백_분석"]
+        })
+        self._in_flight.acquire()
+        future = self._executor.submit(self._analyze_chunk, chunk, metrics)
+        future.add_done_callback(lambda _: self._in_flight.release())
+        self._futures.append(future)
+
+    def _analyze_chunk(self, chunk: List[Tuple[str, str]], metrics: Dict) -> Tuple[Dict, Dict]:
+        """청크 질적 분석 후 그 결과를 포함해 청크 평가 (구조화 출력 모드는 한 번의 호출로 함께 처리)"""
+        if self.assessor.structured:
+            assessment = self.assessor.analyze_chunk_structured(
+                self.assessor.build_chunk_data(chunk, dict(metrics, 질적_분석={}))
+            )
+            return assessment.pop("질적_분석"), assessment
+        qualitative = self.processor.analyze_chunk_with_llm(chunk)
+        chunk_data = self.assessor.build_chunk_data(chunk, dict(metrics, 질적_분석=qualitative))
+        return qualitative, self.assessor.assess_chunk(chunk_data)
+
+def main(input_video_path, teacher_id, output_file=None, transcriber=None, segment_mode=None):
+    """영상 전사와 수업 분석을 겹쳐 진행하여 평가 리포트 생성"""
+    base_dir = os.path.join(os.path.dirname(input_video_path), 'outputs', teacher_id)
+    os.makedirs(base_dir, exist_ok=True)
+    metrics = start_run(teacher=teacher_id, job="stream")
+    transcript_file = os.path.join(base_dir, 'transcript.txt')
+    output_file = output_file or os.path.join(base_dir, 'report.md')
+
+    with open(transcript_file, 'w', encoding='utf-8') as f:
+        f.write("#Lecture transcript\n\n")  # 파일 초기화
+    print("Progress: 10")  # 초기 설정 완료
+
+    temp_audio, chunks, offsets, offset_map = prepare_segments(input_video_path, base_dir, segment_mode)
+
+    pipeline = StreamingLessonPipeline()
+    total_chunks = len(chunks)
+    completed = 0
+    delivered: List[List[Dict]] = []
+
+    def deliver(index: int, utterances: List[Dict]):
+        # 지금까지 도착한 청크 전체로 화자 역할을 정해 새 청크만 전사 파일에 기록하고 분석 대기열로 전달
+        # (일괄 모드와 달리 이후 청크를 보고 앞 청크의 역할을 고치지는 않음)
+        delivered.append(utterances)
+        labeled = assign_chunk_roles(delivered)[-1]
+        append_transcript(transcript_file, labeled)
+        pipeline.feed(labeled)
+
+    deliver_in_order = release_in_order(deliver)
+
+    def on_chunk_done(index: int, utterances: List[Dict]):
+        nonlocal completed
+        completed += 1
+        print(f"Progress: {int(40 + (completed / total_chunks * 50))}")  # 40%에서 90%까지 진행
+        deliver_in_order(index, utterances)
+
+    try:
+        transcribe_chunks(
+            chunks, config.AAI_API_KEY,
+            transcriber=transcriber, on_complete=on_chunk_done, offsets=offsets, offset_map=offset_map
+        )
+    except BaseException:
+        pipeline.abort()
+        raise
+    _, assessment_result = pipeline.finish()
+    if temp_audio:
+        os.remove(temp_audio)
+
+    report_md = generate_fancy_report(assessment_result)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(report_md)
+    metrics.add_file_bytes("report", written_path=output_file)
+    if config.METRICS_ENABLED:
+        metrics.write(metrics_path_stem(output_file))
+    print(f"리포트가 '{output_file}' 파일로 저장되었습니다.")
+    print("Progress: 100")  # 완료
+
+    return {
+        "transcript_path": transcript_file,
+        "report_path": output_file,
+        "status": "completed"
+    }
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        print("Usage: python streaming_pipe.py <video_path> <teacher_id> [report_path]")
+        sys.exit(1)
+
+    main(*sys.argv[1:])
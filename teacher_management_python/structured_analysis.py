@@ -0,0 +1,89 @@
+import json
+from typing import Any, Dict, List
+
+# 응답 키(영문) -> 처리 결과 키
+QUALITATIVE_FIELDS = {
+    "teacher_expertise": "교사_전문성",
+    "classroom_discourse": "수업_담화",
+    "learning_environment": "학습_환경"
+}
+ASSESSMENT_FIELDS = {
+    "detailed_evaluation": "세부_평가",
+    "strengths": "우수점",
+    "improvements": "개선점"
+}
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+# 청크 하나의 질적 분석과 평가를 함께 받는 응답 스키마 (OpenAI structured outputs, strict 모드)
+CHUNK_ANALYSIS_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "additionalProperties": False,
+    "required": ["qualitative_analysis", *ASSESSMENT_FIELDS],
+    "properties": {
+        "qualitative_analysis": {
+            "type": "object",
+            "additionalProperties": False,
+            "required": list(QUALITATIVE_FIELDS),
+            "properties": {field: _STRING_LIST for field in QUALITATIVE_FIELDS}
+        },
+        "detailed_evaluation": {"type": "string"},
+        "strengths": _STRING_LIST,
+        "improvements": _STRING_LIST
+    }
+}
+
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "chunk_analysis", "strict": True, "schema": CHUNK_ANALYSIS_SCHEMA}
+}
+
+_TYPES = {"object": dict, "array": list, "string": str}
+
+def validate(value: Any, schema: Dict[str, Any], path: str = "$") -> None:
+    """스키마(object/array/string, required, additionalProperties)에 맞지 않으면 ValueError"""
+    expected = _TYPES[schema["type"]]
+    if not isinstance(value, expected):
+        raise ValueError(f"{path}: expected {schema['type']}, got {type(value).__name__}")
+    if expected is dict:
+        properties = schema.get("properties", {})
+        missing = [key for key in schema.get("required", []) if key not in value]
+        if missing:
+            raise ValueError(f"{path}: missing {', '.join(missing)}")
+        if schema.get("additionalProperties") is False:
+            extra = [key for key in value if key not in properties]
+            if extra:
+                raise ValueError(f"{path}: unexpected {', '.join(extra)}")
+        for key, item in value.items():
+            if key in properties:
+                validate(item, properties[key], f"{path}.{key}")
+    elif expected is list:
+        for index, item in enumerate(value):
+            validate(item, schema["items"], f"{path}[{index}]")
+
+def _clean(items: List[str]) -> List[str]:
+    return [item.strip() for item in items if item.strip()]
+
+def parse_chunk_analysis(content: str) -> Dict:
+    """구조화 응답을 검증해 (질적 분석 + 청크 평가) 결과로 변환
+
+    결과 형식은 기존 파서(_parse_llm_analysis, _parse_assessment_result)와 같고 질적_분석 키가 추가됩니다.
+    JSON이 아니거나 스키마에 맞지 않으면 ValueError.
+    """
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"invalid JSON: {e}") from e
+    validate(data, CHUNK_ANALYSIS_SCHEMA)
+
+    qualitative = data["qualitative_analysis"]
+    result = {
+        "질적_분석": {name: _clean(qualitative[field]) for field, name in QUALITATIVE_FIELDS.items()},
+        "세부_평가": data["detailed_evaluation"].strip() + "\n",
+        "우수점": _clean(data["strengths"]),
+        "개선점": _clean(data["improvements"]),
+        "총점": 0
+    }
+    if not result["세부_평가"].strip():
+        raise ValueError("$.detailed_evaluation: empty")
+    return result
@@ -1,42 +1,26 @@
-import assemblyai as aai
-from pydub import AudioSegment
 import os
-import subprocess
 from config import AAI_API_KEY
-from typing import List, Dict
+import config as config
+from concurrency import map_ordered
+from audio_segmentation import plan_segments
+from audio_extract import SpeechSegment, speech_encode_args, SPEECH_CODECS
+from metrics import get_metrics, start_run
+from typing import Callable, List, Dict, Optional
 import sys
 
-def convert_mp4_to_mp3(mp4_path, mp3_path):
-    """MP4 파일을 MP3로 변환 (ffmpeg 사용)"""
-    command = f'ffmpeg -i "{mp4_path}" -q:a 0 -map a "{mp3_path}"'
-    try:
-        subprocess.call(command, shell=True)
-    except Exception as e:
-        print(f"Error converting file: {str(e)}")
-        return False
-    return True
+def transcribe_audio(file_path, api_key, transcriber=None, offset_ms=0, offset_map=None):
+    """오디오 파일 또는 구간(audio_extract.SpeechSegment)을 텍스트로 변환
 
-def split_audio(mp3_path, chunk_duration=10):
-    """MP3 파일을 지정된 시간(분) 단위로 분할"""
-    audio = AudioSegment.from_mp3(mp3_path)
-    chunks = []
-    
-    # 분할 크기 계산 (밀리초 단위)
-    chunk_length_ms = chunk_duration * 60 * 1000
-    
-    # 오디오 분할
-    for i in range(0, len(audio), chunk_length_ms):
-        chunk = audio[i:i + chunk_length_ms]
-        chunk_path = f"chunk_{i//chunk_length_ms}.mp3"
-        chunk.export(chunk_path, format="mp3")
-        chunks.append(chunk_path)
-    
-    return chunks
-
-def transcribe_audio(file_path, api_key):
-    """오디오 파일을 텍스트로 변환"""
+    구간은 ffmpeg 인코딩 출력을 그대로 업로드하므로 임시 파일을 만들지 않습니다.
+    transcriber를 넘기면 aai.Transcriber 대신 사용합니다 (로컬 대체 전사기 등).
+    offset_ms는 청크의 원본 내 시작 위치로, 발화 타임스탬프를 원본 기준으로 보정합니다.
+    offset_map(vad.OffsetMap)이 있으면 무음을 잘라낸 오디오 기준 시각을 원본 영상 기준으로 되돌립니다.
+    반환되는 발화의 speaker는 화자 기호이며 역할은 speaker_roles.assign_roles로 정합니다.
+    """
+    import assemblyai as aai  # 임포트 비용이 커서 전사할 때만 불러옴
     aai.settings.api_key = api_key
-    transcriber = aai.Transcriber()
+    if transcriber is None:
+        transcriber = aai.Transcriber()
     
     # 화자 구분을 위한 설정 (지원되는 파라미터만 사용)
     config = aai.TranscriptionConfig(
@@ -44,73 +28,143 @@ def transcribe_audio(file_path, api_key):
         speakers_expected=3
     )
     
-    transcript = transcriber.transcribe(file_path, config=config)
+    metrics = get_metrics()
+    if isinstance(file_path, SpeechSegment):
+        with metrics.stage("transcribe", chunk=file_path.name):
+            with file_path.open() as stream:
+                transcript = transcriber.transcribe(stream, config=config)
+        metrics.add_bytes("transcribe", read=stream.bytes_read)
+    else:
+        metrics.add_file_bytes("transcribe", read_path=file_path)
+        with metrics.stage("transcribe", chunk=os.path.basename(str(file_path))):
+            transcript = transcriber.transcribe(file_path, config=config)
     if transcript.status == aai.TranscriptStatus.error:
         return f"Error: {transcript.error}"
     
-    return _analyze_speaker_patterns(transcript.utterances)
+    return _raw_utterances(transcript.utterances, offset_ms, offset_map)
 
-def _analyze_speaker_patterns(utterances) -> List[Dict]:
-    """화자 패턴 분석을 통한 교사/학생 구분"""
-    speaker_stats = {}
-    
-    # 1단계: 통계 수집 및 교사 특징 분석
-    for utterance in utterances:
-        speaker = utterance.speaker
-        text = utterance.text
-        
-        if speaker not in speaker_stats:
-            speaker_stats[speaker] = {
-                "말한_횟수": 0,
-                "총_발화_길이": 0,
-                "교사_특징_점수": 0
-            }
-        
-        # 기본 통계
-        speaker_stats[speaker]["말한_횟수"] += 1
-        speaker_stats[speaker]["총_발화_길이"] += len(text)
-        
-        # 교사 특징 점수 계산
-        teacher_patterns = [
-            "let's", "look at", "can anyone", "tell me",
-            "does anyone", "remember", "explain",
-            "understand", "question", "next",
-            "class", "everyone", "please"
-        ]
-        
-        for pattern in teacher_patterns:
-            if pattern in text.lower():
-                speaker_stats[speaker]["교사_특징_점수"] += 1
-    
-    # 2단계: 교사 식별
-    teacher_speaker = None
-    max_teacher_score = -1
-    
-    for speaker, stats in speaker_stats.items():
-        if stats["말한_횟수"] > 0:
-            avg_length = stats["총_발화_길이"] / stats["말한_횟수"]
-            teacher_score = (
-                stats["교사_특징_점수"] * 2 +  # 교사 특징 가중치
-                avg_length * 0.5 +            # 평균 발화 길이 가중치
-                stats["말한_횟수"] * 0.3       # 발화 빈도 가중치
-            )
-            
-            if teacher_score > max_teacher_score:
-                max_teacher_score = teacher_score
-                teacher_speaker = speaker
+def transcribe_chunks(
+    chunks: List,
+    api_key: str,
+    max_workers: Optional[int] = None,
+    transcriber=None,
+    on_complete: Optional[Callable[[int, List[Dict]], None]] = None,
+    offsets: Optional[List[int]] = None,
+    offset_map=None
+) -> List[List[Dict]]:
+    """여러 오디오 청크를 동시에 전사하고 결과를 청크(시간) 순서대로 반환
+
+    Args:
+        chunks: 시간 순서대로 정렬된 청크 파일 경로 또는 SpeechSegment 목록
+        api_key: AssemblyAI API 키
+        max_workers: 동시 전사 작업 수 (기본값: config.TRANSCRIBE_MAX_CONCURRENCY)
+        transcriber: aai.Transcriber 대신 사용할 전사기 (테스트용 대체 구현 등)
+        on_complete: 청크 하나의 전사가 끝날 때마다 (청크 인덱스, 발화 목록)으로 호출
+        offsets: 청크별 원본 기준 시작 위치(밀리초), 타임스탬프 보정용
+        offset_map: 무음을 잘라낸 경우 잘라낸 오디오 기준 시각 -> 원본 시각 변환표 (prepare_segments 반환값)
+    """
+    if max_workers is None:
+        max_workers = config.TRANSCRIBE_MAX_CONCURRENCY
+    if offsets is None:
+        offsets = [0] * len(chunks)
+    return map_ordered(
+        lambda item: transcribe_audio(item[0], api_key, transcriber, item[1], offset_map),
+        list(zip(chunks, offsets)),
+        max_workers=max_workers,
+        on_complete=on_complete
+    )
+
+def _raw_utterances(utterances, offset_ms=0, offset_map=None) -> List[Dict]:
+    """전사 결과를 화자 기호(A, B…) 그대로 변환
+
+    청크마다 화자 기호가 독립적으로 매겨지므로 교사/학생 역할은 모든 청크의 전사가 끝난 뒤
+    speaker_roles.assign_roles에서 청크 간 화자를 연결해 한 번에 정합니다.
+    offset_ms는 청크의 원본 내 시작 위치로, 타임스탬프를 원본 기준으로 보정합니다.
+    """
+    from speaker_roles import speaking_ms
+    to_original = offset_map.to_original if offset_map is not None else (lambda ms: ms)
+    return [
+        {
+            "speaker": utterance.speaker,
+            "text": utterance.text,
+            "start": to_original(getattr(utterance, "start", 0) + offset_ms),
+            "end": to_original(getattr(utterance, "end", 0) + offset_ms),
+            "speaking_ms": speaking_ms(utterance)
+        }
+        for utterance in utterances
+    ]
+
+def prepare_segments(input_video_path, base_dir, segment_mode=None, codec=None):
+    """영상에서 전사 단위 구간을 정함
+
+    구간 오디오는 업로드할 때 ffmpeg가 16kHz 모노 음성용으로 인코딩해 바로 스트리밍하므로
+    MP3 변환·청크 파일을 만들지 않습니다.
+    config.VAD_ENABLED이면 분할 전에 긴 무음을 잘라낸 음성 파일(base_dir)을 한 번 만듭니다.
+
+    Returns:
+        (삭제할 임시 오디오 파일 또는 None, 시간 순서대로 정렬된 SpeechSegment 목록,
+         청크별 시작 위치(밀리초), 무음을 잘라낸 경우 원본 시각 변환표(vad.OffsetMap) 또는 None)
+    """
+    codec = codec or config.AUDIO_CODEC
+    source, temp_audio, offset_map = input_video_path, None, None
+    if config.VAD_ENABLED:
+        temp_audio, offset_map = trim_silent_spans(input_video_path, base_dir, codec)
+        source = temp_audio
+    print("Progress: 30")  # 변환 완료
     
-    # 3단계: 결과 변환 (교사/학생으로만 구분)
-    processed_utterances = []
+    # 구간 경계 결정: "silence"는 무음 지점에 맞추고 "fixed"는 10분 간격
+    segment_mode = segment_mode or config.AUDIO_SEGMENT_MODE
+    with get_metrics().stage("split", mode=segment_mode):
+        boundaries = plan_segments(
+            source,
+            tolerance_sec=config.AUDIO_SEGMENT_TOLERANCE_SEC,
+            align_to_silence=segment_mode == "silence"
+        )
+    chunks = [SpeechSegment(source, start, end, codec) for start, end in zip(boundaries, boundaries[1:])]
+    print("Progress: 40")  # 분할 완료
+    return temp_audio, chunks, [chunk.start_ms for chunk in chunks], offset_map
+
+def trim_silent_spans(input_path, base_dir, codec):
+    """긴 무음을 잘라낸 음성 파일을 만들고 원본 시각 변환표와 함께 반환
+
+    Returns:
+        (잘라낸 오디오 경로, vad.OffsetMap)
+    """
+    from vad import trim_silence  # numpy 분석은 VAD를 켰을 때만 필요
+    speech_file = os.path.join(base_dir, f"speech.{SPEECH_CODECS[codec][1]}")
+    metrics = get_metrics()
+    with metrics.stage("vad"):
+        offset_map = trim_silence(
+            input_path, speech_file,
+            min_silence_ms=int(config.VAD_MIN_SILENCE_SEC * 1000),
+            padding_ms=config.VAD_PADDING_MS,
+            encode_args=speech_encode_args(codec)
+        )
+    metrics.add_file_bytes("vad", read_path=input_path, written_path=speech_file)
+    print(f"VAD: 원본 {offset_map.duration_ms / 1000:.0f}초 중 {offset_map.kept_ms / 1000:.0f}초 유지")
+    return speech_file, offset_map
+
+def assign_chunk_roles(results: List) -> List[List[Dict]]:
+    """청크별 전사 결과(화자 기호)에 교사/학생 역할 지정 - 전사 오류 문자열이 있으면 예외"""
+    from speaker_roles import assign_roles
+    for result in results:
+        if isinstance(result, str):
+            raise RuntimeError(result)
+    return assign_roles(results)
+
+def append_transcript(transcript_file, utterances: List[Dict]):
+    """발화 목록을 "화자: 발화" 줄로 전사 파일에 추가"""
+    lines = []
     for utterance in utterances:
-        speaker_role = "Teacher" if utterance.speaker == teacher_speaker else "Student"
-        processed_utterances.append({
-            "speaker": speaker_role,
-            "text": utterance.text
-        })
-    
-    return processed_utterances
+        # 단순화된 화자 구분 (Teacher/Student)
+        speaker = "Teacher" if utterance.get("speaker") == "Teacher" else "Student"
+        lines.append(f"{speaker}: {utterance.get('text')}\n")
+    data = "".join(lines)
+    with open(transcript_file, 'a', encoding='utf-8') as f:
+        f.write(data)
+    get_metrics().add_bytes("transcript", written=len(data.encode('utf-8')))
 
-def main(input_video_path, teacher_id):
+def main(input_video_path, teacher_id, transcriber=None, segment_mode=None):
     try:
         # API 키 설정
         API_KEY = AAI_API_KEY
@@ -118,8 +172,8 @@ def main(input_video_path, teacher_id):
         # 동적 출력 경로 설정
         base_dir = os.path.join(os.path.dirname(input_video_path), 'outputs', teacher_id)
         os.makedirs(base_dir, exist_ok=True)
+        metrics = start_run(teacher=teacher_id, job="transcribe")
         
-        mp3_file = os.path.join(base_dir, 'output.mp3')
         transcript_file = os.path.join(base_dir, 'transcript.txt')
         
         # 대화 내용을 텍스트 파일로 저장
@@ -132,37 +186,42 @@ def main(input_video_path, teacher_id):
         
         print("Progress: 10")  # 초기 설정 완료
         
-        # MP4를 MP3로 변환
-        convert_mp4_to_mp3(input_video_path, mp3_file)
-        print("Progress: 30")  # 변환 완료
-        
-        # MP3 파일 분할
-        chunks = split_audio(mp3_file)
-        print("Progress: 40")  # 분할 완료
+        temp_audio, chunks, offsets, offset_map = prepare_segments(input_video_path, base_dir, segment_mode)
         
         total_chunks = len(chunks)
-        for i, chunk in enumerate(chunks):
-            utterances = transcribe_audio(chunk, API_KEY)
-            progress = int(40 + (i / total_chunks * 50))  # 40%에서 90%까지 진행
+        completed = 0
+        
+        def on_chunk_done(index: int, utterances: List[Dict]):
+            nonlocal completed
+            completed += 1
+            progress = int(40 + (completed / total_chunks * 50))  # 40%에서 90%까지 진행
             print(f"Progress: {progress}")
-            
-            # 변환된 내용을 바로 파일에 추가
-            try:
-                with open(transcript_file, 'a', encoding='utf-8') as f:
-                    for utterance in utterances:
-                        # 단순화된 화자 구분 (Teacher/Student)
-                        speaker = "Teacher" if utterance.get("speaker") == "Teacher" else "Student"
-                        f.write(f"{speaker}: {utterance.get('text')}\n")
-            except Exception as e:
-                print(f"파일 저장 중 오류 발생: {str(e)}")
-                raise
-                
-            # 청크 파일 삭제
-            os.remove(chunk)
         
-        # 임시 MP3 파일 삭제
-        os.remove(mp3_file)
+        # 청크 업로드와 전사 작업을 동시에 진행
+        results = transcribe_chunks(
+            chunks, API_KEY,
+            transcriber=transcriber,
+            on_complete=on_chunk_done,
+            offsets=offsets,
+            offset_map=offset_map
+        )
+        
+        # 전체 청크의 화자를 연결해 교사/학생 역할을 정한 뒤 시간 순서대로 저장
+        with get_metrics().stage("roles"):
+            chunk_utterances = assign_chunk_roles(results)
+        try:
+            for utterances in chunk_utterances:
+                append_transcript(transcript_file, utterances)
+        except Exception as e:
+            print(f"파일 저장 중 오류 발생: {str(e)}")
+            raise
+        
+        # 임시 오디오 파일 삭제
+        if temp_audio:
+            os.remove(temp_audio)
         print(f"변환된 텍스트가 {transcript_file}에 저장되었습니다.")
+        if config.METRICS_ENABLED:
+            metrics.write(os.path.join(config.METRICS_DIR or base_dir, "transcribe"))
         
         print("Progress: 100")  # 완료
         
@@ -0,0 +1,239 @@
+import bisect
+import json
+import os
+import re
+import sys
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import config as config
+from report_files import iter_report_dirs, load_transcript_utterances
+
+TOKEN_RE = re.compile(r"[\w']+")
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower().replace("’", "'"))
+
+def assign_roles_by_talk_time(utterances: List[Dict]) -> Dict[str, str]:
+    """발화 시간이 가장 긴 화자를 Teacher, 나머지를 Student로 지정"""
+    speaking_ms: Dict[str, int] = {}
+    for utterance in utterances:
+        speaker = utterance.get("speaker", "")
+        speaking_ms[speaker] = speaking_ms.get(speaker, 0) + utterance.get("end", 0) - utterance.get("start", 0)
+    if not speaking_ms:
+        return {}
+    teacher = max(speaking_ms, key=speaking_ms.get)
+    return {speaker: "Teacher" if speaker == teacher else "Student" for speaker in speaking_ms}
+
+class TranscriptIndex:
+    """발화 단위 위치 정보를 담은 전사문 역색인
+
+    postings: 단어 -> {발화 번호: [발화 내 단어 위치, ...]}
+    발화 번호로 수업(교사, 리포트 ID), 시작·종료 시각, 화자 역할을 찾습니다.
+    """
+
+    def __init__(self):
+        self.documents: List[Tuple[str, str]] = []  # 문서 번호 -> (교사, 리포트 ID)
+        self.utterances: List[Tuple[int, int, int, str]] = []  # 발화 번호 -> (문서 번호, 시작, 종료, 역할)
+        self.postings: Dict[str, Dict[int, List[int]]] = {}
+        self._document_ids: Dict[Tuple[str, str], int] = {}
+
+    def __contains__(self, lesson: Tuple[str, str]) -> bool:
+        return lesson in self._document_ids
+
+    def add_document(self, teacher: str, report_id: str, utterances: Iterable[Dict], roles: Optional[Dict[str, str]] = None) -> bool:
+        """수업 하나의 발화를 색인에 추가 (이미 색인된 수업이면 False)
+
+        utterances의 speaker가 화자 기호(A, B…)이면 roles로 역할을 지정하고,
+        이미 Teacher/Student로 구분된 발화는 그대로 사용합니다.
+        """
+        key = (teacher, str(report_id))
+        if key in self._document_ids:
+            return False
+        document_id = len(self.documents)
+        self.documents.append(key)
+        self._document_ids[key] = document_id
+
+        for utterance in utterances:
+            speaker = utterance.get("speaker", "")
+            role = (roles or {}).get(speaker, speaker)
+            utterance_id = len(self.utterances)
+            self.utterances.append((document_id, utterance.get("start", 0), utterance.get("end", 0), role))
+            for position, token in enumerate(tokenize(utterance.get("text", ""))):
+                self.postings.setdefault(token, {}).setdefault(utterance_id, []).append(position)
+        return True
+
+    @classmethod
+    def from_conversation(cls, conversations: List[Tuple[str, str]], teacher: str = "", report_id: str = "") -> "TranscriptIndex":
+        """(화자, 발화) 목록 하나로 색인 생성 (단일 수업 주제 추출용)"""
+        index = cls()
+        index.add_document(teacher, report_id, ({"speaker": speaker, "text": text} for speaker, text in conversations))
+        return index
+
+    def add_report_dir(self, report_dir: str) -> bool:
+        report_dir = os.path.abspath(report_dir)
+        teacher = os.path.basename(os.path.dirname(report_dir))
+        report_id = os.path.basename(report_dir)
+        if (teacher, report_id) in self:
+            return False
+        transcript_path = os.path.join(report_dir, "transcript.json")
+        if not os.path.exists(transcript_path):
+            return False
+        utterances = load_transcript_utterances(transcript_path)
+        return self.add_document(teacher, report_id, utterances, assign_roles_by_talk_time(utterances))
+
+    def update_from_reports(self, reports_dir: Optional[str] = None) -> int:
+        """아직 색인되지 않은 리포트만 추가하고 추가된 수를 반환"""
+        added = 0
+        for teacher, report_id, report_dir in iter_report_dirs(reports_dir):
+            if (teacher, report_id) not in self and self.add_report_dir(report_dir):
+                added += 1
+        return added
+
+    def _phrase_matches(self, tokens: List[str]) -> Dict[int, List[int]]:
+        """구절이 나타나는 발화 번호 -> 구절 시작 위치 목록"""
+        if not tokens:
+            return {}
+        lists = [self.postings.get(token) for token in tokens]
+        if any(postings is None for postings in lists):
+            return {}
+        if len(tokens) == 1:
+            return lists[0]
+        # 가장 짧은 목록부터 발화 번호 교집합 후 위치가 연속되는지 확인
+        candidates = set(min(lists, key=len))
+        for postings in lists:
+            candidates &= postings.keys()
+            if not candidates:
+                return {}
+        matches = {}
+        for utterance_id in candidates:
+            starts = self._phrase_starts(lists, utterance_id)
+            if starts:
+                matches[utterance_id] = starts
+        return matches
+
+    @staticmethod
+    def _phrase_starts(lists: List[Dict[int, List[int]]], utterance_id: int) -> List[int]:
+        """발화 하나에서 단어 목록(lists 순서)이 연속으로 나타나는 시작 위치"""
+        if any(utterance_id not in postings for postings in lists):
+            return []
+        following = [set(postings[utterance_id]) for postings in lists[1:]]
+        return [
+            position for position in lists[0][utterance_id]
+            if all(position + offset + 1 in positions for offset, positions in enumerate(following))
+        ]
+
+    def _document_range(self, document_id: int) -> Tuple[int, int]:
+        """문서의 발화 번호 구간 [시작, 끝) - 발화는 문서 순서대로 추가되므로 연속 구간"""
+        return (
+            bisect.bisect_left(self.utterances, (document_id,)),
+            bisect.bisect_left(self.utterances, (document_id + 1,))
+        )
+
+    def _occurs_in(self, tokens: List[str], document_id: int) -> bool:
+        """구절이 문서 안에 한 번이라도 나타나는지 (첫 일치에서 중단)"""
+        if not tokens:
+            return False
+        lists = [self.postings.get(token) for token in tokens]
+        if any(postings is None for postings in lists):
+            return False
+        first, end = self._document_range(document_id)
+        shortest = min(lists, key=len)
+        # 단어 등장 목록과 문서 발화 구간 중 짧은 쪽만 순회
+        if len(shortest) <= end - first:
+            candidates = (utterance_id for utterance_id in shortest if first <= utterance_id < end)
+        else:
+            candidates = (utterance_id for utterance_id in range(first, end) if utterance_id in shortest)
+        return any(self._phrase_starts(lists, utterance_id) for utterance_id in candidates)
+
+    def search(self, query: str, teacher: Optional[str] = None, role: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """단어 또는 구절 검색 결과를 수업·시간 순서대로 반환"""
+        hits = []
+        for utterance_id, positions in sorted(self._phrase_matches(tokenize(query)).items()):
+            document_id, start, end, utterance_role = self.utterances[utterance_id]
+            lesson_teacher, report_id = self.documents[document_id]
+            if teacher is not None and lesson_teacher != teacher:
+                continue
+            if role is not None and utterance_role != role:
+                continue
+            hits.append({
+                "teacher": lesson_teacher,
+                "report_id": report_id,
+                "utterance": utterance_id,
+                "start": start,
+                "end": end,
+                "role": utterance_role,
+                "positions": positions
+            })
+            if limit is not None and len(hits) >= limit:
+                break
+        return hits
+
+    def lessons_covering(self, query: str, teacher: Optional[str] = None) -> Dict[Tuple[str, str], int]:
+        """구절이 등장한 수업별 등장 횟수"""
+        counts: Dict[Tuple[str, str], int] = {}
+        for utterance_id, positions in self._phrase_matches(tokenize(query)).items():
+            lesson = self.documents[self.utterances[utterance_id][0]]
+            if teacher is None or lesson[0] == teacher:
+                counts[lesson] = counts.get(lesson, 0) + len(positions)
+        return counts
+
+    def subjects(self, keywords: Iterable[str], lesson: Optional[Tuple[str, str]] = None) -> Set[str]:
+        """키워드 중 색인(또는 특정 수업)에 단어 단위로 등장하는 것"""
+        if lesson is not None:
+            document_id = self._document_ids.get((lesson[0], str(lesson[1])))
+            if document_id is None:
+                return set()
+            return {keyword for keyword in keywords if self._occurs_in(tokenize(keyword), document_id)}
+        return {keyword for keyword in keywords if self._phrase_matches(tokenize(keyword))}
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or config.TRANSCRIPT_INDEX_PATH
+        data = {
+            "documents": self.documents,
+            "utterances": self.utterances,
+            "postings": {
+                token: [[utterance_id, positions] for utterance_id, positions in postings.items()]
+                for token, postings in self.postings.items()
+            }
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "TranscriptIndex":
+        path = path or config.TRANSCRIPT_INDEX_PATH
+        index = cls()
+        if not os.path.exists(path):
+            return index
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        index.documents = [tuple(document) for document in data["documents"]]
+        index.utterances = [tuple(utterance) for utterance in data["utterances"]]
+        index.postings = {
+            token: {utterance_id: positions for utterance_id, positions in postings}
+            for token, postings in data["postings"].items()
+        }
+        index._document_ids = {document: i for i, document in enumerate(index.documents)}
+        return index
+
+def main(argv: List[str]) -> None:
+    """사용법:
+        python transcript_index.py update                       # 새 리포트를 색인에 추가
+        python transcript_index.py search <구절> [교사] [역할]     # 검색 결과 출력 (JSON)
+    """
+    index = TranscriptIndex.load()
+    if argv[:1] == ["update"]:
+        added = index.update_from_reports()
+        index.save()
+        print(json.dumps({"added": added, "lessons": len(index.documents)}))
+    elif argv[:1] == ["search"] and len(argv) >= 2:
+        teacher = argv[2] if len(argv) > 2 else None
+        role = argv[3] if len(argv) > 3 else None
+        print(json.dumps(index.search(argv[1], teacher, role), ensure_ascii=False))
+    else:
+        print(main.__doc__)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
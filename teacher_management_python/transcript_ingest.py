@@ -0,0 +1,199 @@
+import json
+import re
+import sys
+from typing import IO, Callable, Dict, Iterator, Optional, Tuple, Union
+
+# 발화 목록이 들어 있는 최상위 키 (초기 리포트는 대화_세션)
+UTTERANCE_KEYS = ("utterances", "대화_세션")
+UTTERANCE_FIELDS = ("speaker", "text", "start", "end")
+BLOCK_SIZE = 64 * 1024
+
+WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+# 괄호가 아닌 문자와 완결된 문자열을 한 번에 건너뜀 (멈춘 곳은 괄호, 잘린 문자열, 버퍼 끝 중 하나)
+SKIP_RE = re.compile(r'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+STRING_REST_RE = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"')
+NUMBER_CHARS_RE = re.compile(r"[-+0-9.eE]*")
+_decoder = json.JSONDecoder()
+
+class _JsonStreamReader:
+    """파일을 블록 단위로 읽으며 필요한 값만 디코딩하는 JSON 스캐너
+
+    건너뛰는 값(words 배열 등)은 괄호·문자열 경계만 정규식으로 찾아 넘기므로 객체를 만들지 않고,
+    이미 처리한 부분은 버퍼에서 버려 메모리 사용량이 파일 크기와 무관합니다.
+    """
+
+    def __init__(self, read: Callable[[int], str], block_size: int = BLOCK_SIZE):
+        self._read = read
+        self.block_size = block_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        data = self._read(self.block_size)
+        if not data:
+            self.eof = True
+            return False
+        if self.pos >= self.block_size:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        self.buffer += data
+        return True
+
+    def peek(self) -> str:
+        """공백을 건너뛴 다음 문자"""
+        while True:
+            self.pos = WHITESPACE_RE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("transcript JSON ended unexpectedly")
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"expected {char!r} but found {found!r} in transcript JSON")
+        self.pos += 1
+
+    def skip(self, char: str) -> bool:
+        if self.peek() == char:
+            self.pos += 1
+            return True
+        return False
+
+    def read_value(self):
+        """값 하나를 디코딩 (버퍼 끝에서 잘린 값이면 더 읽어서 재시도)"""
+        if self.peek() in "-0123456789":
+            # 숫자는 버퍼 끝에서 잘려도 디코딩되므로 숫자가 끝나는 위치까지 먼저 읽어 둠
+            while NUMBER_CHARS_RE.match(self.buffer, self.pos).end() == len(self.buffer) and self._fill():
+                pass
+        while True:
+            try:
+                value, self.pos = _decoder.raw_decode(self.buffer, self.pos)
+                return value
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+
+    def skip_value(self) -> None:
+        """값 하나를 디코딩하지 않고 건너뜀"""
+        char = self.peek()
+        if char == '"':
+            self._skip_string()
+            return
+        if char not in "[{":
+            self.read_value()
+            return
+        depth = 0
+        while True:
+            self.pos = SKIP_RE.match(self.buffer, self.pos).end()
+            if self.pos == len(self.buffer) or self.buffer[self.pos] == '"':
+                if not self._fill():
+                    raise ValueError("transcript JSON ended unexpectedly")
+                continue
+            depth += 1 if self.buffer[self.pos] in "[{" else -1
+            self.pos += 1
+            if depth == 0:
+                return
+
+    def _skip_string(self) -> None:
+        # self.pos는 여는 따옴표 위치
+        while True:
+            match = STRING_REST_RE.match(self.buffer, self.pos + 1)
+            if match is not None:
+                self.pos = match.end()
+                return
+            if not self._fill():
+                raise ValueError("transcript JSON ended inside a string")
+
+def _read_utterance(reader: _JsonStreamReader) -> Dict:
+    """발화 객체에서 화자·텍스트·시간만 읽고 words 등 나머지는 건너뜀"""
+    utterance = {}
+    reader.expect("{")
+    if reader.skip("}"):
+        return utterance
+    while True:
+        key = reader.read_value()
+        reader.expect(":")
+        if key in UTTERANCE_FIELDS:
+            utterance[key] = reader.read_value()
+        else:
+            reader.skip_value()
+        if not reader.skip(","):
+            reader.expect("}")
+            return utterance
+
+def iter_transcript_utterances(source: Union[str, IO[str]]) -> Iterator[Dict]:
+    """transcript.json의 발화를 하나씩 반환 ({speaker, text, start, end})
+
+    최상위 words 배열과 발화별 words 배열은 디코딩하지 않습니다.
+    source는 파일 경로 또는 텍스트 모드 파일 객체입니다.
+    """
+    if isinstance(source, str):
+        with open(source, 'r', encoding='utf-8-sig') as f:
+            yield from iter_transcript_utterances(f)
+        return
+
+    reader = _JsonStreamReader(source.read)
+    reader.expect("{")
+    if reader.skip("}"):
+        return
+    found = False
+    while True:
+        key = reader.read_value()
+        reader.expect(":")
+        if key in UTTERANCE_KEYS and not found and reader.peek() == "[":
+            found = True
+            reader.expect("[")
+            if not reader.skip("]"):
+                while True:
+                    yield _read_utterance(reader)
+                    if not reader.skip(","):
+                        reader.expect("]")
+                        break
+        else:
+            reader.skip_value()
+        if not reader.skip(","):
+            reader.expect("}")
+            return
+
+def iter_utterance_records(
+    source: Union[str, IO[str]],
+    roles: Optional[Dict[str, str]] = None
+) -> Iterator[Tuple[str, str, int, int]]:
+    """(역할, 발화, 시작, 종료) 레코드를 시간 순서대로 반환
+
+    roles(화자 기호 -> Teacher/Student)가 없으면 먼저 파일을 한 번 스트리밍하여
+    전사 파이프라인과 같은 기준(speaker_roles, 전사 전체를 한 청크로 봄)으로 교사를 정합니다
+    (파일 객체는 처음으로 되돌릴 수 있어야 함).
+    """
+    if roles is None:
+        from speaker_roles import assign_speaker_roles  # numpy 임포트는 역할을 정할 때만
+        if not isinstance(source, str):
+            if not source.seekable():
+                raise ValueError("roles are required when the transcript stream cannot be read twice")
+            start = source.tell()
+            roles = assign_speaker_roles(iter_transcript_utterances(source))
+            source.seek(start)
+        else:
+            roles = assign_speaker_roles(iter_transcript_utterances(source))
+
+    for utterance in iter_transcript_utterances(source):
+        text = utterance.get("text")
+        if not text:
+            continue
+        yield (
+            roles.get(utterance.get("speaker", ""), "Student"),
+            text,
+            utterance.get("start", 0),
+            utterance.get("end", 0)
+        )
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python transcript_ingest.py <transcript.json>")
+        sys.exit(1)
+    for role, text, start, end in iter_utterance_records(sys.argv[1]):
+        print(f"[{start}-{end}] {role}: {text}")
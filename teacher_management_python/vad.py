@@ -0,0 +1,183 @@
+import bisect
+import subprocess
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+BYTES_PER_SAMPLE = 2  # s16le
+DIGITAL_SILENCE_DB = -90
+
+def _decode_command(audio_path: str) -> List[str]:
+    """16kHz 모노 s16le PCM을 stdout으로 내보내는 ffmpeg 명령"""
+    return [
+        "ffmpeg", "-v", "error", "-nostdin", "-i", audio_path,
+        "-map", "0:a:0", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "-f", "s16le", "-"
+    ]
+
+def iter_pcm_blocks(audio_path: str, frame_ms: int = FRAME_MS, frames_per_block: int = 2000) -> Iterator[np.ndarray]:
+    """디코딩한 오디오를 (프레임 수 × 프레임 샘플 수) int16 블록으로 반환
+
+    ffmpeg 출력을 파이프로 조금씩 읽으므로 강의 길이와 관계없이 메모리 사용량이 일정합니다.
+    마지막 불완전한 프레임은 0으로 채웁니다.
+    """
+    frame_samples = SAMPLE_RATE * frame_ms // 1000
+    block_bytes = frame_samples * frames_per_block * BYTES_PER_SAMPLE
+    process = subprocess.Popen(_decode_command(audio_path), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    finished = False
+    try:
+        pending = b""
+        while True:
+            data = process.stdout.read(block_bytes)
+            if not data:
+                break
+            pending += data
+            usable = len(pending) - len(pending) % (frame_samples * BYTES_PER_SAMPLE)
+            if usable:
+                yield np.frombuffer(pending[:usable], dtype="<i2").reshape(-1, frame_samples)
+                pending = pending[usable:]
+        if pending:
+            samples = np.frombuffer(pending[:len(pending) - len(pending) % BYTES_PER_SAMPLE], dtype="<i2")
+            yield np.pad(samples, (0, frame_samples - len(samples))).reshape(1, frame_samples)
+        finished = True
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        # 읽다가 중단한 경우(ffmpeg가 파이프 종료로 끝남)는 오류로 보지 않음
+        if process.wait() != 0 and finished:
+            raise RuntimeError(f"ffmpeg decode failed: {audio_path}: {stderr.decode(errors='replace').strip()}")
+
+def frame_features(audio_path: str, frame_ms: int = FRAME_MS) -> Tuple[np.ndarray, np.ndarray]:
+    """프레임별 에너지(dBFS)와 영교차율 - 스트리밍으로 계산하고 PCM은 보관하지 않음"""
+    energies, crossings = [], []
+    for block in iter_pcm_blocks(audio_path, frame_ms):
+        samples = block.astype(np.float32) / 32768.0
+        rms = np.sqrt(np.mean(samples ** 2, axis=1))
+        energies.append(20 * np.log10(np.maximum(rms, 1e-6)))
+        signs = np.signbit(block)
+        crossings.append(np.mean(signs[:, 1:] != signs[:, :-1], axis=1))
+    if not energies:
+        return np.zeros(0), np.zeros(0)
+    return np.concatenate(energies), np.concatenate(crossings)
+
+def speech_frames(
+    energy_db: np.ndarray,
+    zcr: np.ndarray,
+    min_energy_db: float = -50,
+    margin_db: float = 12,
+    zcr_range: Tuple[float, float] = (0.1, 0.5)
+) -> np.ndarray:
+    """프레임별 발화 여부
+
+    배경 소음 수준(에너지 하위 10%)보다 margin_db 이상 큰 프레임은 유성음으로,
+    그보다 약해도 영교차율이 무성 자음(ㅅ, ㅎ 등) 범위인 프레임은 무성음으로 봅니다.
+    배경 소음 수준은 디지털 무음(인코더 패딩 등)을 제외하고 계산합니다.
+    """
+    if len(energy_db) == 0:
+        return np.zeros(0, dtype=bool)
+    audible = energy_db[energy_db > DIGITAL_SILENCE_DB]
+    noise_floor = float(np.percentile(audible if len(audible) else energy_db, 10))
+    threshold = max(min_energy_db, noise_floor + margin_db)
+    voiced = energy_db > threshold
+    unvoiced = (energy_db > threshold - margin_db / 2) & (zcr >= zcr_range[0]) & (zcr <= zcr_range[1])
+    return voiced | unvoiced
+
+def speech_spans(
+    is_speech: np.ndarray,
+    frame_ms: int = FRAME_MS,
+    min_silence_ms: int = 3000,
+    padding_ms: int = 300
+) -> List[Tuple[int, int]]:
+    """남길 구간(밀리초, 프레임 경계) 목록
+
+    min_silence_ms 이상 이어지는 무음만 잘라내고 발화 앞뒤는 padding_ms만큼 남깁니다.
+    발화로 판단된 프레임이 하나도 없으면 잘못 잘라내지 않도록 전체를 남깁니다.
+    """
+    total = len(is_speech)
+    if not is_speech.any():
+        return [(0, total * frame_ms)] if total else []
+    padding = padding_ms // frame_ms
+    min_silence = max(1, min_silence_ms // frame_ms)
+    edges = np.diff(np.concatenate([[0], is_speech.astype(np.int8), [0]]))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    spans: List[Tuple[int, int]] = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        start, end = max(0, start - padding), min(total, end + padding)
+        if spans and start - spans[-1][1] < min_silence:
+            spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+        else:
+            spans.append((start, end))
+    return [(start * frame_ms, end * frame_ms) for start, end in spans]
+
+@dataclass
+class OffsetMap:
+    """잘라낸 오디오의 시각 -> 원본 시각 변환
+
+    spans는 원본 기준으로 남긴 구간 목록이며, 잘라낸 오디오에서는 이 구간들이 순서대로 이어 붙어 있습니다.
+    """
+    spans: List[Tuple[int, int]]
+    duration_ms: int = 0  # 원본 길이
+    _trimmed_starts: List[int] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._trimmed_starts = []
+        position = 0
+        for start, end in self.spans:
+            self._trimmed_starts.append(position)
+            position += end - start
+
+    @property
+    def kept_ms(self) -> int:
+        return sum(end - start for start, end in self.spans)
+
+    def to_original(self, trimmed_ms: int) -> int:
+        if not self.spans:
+            return trimmed_ms
+        index = max(0, bisect.bisect_right(self._trimmed_starts, trimmed_ms) - 1)
+        start, end = self.spans[index]
+        return min(start + trimmed_ms - self._trimmed_starts[index], end)
+
+def trim_silence(
+    audio_path: str,
+    output_path: str,
+    min_silence_ms: int = 3000,
+    padding_ms: int = 300,
+    frame_ms: int = FRAME_MS,
+    encode_args: Optional[List[str]] = None
+) -> OffsetMap:
+    """긴 무음을 잘라낸 오디오를 output_path에 저장하고 원본 시각 변환표를 반환
+
+    첫 번째 디코딩 패스에서 프레임 특징만 계산하고, 두 번째 패스에서 남길 프레임의 PCM만
+    인코더 ffmpeg의 stdin으로 흘려보내므로 중간 파일이나 전체 PCM 버퍼가 없습니다.
+    """
+    energy_db, zcr = frame_features(audio_path, frame_ms)
+    spans = speech_spans(speech_frames(energy_db, zcr), frame_ms, min_silence_ms, padding_ms)
+    keep = np.zeros(len(energy_db), dtype=bool)
+    for start, end in spans:
+        keep[start // frame_ms:end // frame_ms] = True
+
+    encoder = subprocess.Popen([
+        "ffmpeg", "-v", "error", "-y",
+        "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-i", "-",
+        *(encode_args or ["-c:a", "libmp3lame", "-b:a", "32k"]),
+        output_path
+    ], stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        frame_index = 0
+        for block in iter_pcm_blocks(audio_path, frame_ms):
+            selected = keep[frame_index:frame_index + len(block)]
+            frame_index += len(block)
+            if selected.any():
+                encoder.stdin.write(block[selected].tobytes())
+    finally:
+        encoder.stdin.close()
+        stderr = encoder.stderr.read()
+        encoder.stderr.close()
+        if encoder.wait() != 0:
+            raise RuntimeError(f"ffmpeg encode failed: {output_path}: {stderr.decode(errors='replace').strip()}")
+    return OffsetMap(spans, len(energy_db) * frame_ms)